@@ -1,46 +1,101 @@
 # backend/app.py
-from typing import Dict
-from flask import Flask, request, jsonify, send_file, make_response
+import time
+_import_started = time.perf_counter()
+
+import asyncio
+import hashlib
+import hmac
+import logging
+import threading
+from itertools import chain
+from typing import Dict, Optional
+from flask import Flask, g, request, jsonify, send_file, make_response, Response, stream_with_context
 from flask_cors import CORS
 import uuid
-from datetime import datetime
+from datetime import datetime, timedelta, timezone
 
 from config import Config
+from logging_setup import configure_logging
+
+# Before the service imports, so whatever they log goes through the queue handler
+configure_logging()
+logger = logging.getLogger("app")
+
 # from services.analyst_service import AnalystService
 from services.communications_service import CommunicationsService
-from db import get_customers, get_products, get_orders, update_product_stock, get_order_by_id, get_all_customers_dict, _get_orders_async, _get_all_customers_dict_async, _get_products_async, run_async
+from db import get_customers, get_products, get_orders, update_product_stock, get_order_by_id, order_version, get_table_versions, get_orders_for_export, get_all_customers_dict, _get_orders_async, _get_all_customers_dict_async, _get_products_async, _insert_order_errors_async, _get_catalog_error_counts_async, _get_orders_snapshot_key_async, _get_analytics_data_token_async, register_stock_listener, run_async
 from services.order_processor import OrderProcessor
 from services.pdf_service import PdfService
+from services.pdf_export import PdfExportService
 from services.analytics_service import AnalyticsService
+from services.analytics_snapshot import AnalyticsSnapshotStore
+from services.analytics_sql_backend import SqlAnalyticsBackend
 from services.info_extractor_service import InfoExtractorService
 from services.validator_service import ValidatorService
 from services.db_update_service import DBUpdateService
 from services.test_case_generator_service import TestCaseGeneratorService
+from services.warmup_service import WarmUpService
+from services.forecast_scheduler import ForecastScheduler
+from services.order_error_log import OrderErrorLog
+from services.result_cache import ResultCache
+from services.product_search import ProductSearchService
+from query_stats import query_stats
+from profiling import RequestProfile, SamplingProfiler, profile_store
+from response_encoding import compress_response, create_json_provider, json_array_chunks
 
 # Validate configuration
 Config.validate()
 
 # Initialize Flask app
 app = Flask(__name__)
+json_provider = create_json_provider(app)
+if json_provider is not None:
+    app.json = json_provider
 CORS(app, resources={r"/api/*": {"origins": Config.CORS_ORIGINS}})
 
 # Initialize services
 # analyst_service = AnalystService()
 info_extractor_service = InfoExtractorService()
-validator_service = ValidatorService()
+order_error_log = OrderErrorLog(_insert_order_errors_async)
+validator_service = ValidatorService(error_log=order_error_log)
 db_update_service = DBUpdateService()
 communications_service = CommunicationsService()
 pdf_service = PdfService()
+# Rendered PDFs keyed by (order id, order version); an edited order gets a new version and is re-rendered
+pdf_cache = ResultCache(max_entries=Config.PDF_CACHE_MAX_ENTRIES, max_bytes=Config.PDF_CACHE_MAX_BYTES)
+pdf_export_service = PdfExportService(Config.PDF_EXPORT_WORKERS, Config.PDF_EXPORT_WINDOW, Config.PDF_EXPORT_TIMEOUT_SECONDS)
 
 # Instantiate AnalyticsService
-analytics_service = AnalyticsService(_get_orders_async, _get_all_customers_dict_async, _get_products_async)
+analytics_service = AnalyticsService(
+    _get_orders_async, _get_all_customers_dict_async, _get_products_async,
+    get_catalog_error_counts_func=_get_catalog_error_counts_async,
+    sql_backend=SqlAnalyticsBackend() if Config.ANALYTICS_BACKEND == "sql" else None,
+    snapshot_store=AnalyticsSnapshotStore(
+        Config.ANALYTICS_SNAPSHOT_DIR, _get_orders_snapshot_key_async, keep=Config.ANALYTICS_SNAPSHOT_KEEP
+    ) if Config.ANALYTICS_SNAPSHOT_DIR else None,
+    get_data_token_func=_get_analytics_data_token_async,
+)
+# Keep inventory health current as orders and stock updates change product stock
+register_stock_listener(analytics_service.apply_stock_change)
 
-# Asynchronously load data into the analytics_service once at startup
-run_async(analytics_service.load_cached_data())
+# Product search index; stock changes apply in place, other catalog changes via the products version
+product_search_service = ProductSearchService(get_products, get_table_versions)
+register_stock_listener(product_search_service.apply_stock_change)
 
 # Instantiate TestCaseGeneratorService
 test_case_generator_service = TestCaseGeneratorService(get_customers, get_products)
 
+# Load caches in the background so Flask can start serving right away; /api/ready reports progress
+warmup_service = WarmUpService()
+warmup_service.add_task("analytics_cache", lambda: asyncio.run(analytics_service.load_cached_data()))
+warmup_service.add_task("test_case_generator_cache", test_case_generator_service.load_cached_data)
+warmup_service.add_task("product_search_index", product_search_service.load)
+
+# Refit the standard forecasts in the background once the analytics cache is warm
+forecast_scheduler = ForecastScheduler(analytics_service)
+if Config.FORECAST_SCHEDULER_ENABLED:
+    warmup_service.add_task("forecast_scheduler", forecast_scheduler.start, required=False)
+
 # Initialize order processor
 order_processor_instance = OrderProcessor(
     info_extractor_service_instance=info_extractor_service,
@@ -49,6 +104,131 @@ order_processor_instance = OrderProcessor(
     db_update_service_instance=db_update_service
 )
 
+def _route_label() -> str:
+    return f"{request.method} {request.url_rule.rule if request.url_rule else '(unmatched)'}"
+
+
+@app.before_request
+def start_request_profile():
+    """Sample the request thread when asked (?profile=1 or X-Profile: 1) with the admin token; see /api/debug/profiles."""
+    if (request.args.get("profile") == "1" or request.headers.get("X-Profile") == "1") and Config.ADMIN_TOKEN and _admin_authorized():
+        g.profiler = SamplingProfiler(threading.get_ident(), Config.PROFILE_INTERVAL_MS)
+        g.profiler.start()
+
+
+def _finish_request_profile(status) -> Optional[RequestProfile]:
+    profiler = g.pop("profiler", None)
+    if profiler is None:
+        return None
+    profiler.stop()
+    profile = RequestProfile(_route_label(), request.full_path.rstrip("?"), profiler, status)
+    profile_store.add(profile)
+    logger.info("Profiled %s: %.1f ms, %d samples (profile %s)", profile.label, profile.duration_ms, profile.samples, profile.id)
+    return profile
+
+
+@app.after_request
+def attach_request_profile(response):
+    profile = _finish_request_profile(response.status_code)
+    if profile is not None:
+        response.headers.set("X-Profile-Id", profile.id)
+        response.headers.set("X-Profile-Url", f"/api/debug/profiles/{profile.id}")
+    return response
+
+
+@app.after_request
+def compress(response):
+    # Registered after attach_request_profile, so it runs before it and is part of the profile
+    if Config.COMPRESSION_ENABLED:
+        response = compress_response(response, request.headers.get("Accept-Encoding", ""))
+    return response
+
+
+@app.teardown_request
+def end_request_profile(exc):
+    # Only still running when the handler raised past after_request
+    _finish_request_profile(500)
+
+
+@app.before_request
+def begin_query_scope():
+    """Attribute the request's SQL statements to its route (see /api/debug/queries)."""
+    g.query_scope = query_stats.begin(_route_label())
+
+
+@app.teardown_request
+def end_query_scope(exc):
+    handle = g.pop("query_scope", None)
+    if handle is not None:
+        query_stats.end(handle)
+
+
+def _admin_authorized() -> bool:
+    """Debug endpoints need Config.ADMIN_TOKEN in the X-Admin-Token header."""
+    token = request.headers.get("X-Admin-Token", "")
+    return hmac.compare_digest(token.encode("utf-8"), Config.ADMIN_TOKEN.encode("utf-8"))
+
+
+def _data_validators(tables, *parts) -> Optional[tuple]:
+    """(ETag, Last-Modified) of a response built from tables and request parts (an id, fields), from the table versions.
+
+    None when the versions are unavailable; the response is then sent without validators.
+    """
+    versions = get_table_versions()
+    # A None version: a write to the table may be in flight, so no tag is safe to hand out
+    if not versions or any(versions.get(table, (None,))[0] is None for table in tables):
+        return None
+    etag = hashlib.sha1(repr(([(table, versions[table][0]) for table in tables], parts)).encode("utf-8")).hexdigest()[:20]
+    changed = [versions[table][1] for table in tables if versions[table][1] is not None]
+    return etag, max(changed) if changed else None
+
+
+def _fields_arg(allowed: dict, implied=()) -> Optional[tuple]:
+    """Repository fields for the `fields` query parameter (comma-separated response keys), in allowed's order.
+
+    None when absent (every field); ValueError for a key not in allowed ({response key: repository field})
+    or implied (keys always sent, such as the id).
+    """
+    value = request.args.get('fields')
+    if value is None:
+        return None
+    requested = {name.strip() for name in value.split(",") if name.strip()} - set(implied)
+    unknown = requested - set(allowed)
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(sorted(unknown))}. Expected any of {', '.join(allowed)}")
+    return tuple(field for name, field in allowed.items() if name in requested)
+
+
+def _not_modified(validators) -> bool:
+    """Whether the client's copy is current: If-None-Match when sent, otherwise If-Modified-Since."""
+    etag, last_modified = validators
+    if request.if_none_match:
+        return request.if_none_match.contains_weak(etag)
+    return last_modified is not None and request.if_modified_since is not None and \
+        last_modified.replace(microsecond=0) <= request.if_modified_since
+
+
+def _with_validators(response, validators):
+    # Weak: the body may be sent gzip/brotli-encoded or not
+    etag, last_modified = validators
+    response.set_etag(etag, weak=True)
+    if last_modified is not None:
+        response.last_modified = last_modified
+    # Browsers may keep the list but must revalidate
+    response.headers.set('Cache-Control', 'private, no-cache')
+    return response
+
+
+@app.before_request
+def require_warm_analytics_cache():
+    """Analytics endpoints would answer from empty caches until the warm-up has loaded them."""
+    if request.path.startswith("/api/analytics/") and not warmup_service.is_ready():
+        response = jsonify({"error": "Analytics cache is warming up, retry shortly"})
+        response.status_code = 503
+        response.headers.set("Retry-After", "5")
+        return response
+
+
 @app.route("/api/process-order", methods=["POST"])
 def process_order():
     """Process order from email text using the new pipeline."""
@@ -59,41 +239,48 @@ def process_order():
         # print(f"[APP-PROCESS] Received email_text (first 100 chars): {email_text[:100]}...")
         # print("[APP-PROCESS] Calling OrderProcessor.process_order...")
         result = order_processor_instance.process_order(email_text)
+        if (result.get('order_update_result') or {}).get('order_id'):
+            forecast_scheduler.notify_new_order()
         # print(f"[APP-PROCESS] OrderProcessor.process_order returned: {result.get('order_id')}, Status: {result.get('order_status')}")
         return jsonify(result)
     except Exception as e:
-        print(f"[APP-PROCESS] Error processing order in endpoint: {e}")
+        logger.error("Error processing order in endpoint: %s", e)
         return jsonify({"error": str(e)}), 500
 
 
 @app.route("/api/get-orders", methods=["GET"])
 def get_orders_endpoint():
-    """Get all orders (basic info only)."""
+    """Get all orders (basic info only). Conditional on the orders/order_items versions (ETag, 304)."""
     try:
-        orders = get_orders()  # Should return a list of dicts
+        validators = _data_validators(("orders", "order_items"))
+        if validators and _not_modified(validators):
+            return _with_validators(make_response("", 304), validators)
+        orders = get_orders()  # OrderRecords
         # Only keep basic info for each order
-        basic_orders = [
-            {
-                "o_id": o.get("o_id") or o.get("order_id"),
-                "c_name": o.get("c_name"),
-                "o_placed_time": o.get("o_placed_time") or o.get("created_at"),
-                "o_status": o.get("o_status") or o.get("status"),
-                "total_value": o.get("total_value"),
-            }
-            for o in orders
-        ]
-        return jsonify({"orders": basic_orders})
+        basic_orders = [o.to_summary_dict() for o in orders]
+        if len(basic_orders) < Config.ORDERS_STREAM_MIN:
+            response = jsonify({"orders": basic_orders})
+        else:
+            # Serialized a chunk at a time, so the whole document is never held in memory
+            body = chain([b'{"orders":'], json_array_chunks(app.json, basic_orders, Config.ORDERS_STREAM_CHUNK), [b'}\n'])
+            response = Response(body, mimetype="application/json")
+        # An empty list may be a failed read; it is not given validators a client could revalidate against
+        return _with_validators(response, validators) if validators and basic_orders else response
     except Exception as e:
         return jsonify({"error": str(e)}), 500
     
 @app.route("/api/get-order/<order_id>", methods=["GET"])
 def get_order_detail(order_id):
-    """Get full details for a specific order, including items."""
+    """Get full details for a specific order, including items. Conditional on the orders/order_items versions."""
     try:
+        validators = _data_validators(("orders", "order_items"), order_id)
+        if validators and _not_modified(validators):
+            return _with_validators(make_response("", 304), validators)
         order = get_order_by_id(order_id)
         if not order:
             return jsonify({"error": "Order not found"}), 404
-        return jsonify({"order": order})
+        response = jsonify({"order": order})
+        return _with_validators(response, validators) if validators else response
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
@@ -104,30 +291,140 @@ def health_check():
     return jsonify({"status": "healthy", "message": "Two-Agent Order Processing Service is running"})
 
 
+@app.route("/api/ready", methods=["GET"])
+def readiness_check():
+    """Readiness check: 503 until the startup warm-up has loaded the caches."""
+    report = warmup_service.report()
+    report["import_seconds"] = round(APP_IMPORT_SECONDS, 3)
+    return jsonify(report), 200 if report["ready"] else 503
+
+
+@app.route("/api/debug/queries", methods=["GET", "DELETE"])
+def debug_queries():
+    """SQL statement statistics by fingerprint and route, slow queries and possible N+1 patterns.
+
+    Needs the admin token (404 when ADMIN_TOKEN is not set). DELETE clears the statistics; GET takes
+    `limit` (fingerprints listed, by total time, default 50).
+    """
+    if not Config.ADMIN_TOKEN:
+        return jsonify({"error": "Not found"}), 404
+    if not _admin_authorized():
+        return jsonify({"error": "Admin token required"}), 401
+    if request.method == "DELETE":
+        query_stats.reset()
+        return jsonify({"status": "reset"})
+    try:
+        limit = int(request.args.get('limit', 50))
+    except ValueError:
+        return jsonify({"error": "limit must be an integer"}), 400
+    return jsonify(query_stats.summary(limit=limit))
+
+
+@app.route("/api/debug/profiles", methods=["GET"])
+def debug_profiles():
+    """The stored request profiles, newest first (profile a request with ?profile=1 or X-Profile: 1)."""
+    if not Config.ADMIN_TOKEN:
+        return jsonify({"error": "Not found"}), 404
+    if not _admin_authorized():
+        return jsonify({"error": "Admin token required"}), 401
+    return jsonify({"profiles": profile_store.list()})
+
+
+@app.route("/api/debug/profiles/<profile_id>", methods=["GET"])
+def debug_profile(profile_id):
+    """A profile's top functions (`limit`, default 30), or with format=collapsed its stacks as a flamegraph input file."""
+    if not Config.ADMIN_TOKEN:
+        return jsonify({"error": "Not found"}), 404
+    if not _admin_authorized():
+        return jsonify({"error": "Admin token required"}), 401
+    profile = profile_store.get(profile_id)
+    if profile is None:
+        return jsonify({"error": f"Profile {profile_id} not found"}), 404
+    if request.args.get('format') == 'collapsed':
+        response = make_response(profile.collapsed())
+        response.headers.set("Content-Type", "text/plain; charset=utf-8")
+        response.headers.set("Content-Disposition", f"attachment; filename=profile-{profile.id}.collapsed")
+        return response
+    try:
+        limit = int(request.args.get('limit', 30))
+    except ValueError:
+        return jsonify({"error": "limit must be an integer"}), 400
+    return jsonify({**profile.summary(), "top_functions": profile.top_functions(limit)})
+
+
 @app.route("/api/customers", methods=["GET"])
 def get_customers_endpoint():
-    """Get available customers from database."""
+    """Get available customers from database. Conditional on the customers version (ETag, 304).
+
+    fields (e.g. fields=name) limits each customer to those of name, email and address; only their
+    columns are read.
+    """
+    try:
+        fields = _fields_arg({"name": "name", "email": "email", "address": "address"})
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
     try:
-        customers = get_customers()
-        return jsonify({"customers": customers})
+        validators = _data_validators(("customers",), fields)
+        if validators and _not_modified(validators):
+            return _with_validators(make_response("", 304), validators)
+        customers = get_customers(fields)
+        response = jsonify({"customers": customers})
+        return _with_validators(response, validators) if validators and customers else response
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
 
+# /api/products keys -> get_products fields
+PRODUCT_RESPONSE_FIELDS = {"p_name": "name", "p_price": "price", "p_stock": "stock"}
+
+
 @app.route("/api/products", methods=["GET"])
 def get_products_endpoint():
-    """Get available products from database."""
+    """Get available products from database. Conditional on the products version (ETag, 304).
+
+    fields (e.g. fields=p_name) limits each product to p_id and those of p_name, p_price and p_stock;
+    only their columns are read.
+    """
+    try:
+        fields = _fields_arg(PRODUCT_RESPONSE_FIELDS, implied=("p_id",))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
     try:
-        products_dict = get_products()
+        validators = _data_validators(("products",), fields)
+        if validators and _not_modified(validators):
+            return _with_validators(make_response("", 304), validators)
+        products_dict = get_products(fields)
+        keys = [(name, field) for name, field in PRODUCT_RESPONSE_FIELDS.items() if fields is None or field in fields]
         products = []
         for p_id, prod in products_dict.items():
-            products.append({
-                "p_id": p_id,
-                "p_name": prod.get("name"),
-                "p_price": prod.get("price"),
-                "p_stock": prod.get("stock"),
-            })
-        return jsonify({"products": products})
+            product = {"p_id": p_id}
+            for name, field in keys:
+                product[name] = prod.get(field)
+            products.append(product)
+        response = jsonify({"products": products})
+        return _with_validators(response, validators) if validators and products else response
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+
+@app.route("/api/products/search", methods=["GET"])
+def search_products_endpoint():
+    """Search products by name or id: q="stapl", "premum staplr" (typos), "p0042".
+
+    Every word must match; the last one may be a prefix. Returns up to limit (default 10, at most
+    100) products, best match first.
+    """
+    query = (request.args.get('q') or '').strip()
+    if not query:
+        return jsonify({"error": "q is required"}), 400
+    try:
+        limit = min(int(request.args.get('limit', 10)), 100)
+    except ValueError:
+        return jsonify({"error": "limit must be an integer"}), 400
+    try:
+        started = time.perf_counter()
+        results = product_search_service.search(query, limit)
+        return jsonify({"query": query, "results": results, "took_ms": round((time.perf_counter() - started) * 1000, 3)})
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
@@ -158,28 +455,85 @@ def analyze_order_only():
 
 @app.route("/api/generate-sales-order-pdf/<order_id>", methods=["GET"])
 def generate_sales_order_pdf_endpoint(order_id):
-    """Generate and return a sales order PDF for a specific order."""
+    """Generate and return a sales order PDF for a specific order.
+
+    The ETag is the order's version: a matching If-None-Match returns 304, and repeat downloads of
+    an unchanged order are served from pdf_cache without rendering.
+    """
     try:
-        orders = get_orders()
-        order = next((o for o in orders if (o.get("o_id") or o.get("order_id")) == order_id), None)
-        print(f"[APP-PDF] Order data fetched for PDF: {order}")
+        order = get_order_by_id(order_id)
         if not order:
             return jsonify({"error": "Order not found"}), 404
-        pdf_bytes = pdf_service.generate_sales_order_pdf(order)
-        response = make_response(pdf_bytes)
-        response.headers.set('Content-Type', 'application/pdf')
-        response.headers.set('Content-Disposition', f'attachment; filename=sales_order_{order_id}.pdf')
+        version = order_version(order)
+        if request.if_none_match.contains(version):
+            response = make_response("", 304)
+        else:
+            hit, pdf_bytes = pdf_cache.get((order_id, version))
+            if not hit:
+                pdf_bytes = pdf_service.generate_sales_order_pdf(order)
+                pdf_cache.put((order_id, version), pdf_bytes, size=len(pdf_bytes))
+            response = make_response(pdf_bytes)
+            response.headers.set('Content-Type', 'application/pdf')
+            response.headers.set('Content-Disposition', f'attachment; filename=sales_order_{order_id}.pdf')
+        response.set_etag(version)
+        # Browsers may keep the file but must revalidate, since orders can change
+        response.headers.set('Cache-Control', 'private, no-cache')
+        return response
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+
+@app.route("/api/export-sales-orders", methods=["GET"])
+def export_sales_orders_endpoint():
+    """Stream the sales order PDFs of all matching orders as a ZIP archive (format=zip) or one merged PDF (format=pdf).
+
+    Query parameters: start_date and end_date (YYYY-MM-DD, inclusive, UTC; end_date defaults to
+    start_date), status (e.g. Confirmed) and date_field ("placed" or "delivery").
+    """
+    try:
+        export_format = request.args.get('format', 'zip')
+        date_field = request.args.get('date_field', 'placed')
+        if export_format not in ("zip", "pdf") or date_field not in ("placed", "delivery"):
+            return jsonify({"error": "format must be zip or pdf and date_field must be placed or delivery"}), 400
+        start_arg = request.args.get('start_date')
+        if not start_arg:
+            return jsonify({"error": "start_date is required"}), 400
+        try:
+            start_date = datetime.strptime(start_arg, "%Y-%m-%d").replace(tzinfo=timezone.utc)
+            end_date = datetime.strptime(request.args.get('end_date', start_arg), "%Y-%m-%d").replace(tzinfo=timezone.utc) + timedelta(days=1)
+        except ValueError:
+            return jsonify({"error": "Dates must be YYYY-MM-DD"}), 400
+        status = request.args.get('status') or None
+
+        orders = get_orders_for_export(start_date, end_date, status, date_field)
+        if not orders:
+            return jsonify({"error": "No orders match the filters"}), 404
+        logger.info("Exporting %s sales orders as %s.", len(orders), export_format)
+        name = f"sales_orders_{start_arg}_{request.args.get('end_date', start_arg)}"
+        if export_format == "zip":
+            body, mimetype, filename = pdf_export_service.stream_zip(orders), "application/zip", f"{name}.zip"
+        else:
+            body, mimetype, filename = pdf_export_service.stream_merged(orders), "application/pdf", f"{name}.pdf"
+        response = Response(stream_with_context(body), mimetype=mimetype)
+        response.headers.set('Content-Disposition', f'attachment; filename={filename}')
+        response.headers.set('X-Order-Count', str(len(orders)))
         return response
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
 
+def _optional_bool_arg(name):
+    """True/False from a query parameter, or None (use the configured default) when it is absent."""
+    value = request.args.get(name)
+    return None if value is None else value.lower() in ("1", "true", "yes")
+
 @app.route("/api/analytics/kpis", methods=["GET"])
 def analytics_kpis_endpoint():
     try:
         time_filter = request.args.get('time_filter', 'last_30_days')
+        approximate = _optional_bool_arg('approximate')
         import asyncio
-        result = asyncio.run(analytics_service.get_kpis(time_filter=time_filter))
+        result = asyncio.run(analytics_service.get_kpis(time_filter=time_filter, approximate=approximate))
         return jsonify(result)
     except Exception as e:
         return jsonify({"error": str(e)}), 500
@@ -208,13 +562,13 @@ def analytics_order_status_endpoint():
 @app.route("/api/analytics/inventory-health", methods=["GET"])
 def analytics_inventory_health_endpoint():
     try:
-        print(f"[APP] Inventory Health endpoint hit")
+        logger.debug("Inventory Health endpoint hit")
         import asyncio
         result = asyncio.run(analytics_service.get_inventory_health())
-        print(f"[APP] Inventory Health endpoint returning result.")
+        logger.debug("Inventory Health endpoint returning result.")
         return jsonify(result)
     except Exception as e:
-        print(f"[APP] Error in Inventory Health endpoint: {e}")
+        logger.error("Error in Inventory Health endpoint: %s", e)
         return jsonify({"error": str(e)}), 500
 
 @app.route("/api/analytics/product-performance", methods=["GET"])
@@ -222,8 +576,9 @@ def analytics_product_performance_endpoint():
     try:
         time_filter = request.args.get('time_filter', 'all_time')
         top_n = int(request.args.get('top_n', 10))
+        approximate = _optional_bool_arg('approximate')
         import asyncio
-        result = asyncio.run(analytics_service.get_product_performance(time_filter=time_filter, top_n=top_n))
+        result = asyncio.run(analytics_service.get_product_performance(time_filter=time_filter, top_n=top_n, approximate=approximate))
         return jsonify(result)
     except Exception as e:
         return jsonify({"error": str(e)}), 500
@@ -234,9 +589,17 @@ def analytics_sales_forecast_endpoint():
         time_filter = request.args.get('time_filter', 'last_365_days')
         periods = int(request.args.get('periods', 3))
         granularity = request.args.get('granularity', 'month')
+        engine = request.args.get('engine')
+        precomputed = forecast_scheduler.get_sales_forecast(time_filter, periods, granularity, engine)
+        if precomputed:
+            response = jsonify(precomputed["result"])
+            response.headers.update(forecast_scheduler.freshness_headers(precomputed))
+            return response
         import asyncio
-        result = asyncio.run(analytics_service.get_sales_forecast(time_filter=time_filter, periods_to_forecast=periods, granularity=granularity))
-        return jsonify(result)
+        result = asyncio.run(analytics_service.get_sales_forecast(time_filter=time_filter, periods_to_forecast=periods, granularity=granularity, engine=engine))
+        response = jsonify(result)
+        response.headers.set("X-Forecast-Source", "live")
+        return response
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
@@ -247,8 +610,47 @@ def analytics_inventory_needs_forecast_endpoint():
         top_n = int(request.args.get('top_n', 5))
         periods = int(request.args.get('periods', 3))
         granularity = request.args.get('granularity', 'month')
+        engine = request.args.get('engine')
+        precomputed = forecast_scheduler.get_inventory_needs_forecast(time_filter, top_n, periods, granularity, engine)
+        if precomputed:
+            response = jsonify(precomputed["result"])
+            response.headers.update(forecast_scheduler.freshness_headers(precomputed))
+            return response
+        import asyncio
+        result = asyncio.run(analytics_service.get_inventory_needs_forecast(time_filter=time_filter, top_n_products=top_n, periods_to_forecast=periods, granularity=granularity, engine=engine))
+        response = jsonify(result)
+        response.headers.set("X-Forecast-Source", "live")
+        return response
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+@app.route("/api/analytics/reorder", methods=["GET"])
+def analytics_reorder_endpoint():
+    try:
+        lead_time_days = request.args.get('lead_time_days')
+        lead_time_days = None if lead_time_days is None else float(lead_time_days)
+        service_level = request.args.get('service_level')
+        service_level = None if service_level is None else float(service_level)
+        lookback_days = request.args.get('lookback_days')
+        lookback_days = None if lookback_days is None else int(lookback_days)
+        limit = int(request.args.get('limit', 100))
+    except ValueError:
+        return jsonify({"error": "lead_time_days and service_level must be numbers, lookback_days and limit integers"}), 400
+    if lead_time_days is not None and not lead_time_days >= 0:
+        return jsonify({"error": "lead_time_days must be 0 or more"}), 400
+    if service_level is not None and not 0 < service_level < 1:
+        return jsonify({"error": "service_level must be between 0 and 1 (exclusive)"}), 400
+    if lookback_days is not None and lookback_days < 1:
+        return jsonify({"error": "lookback_days must be at least 1"}), 400
+    if limit < 0:
+        return jsonify({"error": "limit must be 0 (all) or more"}), 400
+    try:
+        only_needed = request.args.get('only_needed', 'false').lower() == 'true'
         import asyncio
-        result = asyncio.run(analytics_service.get_inventory_needs_forecast(time_filter=time_filter, top_n_products=top_n, periods_to_forecast=periods, granularity=granularity))
+        result = asyncio.run(analytics_service.get_reorder_recommendations(
+            lead_time_days=lead_time_days, service_level=service_level, lookback_days=lookback_days,
+            limit=limit, only_needed=only_needed
+        ))
         return jsonify(result)
     except Exception as e:
         return jsonify({"error": str(e)}), 500
@@ -268,12 +670,17 @@ def analytics_catalog_suggestions_endpoint():
 def generate_test_cases_endpoint():
     """Generate test cases for order processing."""
     try:
+        if test_case_generator_service.customers is None or test_case_generator_service.products is None:
+            test_case_generator_service.load_cached_data()
         import asyncio
         result = asyncio.run(test_case_generator_service.generate_test_cases())
         return jsonify({"test_cases": result})
     except Exception as e:
-        print(f"[APP] Error generating test cases: {e}")
+        logger.error("Error generating test cases: %s", e)
         return jsonify({"error": str(e)}), 500
 
+APP_IMPORT_SECONDS = time.perf_counter() - _import_started
+warmup_service.start()
+
 if __name__ == "__main__":
     app.run(debug=Config.DEBUG, port=Config.PORT)
\ No newline at end of file
@@ -12,6 +12,114 @@ class Config:
     CORS_ORIGINS = ["http://localhost:3000", "https://ordersense.vercel.app"]
     GOOGLE_API_KEY = os.getenv("GOOGLE_API_KEY")
     GEMINI_MODEL = "gemini-1.5-flash"
+
+    # Logging (logging_setup.py): root level, per-logger levels ("db=DEBUG,services.analytics_service=WARNING"),
+    # "text" or "json" lines on stdout, queued records before dropping, and the share of sampled
+    # high-frequency debug events that are kept
+    LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
+    LOG_LEVELS = os.getenv("LOG_LEVELS", "")
+    LOG_FORMAT = os.getenv("LOG_FORMAT", "text")
+    LOG_QUEUE_SIZE = int(os.getenv("LOG_QUEUE_SIZE", "10000"))
+    LOG_SAMPLE_RATE = float(os.getenv("LOG_SAMPLE_RATE", "0.01"))
+
+    # SQL instrumentation (query_stats.py, /api/debug/queries): statements at or above QUERY_SLOW_MS go
+    # to the slow-query log; a request running one statement more than QUERY_N_PLUS_ONE_THRESHOLD
+    # times is flagged as a possible N+1
+    QUERY_INSTRUMENTATION_ENABLED = os.getenv("QUERY_INSTRUMENTATION_ENABLED", "true").lower() == "true"
+    QUERY_SLOW_MS = float(os.getenv("QUERY_SLOW_MS", "200"))
+    QUERY_SLOW_LOG_SIZE = int(os.getenv("QUERY_SLOW_LOG_SIZE", "100"))
+    QUERY_N_PLUS_ONE_THRESHOLD = int(os.getenv("QUERY_N_PLUS_ONE_THRESHOLD", "10"))
+
+    # On-demand request profiling (profiling.py): a request with ?profile=1 or "X-Profile: 1" and the
+    # admin token is sampled every PROFILE_INTERVAL_MS; the last PROFILE_STORE_SIZE profiles are kept
+    PROFILE_INTERVAL_MS = float(os.getenv("PROFILE_INTERVAL_MS", "2"))
+    PROFILE_STORE_SIZE = int(os.getenv("PROFILE_STORE_SIZE", "20"))
+
+    # JSON responses (response_encoding.py): "orjson" (falls back to "stdlib" when orjson is not
+    # installed) and gzip/brotli compression of JSON and text bodies of at least COMPRESSION_MIN_BYTES
+    JSON_PROVIDER = os.getenv("JSON_PROVIDER", "orjson")
+    COMPRESSION_ENABLED = os.getenv("COMPRESSION_ENABLED", "true").lower() == "true"
+    COMPRESSION_MIN_BYTES = int(os.getenv("COMPRESSION_MIN_BYTES", "1024"))
+    COMPRESSION_GZIP_LEVEL = int(os.getenv("COMPRESSION_GZIP_LEVEL", "6"))
+    COMPRESSION_BROTLI_QUALITY = int(os.getenv("COMPRESSION_BROTLI_QUALITY", "4"))
+    # /api/get-orders streams lists of at least this many orders in ORDERS_STREAM_CHUNK-order pieces
+    ORDERS_STREAM_MIN = int(os.getenv("ORDERS_STREAM_MIN", "5000"))
+    ORDERS_STREAM_CHUNK = int(os.getenv("ORDERS_STREAM_CHUNK", "1000"))
+
+    # ETags of /api/products, /api/customers and the order endpoints come from per-table versions,
+    # looked up at most once per TABLE_VERSIONS_TTL_SECONDS (writes by this process invalidate at once)
+    TABLE_VERSIONS_TTL_SECONDS = float(os.getenv("TABLE_VERSIONS_TTL_SECONDS", "1"))
+
+    # /api/products/search: the in-memory index checks the products version (and reloads changed
+    # products) at most once per PRODUCT_SEARCH_REFRESH_SECONDS; local stock changes apply at once
+    PRODUCT_SEARCH_REFRESH_SECONDS = float(os.getenv("PRODUCT_SEARCH_REFRESH_SECONDS", "10"))
+
+    # Token for the /api/debug/* endpoints (X-Admin-Token header); empty disables them
+    ADMIN_TOKEN = os.getenv("ADMIN_TOKEN", "")
+
+    # Data store behind db.py and DBUpdateService: "postgres" (Supabase via asyncpg) or "memory"
+    # (in-process, loaded with the MEMORY_REPOSITORY_PRESET synthetic dataset; no database needed)
+    REPOSITORY_BACKEND = os.getenv("REPOSITORY_BACKEND", "postgres")
+    MEMORY_REPOSITORY_PRESET = os.getenv("MEMORY_REPOSITORY_PRESET", "10k")
+    MEMORY_REPOSITORY_SEED = int(os.getenv("MEMORY_REPOSITORY_SEED", "0"))
+
+    # Analytics result cache (memoized AnalyticsService calls)
+    ANALYTICS_CACHE_MAX_ENTRIES = int(os.getenv("ANALYTICS_CACHE_MAX_ENTRIES", "256"))
+    ANALYTICS_CACHE_MAX_BYTES = int(os.getenv("ANALYTICS_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+    ANALYTICS_CACHE_BUCKET_SECONDS = int(os.getenv("ANALYTICS_CACHE_BUCKET_SECONDS", "300"))
+
+    # Where AnalyticsService aggregates orders: "memory" (cached orders) or "sql" (GROUP BY in Postgres)
+    ANALYTICS_BACKEND = os.getenv("ANALYTICS_BACKEND", "memory")
+    # Directory for memory-mapped order cache snapshots shared by workers; empty disables snapshots
+    ANALYTICS_SNAPSHOT_DIR = os.getenv("ANALYTICS_SNAPSHOT_DIR", "")
+    ANALYTICS_SNAPSHOT_KEEP = int(os.getenv("ANALYTICS_SNAPSHOT_KEEP", "2"))
+    # Approximate KPIs and product performance from per-day sketches (memory-backend only)
+    ANALYTICS_APPROXIMATE = os.getenv("ANALYTICS_APPROXIMATE", "false").lower() == "true"
+    ANALYTICS_HLL_PRECISION = int(os.getenv("ANALYTICS_HLL_PRECISION", "12"))
+    ANALYTICS_TOPK_CAPACITY = int(os.getenv("ANALYTICS_TOPK_CAPACITY", "200"))
+
+    # Products at or below this stock (and above zero) are reported as low stock
+    LOW_STOCK_THRESHOLD = int(os.getenv("LOW_STOCK_THRESHOLD", "5"))
+
+    # Reorder engine (/api/analytics/reorder)
+    REORDER_LEAD_TIME_DAYS = float(os.getenv("REORDER_LEAD_TIME_DAYS", "7"))
+    REORDER_SERVICE_LEVEL = float(os.getenv("REORDER_SERVICE_LEVEL", "0.95"))
+    REORDER_LOOKBACK_DAYS = int(os.getenv("REORDER_LOOKBACK_DAYS", "90"))
+    REORDER_EWMA_HALFLIFE_DAYS = float(os.getenv("REORDER_EWMA_HALFLIFE_DAYS", "14"))
+
+    # Rendered sales order PDFs, keyed by (order id, order version)
+    PDF_CACHE_MAX_ENTRIES = int(os.getenv("PDF_CACHE_MAX_ENTRIES", "256"))
+    PDF_CACHE_MAX_BYTES = int(os.getenv("PDF_CACHE_MAX_BYTES", str(16 * 1024 * 1024)))
+
+    # Batch PDF export (/api/export-sales-orders); 0 workers renders inline on the request thread
+    PDF_EXPORT_WORKERS = int(os.getenv("PDF_EXPORT_WORKERS", str(os.cpu_count() or 1)))
+    PDF_EXPORT_WINDOW = int(os.getenv("PDF_EXPORT_WINDOW", "32"))
+    PDF_EXPORT_TIMEOUT_SECONDS = float(os.getenv("PDF_EXPORT_TIMEOUT_SECONDS", "60"))
+
+    # Validation error event log (order_errors table)
+    ORDER_ERROR_LOG_BATCH_SIZE = int(os.getenv("ORDER_ERROR_LOG_BATCH_SIZE", "200"))
+    ORDER_ERROR_LOG_FLUSH_SECONDS = float(os.getenv("ORDER_ERROR_LOG_FLUSH_SECONDS", "2"))
+    ORDER_ERROR_LOG_MAX_QUEUE = int(os.getenv("ORDER_ERROR_LOG_MAX_QUEUE", "10000"))
+
+    # Forecast engine: "prophet", or a NumPy engine ("linear", "holt_winters", "seasonal_naive")
+    FORECAST_ENGINE = os.getenv("FORECAST_ENGINE", "holt_winters")
+
+    # Per-product Prophet fits (0 workers runs them inline on the request thread)
+    FORECAST_POOL_WORKERS = int(os.getenv("FORECAST_POOL_WORKERS", str(os.cpu_count() or 1)))
+    FORECAST_FIT_TIMEOUT_SECONDS = float(os.getenv("FORECAST_FIT_TIMEOUT_SECONDS", "30"))
+
+    # Startup warm-up: a failed required task (e.g. analytics cache load with the database down) keeps
+    # /api/ready at 503 and is retried every WARMUP_RETRY_SECONDS
+    WARMUP_RETRY_SECONDS = float(os.getenv("WARMUP_RETRY_SECONDS", "30"))
+
+    # Background forecast precomputation
+    FORECAST_SCHEDULER_ENABLED = os.getenv("FORECAST_SCHEDULER_ENABLED", "true").lower() == "true"
+    FORECAST_REFRESH_SECONDS = float(os.getenv("FORECAST_REFRESH_SECONDS", "900"))
+    FORECAST_REFRESH_AFTER_ORDERS = int(os.getenv("FORECAST_REFRESH_AFTER_ORDERS", "20"))
+    FORECAST_PRECOMPUTE_TIME_FILTERS = os.getenv("FORECAST_PRECOMPUTE_TIME_FILTERS", "last_365_days,all_time").split(",")
+    FORECAST_PRECOMPUTE_GRANULARITIES = os.getenv("FORECAST_PRECOMPUTE_GRANULARITIES", "month,week").split(",")
+    FORECAST_PRECOMPUTE_TOP_N = int(os.getenv("FORECAST_PRECOMPUTE_TOP_N", "5"))
+    FORECAST_PRECOMPUTE_PERIODS = int(os.getenv("FORECAST_PRECOMPUTE_PERIODS", "3"))
     
     @classmethod
     def validate(cls):
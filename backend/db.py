@@ -1,8 +1,16 @@
 import asyncpg
 import asyncio
+import hashlib
+import logging
 import os
+import time
+from collections import defaultdict
 from dotenv import load_dotenv
-from datetime import timezone
+from datetime import datetime, timedelta, timezone
+from config import Config
+from query_stats import InstrumentedConnection
+from records import OrderRecord, OrderItemRecord
+from repository import CUSTOMER_FIELDS, PRODUCT_FIELDS, VERSIONED_TABLES, PlacedOrder, Repository, StockReservationError, get_repository
 
 # Load environment variables from .env
 load_dotenv()
@@ -13,17 +21,21 @@ HOST = os.getenv("SUPABASE_HOST")
 PORT = os.getenv("SUPABASE_PORT", "5432")
 DBNAME = os.getenv("SUPABASE_DBNAME")
 
+logger = logging.getLogger(__name__)
+
 async def get_connection():
     try:
-        return await asyncpg.connect(
+        connection = await asyncpg.connect(
             user=USER,
             password=PASSWORD,
             host=HOST,
             port=PORT,
             database=DBNAME
         )
+        # Every statement is timed into query_stats (/api/debug/queries)
+        return InstrumentedConnection(connection) if Config.QUERY_INSTRUMENTATION_ENABLED else connection
     except Exception as e:
-        print(f"Failed to connect to Supabase: {e}")
+        logger.error("Failed to connect to Supabase: %s", e)
         return None
 
 def run_async(coro):
@@ -34,138 +46,541 @@ def run_async(coro):
         asyncio.set_event_loop(loop)
     return loop.run_until_complete(coro)
 
-def get_customers():
-    return run_async(_get_customers_async())
+# Per-table change counters behind the ETags of the catalog and order endpoints: <table>_version_seq
+# sequences, bumped by statement-level triggers (migrations/003_table_versions.sql). nextval() takes
+# no lock, but it is also visible before the writing transaction commits, so get_table_versions
+# reports no version for a table another transaction is writing (see there). False while the
+# sequences are missing or unreadable: the endpoints then answer without ETags
+_table_versions_available = True
 
-async def _get_customers_async():
-    connection = await get_connection()
-    if not connection:
-        print("Database connection failed.")
-        return {}
-    try:
-        rows = await connection.fetch(
-            "SELECT c_id, c_name, c_email, c_address FROM customers;"
-        )
-        customers = {}
-        for row in rows:
-            customers[row["c_id"]] = {
-                "name": row["c_name"],
-                "email": row["c_email"],
-                "address": row["c_address"]
-            }
-        await connection.close()
-        return customers
-    except Exception as e:
-        print(f"Error fetching customers: {e}")
-        await connection.close()
-        return {}
-
-def get_products():
-    return run_async(_get_products_async())
-
-async def _get_products_async():
-    connection = await get_connection()
-    if not connection:
-        print("Database connection failed.")
-        return {}
-    try:
-        rows = await connection.fetch(
-            "SELECT p_id, p_name, p_price, p_stock FROM products;"
-        )
-        products = {}
-        for row in rows:
-            products[row["p_id"]] = {
-                "name": row["p_name"],
-                "price": float(row["p_price"]),
-                "stock": row["p_stock"]
-            }
-        await connection.close()
-        return products
-    except Exception as e:
-        print(f"Error fetching products: {e}")
-        await connection.close()
-        return {}
+# Table locks held from a writing statement until its transaction ends; a plain SELECT ... FOR UPDATE
+# (RowShareLock) and VACUUM or concurrent index builds (ShareUpdateExclusiveLock) do not count
+_WRITE_LOCK_MODES = ["RowExclusiveLock", "ShareRowExclusiveLock", "ExclusiveLock", "AccessExclusiveLock"]
 
 
-def get_orders():
-    return run_async(_get_orders_async())
+class AsyncpgRepository(Repository):
+    """Repository over the Supabase Postgres database; every call opens its own connection."""
 
-async def _get_orders_async():
-    from datetime import datetime
-    print("[DB] _get_orders_async: Fetching all orders with items.")
-    connection = await get_connection()
-    if not connection:
-        print("Database connection failed.")
-        return []
-    try:
-        print("[DB] _get_orders_async: Executing orders fetch.")
-        # asyncpg automatically returns timezone-aware datetime objects for TIMESTAMPTZ columns
-        orders = await connection.fetch(
-            """
-            SELECT o_id, c_id, c_name, o_delivery_date, c_address, o_placed_time, o_status
-            FROM orders
-            ORDER BY o_placed_time DESC;
-            """
-        )
-        orders_list = []
-        for order in orders:
-            # print(f"[DB] _get_orders_async: Fetching items for order {order['o_id']}")
-            items = await connection.fetch(
-                "SELECT p_id, p_name, oi_qty, oi_price, oi_total FROM order_items WHERE o_id = $1;",
-                order["o_id"]
+    async def get_customers(self, fields=None):
+        fields = tuple(CUSTOMER_FIELDS) if fields is None else fields
+        connection = await get_connection()
+        if not connection:
+            logger.error("Database connection failed.")
+            return {}
+        try:
+            # Only the requested columns are read (column names come from CUSTOMER_FIELDS, never the request)
+            columns = [CUSTOMER_FIELDS[field] for field in fields]
+            rows = await connection.fetch(
+                f"SELECT {', '.join(['c_id'] + columns)} FROM customers;"
+            )
+            customers = {}
+            for row in rows:
+                customers[row["c_id"]] = {field: row[column] for field, column in zip(fields, columns)}
+            await connection.close()
+            return customers
+        except Exception as e:
+            logger.error("Error fetching customers: %s", e)
+            await connection.close()
+            return {}
+
+    async def get_products(self, fields=None):
+        fields = tuple(PRODUCT_FIELDS) if fields is None else fields
+        connection = await get_connection()
+        if not connection:
+            logger.error("Database connection failed.")
+            return {}
+        try:
+            # Only the requested columns are read (column names come from PRODUCT_FIELDS, never the request)
+            columns = [PRODUCT_FIELDS[field] for field in fields]
+            rows = await connection.fetch(
+                f"SELECT {', '.join(['p_id'] + columns)} FROM products;"
             )
-            items_list = [
-                {
-                    "p_id": item["p_id"],
-                    "p_name": item["p_name"],
-                    "oi_qty": item["oi_qty"],
-                    "oi_price": float(item["oi_price"]),
-                    "oi_total": float(item["oi_total"])
+            products = {}
+            for row in rows:
+                products[row["p_id"]] = {
+                    field: float(row[column]) if field == "price" else row[column]
+                    for field, column in zip(fields, columns)
                 }
-                for item in items
-            ]
+            await connection.close()
+            return products
+        except Exception as e:
+            logger.error("Error fetching products: %s", e)
+            await connection.close()
+            return {}
+
+    async def get_orders(self):
+        """All orders, newest first, as compact OrderRecords (call to_dict() to serialize)."""
+        logger.debug("_get_orders_async: Fetching all orders with items.")
+        connection = await get_connection()
+        if not connection:
+            logger.error("Database connection failed.")
+            return []
+        try:
+            logger.debug("_get_orders_async: Executing orders fetch.")
+            # asyncpg automatically returns timezone-aware datetime objects for TIMESTAMPTZ columns
+            orders = await connection.fetch(
+                """
+                SELECT o_id, c_id, c_name, o_delivery_date, c_address, o_placed_time, o_status
+                FROM orders
+                ORDER BY o_placed_time DESC;
+                """
+            )
+            orders_list = []
+            for order in orders:
+                # print(f"[DB] _get_orders_async: Fetching items for order {order['o_id']}")
+                items = await connection.fetch(
+                    "SELECT p_id, p_name, oi_qty, oi_price, oi_total FROM order_items WHERE o_id = $1;",
+                    order["o_id"]
+                )
+                # Total from the exact NUMERIC values, converted once
+                total = float(sum(item["oi_total"] for item in items))
+                orders_list.append(OrderRecord.from_row(order, tuple(OrderItemRecord.from_row(item) for item in items), total))
+            logger.debug("_get_orders_async: Closing connection after orders fetch.")
+            await connection.close()
+            logger.debug("_get_orders_async: Returning %s orders.", len(orders_list))
+            return orders_list
+        except Exception as e:
+            logger.error("Error in _get_orders_async: %s", e)
+            await connection.close()
+            return []
+
+    async def get_orders_fingerprint(self):
+        """String that changes whenever a column the order cache/snapshot stores changes; None if the
+        database is unreachable. Sums a 64-bit hash of every order and item row, so it reads both tables."""
+        connection = await get_connection()
+        if not connection:
+            logger.error("Database connection failed.")
+            return None
+        try:
+            # sum(bigint) is numeric, so the sums cannot overflow; ROW(...)::text tells NULL from ''
+            row = await connection.fetchrow(
+                """
+                SELECT
+                    (SELECT count(*) FROM orders) AS order_count,
+                    (SELECT coalesce(sum(hashtextextended(
+                        ROW(o_id, c_id, c_name, c_address, o_delivery_date, o_placed_time, o_status)::text, 0)), 0)
+                     FROM orders) AS order_hash,
+                    (SELECT count(*) FROM order_items) AS item_count,
+                    (SELECT coalesce(sum(hashtextextended(
+                        ROW(o_id, p_id, p_name, oi_qty, oi_price, oi_total)::text, 0)), 0)
+                     FROM order_items) AS item_hash;
+                """
+            )
+            await connection.close()
+            return ":".join(str(row[key]) for key in ("order_count", "order_hash", "item_count", "item_hash"))
+        except Exception as e:
+            logger.error("Error fetching orders fingerprint: %s", e)
+            await connection.close()
+            return None
+
+    async def get_table_versions(self):
+        """None when the database is unreachable or the version sequences are missing or unreadable.
+
+        A trigger's nextval() is visible before its transaction commits, so a version read while the
+        change is uncommitted would tag the old rows. Writers hold their table lock until commit:
+        after reading the sequences, a table another backend holds a write lock on gets version None
+        (unknown for now). Any bump already read has then committed, and a later write moves the
+        version again before it can commit.
+        """
+        global _table_versions_available
+        connection = await get_connection()
+        if not connection:
+            logger.error("Database connection failed.")
+            return None
+        try:
+            # The sequence oid keeps versions unique if a sequence is ever recreated
+            rows = await connection.fetch(
+                """
+                SELECT sequencename, last_value, (quote_ident(schemaname) || '.' || quote_ident(sequencename))::regclass::oid AS seq_oid
+                FROM pg_sequences
+                WHERE schemaname = current_schema() AND sequencename = ANY($1::text[]);
+                """,
+                [f"{table}_version_seq" for table in VERSIONED_TABLES]
+            )
+            # Only after the sequences: a writer that commits in between has bumped before we read
+            writing = await connection.fetch(
+                """
+                SELECT DISTINCT c.relname
+                FROM pg_locks l JOIN pg_class c ON c.oid = l.relation
+                WHERE l.locktype = 'relation' AND l.granted AND l.pid IS DISTINCT FROM pg_backend_pid()
+                  AND l.database = (SELECT oid FROM pg_database WHERE datname = current_database())
+                  AND l.mode = ANY($1::text[]) AND c.relnamespace = current_schema()::regnamespace
+                  AND c.relname = ANY($2::text[]);
+                """,
+                _WRITE_LOCK_MODES, list(VERSIONED_TABLES)
+            )
+            await connection.close()
+            in_flight = {row["relname"] for row in writing}
+            versions = {}
+            for row in rows:
+                if row["last_value"] is None:
+                    continue
+                table = row["sequencename"][:-len("_version_seq")]
+                versions[table] = (None if table in in_flight else f"{row['seq_oid']}.{row['last_value']}", None)
+            available = len(versions) == len(VERSIONED_TABLES)
+            if available != _table_versions_available:
+                if available:
+                    logger.info("Table versions available.")
+                else:
+                    logger.warning("Table versions unavailable (apply migrations/003_table_versions.sql and grant "
+                                   "SELECT on the sequences); responses go without ETags.")
+                _table_versions_available = available
+            return versions if available else None
+        except Exception as e:
+            logger.error("Error fetching table versions: %s", e)
+            await connection.close()
+            return None
+
+    async def update_product_stock(self, product_id, new_stock):
+        connection = await get_connection()
+        if not connection:
+            logger.error("Database connection failed.")
+            return None
+        try:
+            updated = await connection.fetchval(
+                "UPDATE products SET p_stock = $1 WHERE p_id = $2 RETURNING p_id;",
+                new_stock, product_id
+            )
+            await connection.close()
+            return updated is not None
+        except Exception as e:
+            logger.error("Error updating product stock: %s", e)
+            await connection.close()
+            return None
+
+    async def get_order_by_id(self, order_id):
+        connection = await get_connection()
+        if not connection:
+            logger.error("Database connection failed.")
+            return None
+        try:
+            order_row = await connection.fetchrow(
+                """
+                SELECT o_id, c_id, c_name, o_delivery_date, c_address, o_remarks, o_placed_time, o_status
+                FROM orders WHERE o_id = $1;
+                """,
+                order_id
+            )
+            if not order_row:
+                await connection.close()
+                return None
+            items = await connection.fetch(
+                "SELECT oi_id, p_id, p_name, oi_qty, oi_price, oi_total, oi_is_available FROM order_items WHERE o_id = $1 ORDER BY oi_id;",
+                order_id
+            )
+            items_list = [dict(item) for item in items]
             total = float(sum(item["oi_total"] for item in items))
-            order_dict = {
-                "o_id": order["o_id"],
-                "c_id": order["c_id"],
-                "c_name": order.get("c_name", ""),
-                "c_address": order.get("c_address", ""),
-                "o_delivery_date": order.get("o_delivery_date") or datetime(1970, 1, 1),
-                "o_placed_time": order["o_placed_time"],
-                "total_value": total,
-                "o_status": order["o_status"],
-                "items": items_list
-            }
-            # print(f"[DB] _get_orders_async: Order {order_dict['o_id']} customer info: {order_dict.get('c_name')}, {order_dict.get('c_address')}")
-            orders_list.append(order_dict)
-        print("[DB] _get_orders_async: Closing connection after orders fetch.")
-        await connection.close()
-        print(f"[DB] _get_orders_async: Returning {len(orders_list)} orders.")
-        return orders_list
-    except Exception as e:
-        print(f"[DB] Error in _get_orders_async: {e}")
-        await connection.close()
-        return []
+            order_dict = dict(order_row)
+            order_dict["items"] = items_list
+            order_dict["total_value"] = total
+            await connection.close()
+            return order_dict
+        except Exception as e:
+            logger.error("Error fetching order by id: %s", e)
+            await connection.close()
+            return None
+
+    async def get_orders_for_export(self, start_date, end_date, status=None, date_field="placed"):
+        """Orders with items (get_order_by_id shape) whose placed time or delivery date is in [start_date, end_date),
+        optionally with a given status (case-insensitive), oldest first. Items come from one query, not one per order."""
+        date_column = {"placed": "o_placed_time", "delivery": "o_delivery_date"}[date_field]
+        connection = await get_connection()
+        if not connection:
+            logger.error("Database connection failed.")
+            return []
+        try:
+            order_rows = await connection.fetch(
+                f"""
+                SELECT o_id, c_id, c_name, o_delivery_date, c_address, o_remarks, o_placed_time, o_status
+                FROM orders
+                WHERE {date_column} >= $1 AND {date_column} < $2
+                  AND ($3::text IS NULL OR lower(o_status) = lower($3::text))
+                ORDER BY {date_column}, o_id;
+                """,
+                start_date, end_date, status
+            )
+            item_rows = await connection.fetch(
+                "SELECT o_id, oi_id, p_id, p_name, oi_qty, oi_price, oi_total, oi_is_available FROM order_items WHERE o_id = ANY($1::text[]) ORDER BY o_id, oi_id;",
+                [row["o_id"] for row in order_rows]
+            )
+            await connection.close()
+            items_by_order = {}
+            for item in item_rows:
+                item = dict(item)
+                items_by_order.setdefault(item.pop("o_id"), []).append(item)
+            orders = []
+            for row in order_rows:
+                order = dict(row)
+                order["items"] = items_by_order.get(order["o_id"], [])
+                order["total_value"] = float(sum(item["oi_total"] for item in order["items"]))
+                order["c_name"] = order["c_name"] or ""
+                order["c_address"] = order["c_address"] or ""
+                orders.append(order)
+            logger.debug("_get_orders_for_export_async: %s orders, %s items.", len(orders), len(item_rows))
+            return orders
+        except Exception as e:
+            logger.error("Error fetching orders for export: %s", e)
+            await connection.close()
+            return []
+
+    async def get_all_customers_dict(self):
+        from datetime import datetime
+        logger.debug("_get_all_customers_dict_async: Fetching all customers.")
+        connection = await get_connection()
+        if not connection:
+            logger.error("Database connection failed.")
+            return {}
+        try:
+            logger.debug("_get_all_customers_dict_async: Executing customers fetch.")
+            # asyncpg automatically returns timezone-aware datetime objects for TIMESTAMPTZ columns
+            rows = await connection.fetch(
+                "SELECT c_id, c_name, c_email, c_address, c_created_time FROM customers;"
+            )
+            customers = {}
+            for row in rows:
+                customers[row["c_id"]] = {
+                    "name": row["c_name"],
+                    "email": row["c_email"],
+                    "address": row["c_address"],
+                    "created_time": row["c_created_time"]  # Already timezone-aware from asyncpg
+                }
+            logger.debug("_get_all_customers_dict_async: Closing connection after customers fetch.")
+            await connection.close()
+            logger.debug("_get_all_customers_dict_async: Returning %s customers.", len(customers))
+            return customers
+        except Exception as e:
+            logger.error("Error in _get_all_customers_dict_async: %s", e)
+            await connection.close()
+            return {}
+
+    async def insert_order_errors(self, events):
+        """Bulk insert (e_time, e_kind, p_id, p_name_norm, c_id, e_qty) tuples with COPY."""
+        connection = await get_connection()
+        if not connection:
+            logger.error("Database connection failed.")
+            return False
+        try:
+            await connection.copy_records_to_table(
+                "order_errors",
+                records=events,
+                columns=["e_time", "e_kind", "p_id", "p_name_norm", "c_id", "e_qty"]
+            )
+            await connection.close()
+            return True
+        except asyncpg.UndefinedTableError:
+            logger.error("order_errors table missing; apply migrations/001_order_errors.sql.")
+            await connection.close()
+            return False
+        except Exception as e:
+            logger.error("Error in _insert_order_errors_async: %s", e)
+            await connection.close()
+            return False
+
+    async def get_catalog_error_counts(self, start_date, end_date, top_n):
+        """Most requested problem items in [start_date, end_date]: (p_name_norm, request_count, last_requested)."""
+        connection = await get_connection()
+        if not connection:
+            logger.error("Database connection failed.")
+            return []
+        try:
+            rows = await connection.fetch(
+                """
+                SELECT p_name_norm, count(*) AS request_count, max(e_time) AS last_requested
+                FROM order_errors
+                WHERE e_time BETWEEN $1 AND $2
+                GROUP BY p_name_norm
+                ORDER BY request_count DESC, last_requested DESC
+                LIMIT $3;
+                """,
+                start_date, end_date, top_n
+            )
+            await connection.close()
+            return [dict(row) for row in rows]
+        except asyncpg.UndefinedTableError:
+            logger.error("order_errors table missing; apply migrations/001_order_errors.sql.")
+            await connection.close()
+            return []
+        except Exception as e:
+            logger.error("Error in _get_catalog_error_counts_async: %s", e)
+            await connection.close()
+            return []
+
+    async def place_order(self, customer_id, customer_name, customer_address, status, items):
+        connection = await get_connection()
+        if not connection:
+            raise ConnectionError("Database connection failed.")
+        try:
+            async with connection.transaction():
+                stock_changes = []
+                products = {}
+                needed = defaultdict(int)
+                for product_id, quantity in items:
+                    needed[product_id] += quantity
+                product_ids = sorted(needed)
+                if product_ids:
+                    # Every row is locked by one statement, in p_id order, before anything is updated,
+                    # so concurrent orders take their locks in the same order and cannot deadlock
+                    rows = await connection.fetch(
+                        "SELECT p_id, p_name, p_price, p_stock FROM products WHERE p_id = ANY($1::varchar[]) ORDER BY p_id FOR UPDATE;",
+                        product_ids
+                    )
+                    products = {row["p_id"]: row for row in rows}
+                    for product_id in product_ids:
+                        if product_id not in products:
+                            raise StockReservationError(f"Product {product_id} not found.")
+                        if needed[product_id] > products[product_id]["p_stock"]:
+                            raise StockReservationError(f"Insufficient stock for product {product_id} during update.")
+                    updated = await connection.fetch(
+                        """
+                        UPDATE products AS p SET p_stock = p.p_stock - v.qty
+                        FROM unnest($1::varchar[], $2::int[]) AS v(p_id, qty)
+                        WHERE p.p_id = v.p_id
+                        RETURNING p.p_id, p.p_stock;
+                        """,
+                        product_ids, [needed[product_id] for product_id in product_ids]
+                    )
+                    stock_changes = sorted((row["p_id"], row["p_stock"]) for row in updated)
+
+                # Concurrent transactions would otherwise read the same last id; the lock is
+                # released at commit. Sequences past 999 are longer, so order by length first.
+                await connection.execute("SELECT pg_advisory_xact_lock(hashtext('orders.o_id'));")
+                now = datetime.now()
+                prefix = f"ORD-{now.year}-"
+                last_order_id = await connection.fetchval(
+                    "SELECT o_id FROM orders WHERE o_id LIKE $1 ORDER BY length(o_id) DESC, o_id DESC LIMIT 1;",
+                    f"{prefix}%"
+                )
+                try:
+                    new_seq = int(last_order_id.split("-")[-1]) + 1 if last_order_id else 1
+                except ValueError:
+                    new_seq = 1
+                order_id = f"{prefix}{new_seq:03d}"
+
+                await connection.execute(
+                    """
+                    INSERT INTO orders (o_id, c_id, c_name, c_address, o_status, o_placed_time, o_delivery_date)
+                    VALUES ($1, $2, $3, $4, $5, $6, $7);
+                    """,
+                    order_id, customer_id, customer_name, customer_address, status, now, now + timedelta(days=3)
+                )
+                if items:
+                    await connection.executemany(
+                        """
+                        INSERT INTO order_items (o_id, p_id, p_name, oi_qty, oi_price, oi_total, oi_is_available)
+                        VALUES ($1, $2, $3, $4, $5, $6, $7);
+                        """,
+                        [
+                            (order_id, product_id, products[product_id]["p_name"], quantity,
+                             products[product_id]["p_price"], products[product_id]["p_price"] * quantity, True)
+                            for product_id, quantity in items
+                        ]
+                    )
+            return PlacedOrder(order_id, stock_changes)
+        finally:
+            await connection.close()
+
+
+# Module-level API: the configured repository (repository.get_repository) behind the functions the
+# services and routes have always imported
+
+def get_customers(fields=None):
+    return run_async(_get_customers_async(fields))
+
+async def _get_customers_async(fields=None):
+    """{c_id: {"name", "email", "address"}}; fields (CUSTOMER_FIELDS keys) limits the columns read."""
+    return await get_repository().get_customers(fields)
+
+def get_products(fields=None):
+    return run_async(_get_products_async(fields))
+
+async def _get_products_async(fields=None):
+    """{p_id: {"name", "price", "stock"}}; fields (PRODUCT_FIELDS keys) limits the columns read."""
+    return await get_repository().get_products(fields)
+
+def get_orders():
+    return run_async(_get_orders_async())
+
+async def _get_orders_async():
+    """All orders, newest first, as compact OrderRecords (call to_dict() to serialize)."""
+    return await get_repository().get_orders()
+
+async def _get_orders_fingerprint_async():
+    """String that changes whenever an order or item column of the order cache changes; None if the database is unreachable."""
+    return await get_repository().get_orders_fingerprint()
+
+async def _get_orders_snapshot_key_async():
+    """Key of the analytics snapshot: the orders and order_items versions, read without touching
+    either table. Falls back to the orders fingerprint, which scans both, where versions are
+    unavailable or a write to either table is in flight. None if the database is unreachable."""
+    versions = await _get_table_versions_async()
+    if versions and all(versions.get(table, (None,))[0] is not None for table in ("orders", "order_items")):
+        return f"versions:{versions['orders'][0]}:{versions['order_items'][0]}"
+    return await _get_orders_fingerprint_async()
+
+async def _get_table_versions_async():
+    """Uncached {table: (version, changed_at)}, or None; see get_table_versions."""
+    return await get_repository().get_table_versions()
+
+async def _get_analytics_data_token_async():
+    """Changes whenever a table the analytics cache reads changes: the table versions, or the
+    orders fingerprint where versions are unavailable. None if the database is unreachable or a
+    write to a versioned table is in flight."""
+    versions = await _get_table_versions_async()
+    if versions:
+        if any(version is None for version, _ in versions.values()):
+            # A write is in flight; unknown until it ends
+            return None
+        return tuple(sorted((table, version) for table, (version, _) in versions.items()))
+    return await _get_orders_fingerprint_async()
+
+# Callables (p_id, new_stock) run after every committed stock change made through this module
+# or DBUpdateService, e.g. to keep in-memory inventory views current
+_stock_listeners = []
+
+# (expires at, versions) of the last get_table_versions() lookup
+_table_versions_cache = (0.0, None)
+
+def get_table_versions():
+    """{table: (version, changed_at)} of the versioned tables, cached for Config.TABLE_VERSIONS_TTL_SECONDS.
+
+    Writes made by this process invalidate the cache at once; writes by other processes (workers,
+    direct edits) are seen within the TTL.
+    """
+    global _table_versions_cache
+    expires_at, versions = _table_versions_cache
+    if time.monotonic() < expires_at:
+        return versions
+    versions = run_async(_get_table_versions_async())
+    _table_versions_cache = (time.monotonic() + Config.TABLE_VERSIONS_TTL_SECONDS, versions)
+    return versions
+
+def invalidate_table_versions():
+    global _table_versions_cache
+    _table_versions_cache = (0.0, None)
+
+def register_stock_listener(listener):
+    _stock_listeners.append(listener)
+
+def notify_stock_changes(changes):
+    """Publish committed [(p_id, new_stock)] changes to the registered listeners."""
+    for product_id, new_stock in changes:
+        for listener in _stock_listeners:
+            try:
+                listener(product_id, new_stock)
+            except Exception as e:
+                logger.warning("Stock listener failed for %s: %s", product_id, e)
 
 def update_product_stock(product_id, new_stock):
     return run_async(_update_product_stock_async(product_id, new_stock))
 
 async def _update_product_stock_async(product_id, new_stock):
-    connection = await get_connection()
-    if not connection:
-        print("Database connection failed.")
-        return False
-    try:
-        await connection.execute(
-            "UPDATE products SET p_stock = $1 WHERE p_id = $2;",
-            new_stock, product_id
-        )
-        await connection.close()
-        return True
-    except Exception as e:
-        print(f"Error updating product stock: {e}")
-        await connection.close()
+    updated = await get_repository().update_product_stock(product_id, new_stock)
+    if updated is None:
         return False
+    if updated:
+        invalidate_table_versions()
+        notify_stock_changes([(product_id, new_stock)])
+    return True
 
 def get_order_by_id(order_id):
     order = run_async(_get_order_by_id_async(order_id))
@@ -178,77 +593,44 @@ def get_order_by_id(order_id):
         if 'o_delivery_date' not in order or order['o_delivery_date'] is None:
             from datetime import datetime
             order['o_delivery_date'] = datetime(1970, 1, 1)
-    print(f"[DB] get_order_by_id returning: {order}")
+    # The order itself is not logged: it can be large, and this runs on every order view
+    logger.debug("get_order_by_id %s: found=%s", order_id, order is not None)
     return order
 
 async def _get_order_by_id_async(order_id):
-    connection = await get_connection()
-    if not connection:
-        print("Database connection failed.")
-        return None
-    try:
-        order_row = await connection.fetchrow(
-            """
-            SELECT o_id, c_id, c_name, o_delivery_date, c_address, o_remarks, o_placed_time, o_status
-            FROM orders WHERE o_id = $1;
-            """,
-            order_id
-        )
-        if not order_row:
-            await connection.close()
-            return None
-        items = await connection.fetch(
-            "SELECT oi_id, p_id, p_name, oi_qty, oi_price, oi_total, oi_is_available FROM order_items WHERE o_id = $1;",
-            order_id
-        )
-        items_list = [dict(item) for item in items]
-        total = float(sum(item["oi_total"] for item in items))
-        order_dict = dict(order_row)
-        order_dict["items"] = items_list
-        order_dict["total_value"] = total
-        await connection.close()
-        return order_dict
-    except Exception as e:
-        print(f"Error fetching order by id: {e}")
-        await connection.close()
-        return None
+    return await get_repository().get_order_by_id(order_id)
 
-# New: async function to fetch all customers as dict with c_created_time
-async def _get_all_customers_dict_async():
-    from datetime import datetime
-    print("[DB] _get_all_customers_dict_async: Fetching all customers.")
-    connection = await get_connection()
-    if not connection:
-        print("Database connection failed.")
-        return {}
-    try:
-        print("[DB] _get_all_customers_dict_async: Executing customers fetch.")
-        # asyncpg automatically returns timezone-aware datetime objects for TIMESTAMPTZ columns
-        rows = await connection.fetch(
-            "SELECT c_id, c_name, c_email, c_address, c_created_time FROM customers;"
-        )
-        customers = {}
-        for row in rows:
-            customers[row["c_id"]] = {
-                "name": row["c_name"],
-                "email": row["c_email"],
-                "address": row["c_address"],
-                "created_time": row["c_created_time"]  # Already timezone-aware from asyncpg
-            }
-        print("[DB] _get_all_customers_dict_async: Closing connection after customers fetch.")
-        await connection.close()
-        print(f"[DB] _get_all_customers_dict_async: Returning {len(customers)} customers.")
-        return customers
-    except Exception as e:
-        print(f"[DB] Error in _get_all_customers_dict_async: {e}")
-        await connection.close()
-        return {}
+def get_orders_for_export(start_date, end_date, status=None, date_field="placed"):
+    return run_async(_get_orders_for_export_async(start_date, end_date, status, date_field))
 
-# Synchronous wrapper for _get_all_customers_dict_async
+async def _get_orders_for_export_async(start_date, end_date, status=None, date_field="placed"):
+    """Orders with items (get_order_by_id shape) whose placed time or delivery date is in [start_date, end_date),
+    optionally with a given status (case-insensitive), oldest first."""
+    return await get_repository().get_orders_for_export(start_date, end_date, status, date_field)
+
+def order_version(order):
+    """Short hash of an order dict from get_order_by_id; changes whenever the order or any of its items change."""
+    digest = hashlib.sha1()
+    for key in sorted(k for k in order if k != "items"):
+        digest.update(f"{key}={order[key]!r};".encode("utf-8"))
+    for item in order.get("items") or []:
+        digest.update(repr(sorted(item.items())).encode("utf-8"))
+    return digest.hexdigest()[:16]
 
 def get_all_customers_dict():
     return run_async(_get_all_customers_dict_async())
 
+async def _get_all_customers_dict_async():
+    return await get_repository().get_all_customers_dict()
+
+async def _insert_order_errors_async(events):
+    """Bulk insert (e_time, e_kind, p_id, p_name_norm, c_id, e_qty) validation error events."""
+    return await get_repository().insert_order_errors(events)
+
+async def _get_catalog_error_counts_async(start_date, end_date, top_n):
+    """Most requested problem items in [start_date, end_date]: (p_name_norm, request_count, last_requested)."""
+    return await get_repository().get_catalog_error_counts(start_date, end_date, top_n)
+
 if __name__ == "__main__":
     customers = get_customers()
     print("Customers:", customers)
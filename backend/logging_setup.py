@@ -0,0 +1,159 @@
+import atexit
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import random
+import sys
+import threading
+import time
+from datetime import datetime, timezone
+
+from config import Config
+
+# extra= for high-frequency debug events: only Config.LOG_SAMPLE_RATE of them are kept
+SAMPLED = {"sampled": True}
+
+# Arguments of these types can be formatted later on the listener thread; records with any other
+# argument (dicts, lists, objects) are formatted by the caller so later mutation cannot change them
+_IMMUTABLE_ARGS = (str, int, float, bool, type(None), bytes, datetime)
+
+# LogRecord attributes that are not structured fields
+_RECORD_ATTRS = set(vars(logging.makeLogRecord({}))) | {"message", "asctime", "sampled", "taskName"}
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line: time, level, logger, message, any extra= fields and the traceback."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "time": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRS:
+                entry[key] = value
+        if record.exc_info:
+            entry["exc_info"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+
+class SamplingFilter(logging.Filter):
+    """Keeps `rate` of the DEBUG records logged with extra=SAMPLED; everything else passes."""
+
+    def __init__(self, rate: float):
+        super().__init__()
+        self.rate = rate
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno > logging.DEBUG or not getattr(record, "sampled", False):
+            return True
+        return self.rate >= 1 or random.random() < self.rate
+
+
+class NonBlockingQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler that never blocks the logging thread and leaves formatting to the listener.
+
+    When the queue is full the record is dropped and counted; the count is reported by a warning
+    ahead of a later record, at most once a second, and at exit. A forked child (process pool
+    worker, pre-forked server worker) starts its own listener on first use, since the parent's
+    listener thread does not survive fork.
+    """
+
+    def __init__(self, handlers, queue_size: int):
+        self.handlers = handlers
+        self.queue_size = queue_size
+        self.dropped = 0
+        self._dropped_reported_at = 0.0
+        self._lock_listener = threading.Lock()
+        self._pid = None
+        self.listener = None
+        super().__init__(queue.Queue(queue_size))
+        self._start_listener()
+
+    def _start_listener(self):
+        with self._lock_listener:
+            if self._pid == os.getpid():
+                return
+            if self._pid is not None:
+                self.queue = queue.Queue(self.queue_size)
+            self.listener = logging.handlers.QueueListener(self.queue, *self.handlers, respect_handler_level=True)
+            self.listener.start()
+            self._pid = os.getpid()
+
+    def stop(self):
+        if self.listener is not None and self._pid == os.getpid():
+            if self.dropped:
+                self._dropped_reported_at = 0.0
+                self._report_dropped()
+            self.listener.stop()
+
+    def _report_dropped(self):
+        """Queue a warning with the number of dropped records, at most once a second."""
+        if self.dropped and time.monotonic() - self._dropped_reported_at >= 1:
+            self._dropped_reported_at = time.monotonic()
+            self.queue.put_nowait(logging.makeLogRecord({
+                "name": __name__, "levelno": logging.WARNING, "levelname": "WARNING",
+                "msg": "Dropped %d log records (queue full)", "args": (self.dropped,),
+            }))
+            self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        args = record.args
+        if args and not (isinstance(args, tuple) and all(isinstance(arg, _IMMUTABLE_ARGS) for arg in args)):
+            record.msg, record.args = record.getMessage(), None
+        return record
+
+    def enqueue(self, record: logging.LogRecord):
+        if self._pid != os.getpid():
+            self._start_listener()
+        try:
+            self._report_dropped()
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+def _parse_levels(spec: str) -> dict:
+    """'db=DEBUG,services.analytics_service=WARNING' -> {logger name: level name}"""
+    levels = {}
+    for entry in spec.split(","):
+        name, _, level = entry.partition("=")
+        if name.strip() and level.strip():
+            levels[name.strip()] = level.strip().upper()
+    return levels
+
+
+_handler = None
+
+
+def configure_logging() -> NonBlockingQueueHandler:
+    """Route all logging through one NonBlockingQueueHandler on the root logger (once per process).
+
+    Levels come from Config.LOG_LEVEL (root) and Config.LOG_LEVELS (per logger, e.g. "db=DEBUG");
+    records are written to stdout as text or JSON (Config.LOG_FORMAT) by the listener thread.
+    """
+    global _handler
+    if _handler is not None:
+        return _handler
+    stream = logging.StreamHandler(sys.stdout)
+    if Config.LOG_FORMAT == "json":
+        stream.setFormatter(JsonFormatter())
+    else:
+        stream.setFormatter(logging.Formatter("%(asctime)s %(levelname)s [%(name)s] %(message)s"))
+    _handler = NonBlockingQueueHandler([stream], Config.LOG_QUEUE_SIZE)
+    _handler.addFilter(SamplingFilter(Config.LOG_SAMPLE_RATE))
+
+    root = logging.getLogger()
+    for existing in list(root.handlers):
+        root.removeHandler(existing)
+    root.addHandler(_handler)
+    root.setLevel(Config.LOG_LEVEL.upper())
+    for name, level in _parse_levels(Config.LOG_LEVELS).items():
+        logging.getLogger(name).setLevel(level)
+    # Flush what is still queued when the process exits
+    atexit.register(_handler.stop)
+    return _handler
@@ -0,0 +1,13 @@
+-- Validation error events (products not found, stock shortfalls) behind
+-- /api/analytics/suggest-catalog-items; written in batches by services/order_error_log.py
+CREATE TABLE IF NOT EXISTS order_errors (
+    e_id BIGSERIAL PRIMARY KEY,
+    e_time TIMESTAMPTZ NOT NULL DEFAULT now(),
+    e_kind VARCHAR(32) NOT NULL,
+    p_id VARCHAR,
+    p_name_norm VARCHAR NOT NULL,
+    c_id VARCHAR,
+    e_qty INTEGER
+);
+
+CREATE INDEX IF NOT EXISTS idx_order_errors_time_name ON order_errors (e_time, p_name_norm);
@@ -0,0 +1,6 @@
+-- Indexes for ANALYTICS_BACKEND=sql (services/analytics_sql_backend.py): date-range scans of orders
+-- and the join to their items. CONCURRENTLY builds without blocking order inserts; it cannot run
+-- inside a transaction, so apply this file without --single-transaction. A build that fails
+-- leaves an INVALID index: drop it and re-run.
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_orders_placed_time ON orders (o_placed_time) INCLUDE (o_id, o_status);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_order_items_o_id ON order_items (o_id) INCLUDE (p_id, oi_qty, oi_total);
@@ -0,0 +1,35 @@
+-- Per-table change counters behind the ETags of the catalog and order endpoints (see "Conditional
+-- GET" in the README). A statement-level trigger on each versioned table calls nextval() on the
+-- table's <table>_version_seq. Sequences take no row locks, so concurrent writers never queue on
+-- or deadlock over a shared counter row. The app reads last_value through pg_sequences.
+-- The role the app writes with needs USAGE on the sequences and SELECT to read them.
+
+CREATE SEQUENCE IF NOT EXISTS customers_version_seq;
+CREATE SEQUENCE IF NOT EXISTS products_version_seq;
+CREATE SEQUENCE IF NOT EXISTS orders_version_seq;
+CREATE SEQUENCE IF NOT EXISTS order_items_version_seq;
+
+CREATE OR REPLACE FUNCTION bump_table_version() RETURNS trigger AS $$
+BEGIN
+    PERFORM nextval(format('%I.%I', TG_TABLE_SCHEMA, TG_TABLE_NAME || '_version_seq')::regclass);
+    RETURN NULL;
+END
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS customers_version ON customers;
+CREATE TRIGGER customers_version AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON customers
+    FOR EACH STATEMENT EXECUTE FUNCTION bump_table_version();
+DROP TRIGGER IF EXISTS products_version ON products;
+CREATE TRIGGER products_version AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON products
+    FOR EACH STATEMENT EXECUTE FUNCTION bump_table_version();
+DROP TRIGGER IF EXISTS orders_version ON orders;
+CREATE TRIGGER orders_version AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON orders
+    FOR EACH STATEMENT EXECUTE FUNCTION bump_table_version();
+DROP TRIGGER IF EXISTS order_items_version ON order_items;
+CREATE TRIGGER order_items_version AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON order_items
+    FOR EACH STATEMENT EXECUTE FUNCTION bump_table_version();
+
+-- last_value reads as NULL until a sequence is first used. Start every counter so NULL can only
+-- mean that the reading role lacks the privilege.
+SELECT nextval('customers_version_seq'), nextval('products_version_seq'),
+       nextval('orders_version_seq'), nextval('order_items_version_seq');
@@ -0,0 +1,42 @@
+# backend/process_pool.py
+import atexit
+import logging
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+logger = logging.getLogger(__name__)
+
+# Named, lazily created process pools shared by the services in this worker process.
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def get_process_pool(name: str, max_workers: int) -> ProcessPoolExecutor:
+    """Return the process pool registered under name, creating it on first use."""
+    with _pools_lock:
+        pool = _pools.get(name)
+        if pool is None:
+            logger.info("Starting pool '%s' with %s workers.", name, max_workers)
+            pool = ProcessPoolExecutor(max_workers=max_workers)
+            _pools[name] = pool
+        return pool
+
+
+def reset_process_pool(name: str):
+    """Drop a (typically broken) pool so the next get_process_pool call starts a fresh one."""
+    with _pools_lock:
+        pool = _pools.pop(name, None)
+    if pool is not None:
+        logger.warning("Resetting pool '%s'.", name)
+        pool.shutdown(wait=False, cancel_futures=True)
+
+
+def shutdown_process_pools():
+    with _pools_lock:
+        pools = list(_pools.values())
+        _pools.clear()
+    for pool in pools:
+        pool.shutdown(wait=False, cancel_futures=True)
+
+
+atexit.register(shutdown_process_pools)
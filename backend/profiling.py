@@ -0,0 +1,130 @@
+import os
+import sys
+import threading
+import time
+import uuid
+from collections import Counter, OrderedDict
+from datetime import datetime, timezone
+from typing import Optional
+
+from config import Config
+
+_BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def _frame_label(code, labels: dict) -> str:
+    """'function (file:line)' for a code object; files under backend/ relative to it, others by their last two parts."""
+    label = labels.get(code)
+    if label is None:
+        filename = code.co_filename
+        if filename.startswith(_BACKEND_DIR + os.sep):
+            filename = os.path.relpath(filename, _BACKEND_DIR)
+        else:
+            filename = os.sep.join(filename.split(os.sep)[-2:])
+        # ";" separates frames in collapsed-stack lines
+        label = f"{code.co_name} ({filename}:{code.co_firstlineno})".replace(";", ":")
+        labels[code] = label
+    return label
+
+
+class SamplingProfiler:
+    """Samples one thread's Python stack every interval from a background thread.
+
+    Everything the thread runs is covered, including coroutines driven by asyncio.run/run_async on
+    it; work handed to other threads or to process pools shows up as the wait for its result.
+    """
+
+    def __init__(self, thread_id: int, interval_ms: float):
+        self.thread_id = thread_id
+        self.interval = interval_ms / 1000
+        self.stacks = Counter()
+        self._labels = {}
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="request-profiler", daemon=True)
+        self.started = None
+        self.seconds = 0.0
+
+    def start(self):
+        self.started = time.perf_counter()
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+        self.seconds = time.perf_counter() - self.started
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                stack.append(_frame_label(frame.f_code, self._labels))
+                frame = frame.f_back
+            if stack:
+                # Root first, as collapsed-stack files expect
+                self.stacks[tuple(reversed(stack))] += 1
+
+
+class RequestProfile:
+    """One finished profile: sampled stacks of a request and their aggregates."""
+
+    def __init__(self, label: str, url: str, profiler: SamplingProfiler, status: Optional[int]):
+        self.id = uuid.uuid4().hex[:12]
+        self.label = label
+        self.url = url
+        self.status = status
+        self.created = datetime.now(timezone.utc)
+        self.duration_ms = round(profiler.seconds * 1000, 3)
+        self.interval_ms = profiler.interval * 1000
+        self.stacks = profiler.stacks
+        self.samples = sum(profiler.stacks.values())
+
+    def collapsed(self) -> str:
+        """Brendan Gregg's collapsed-stack format ("root;...;leaf count" per line), for flamegraph.pl or speedscope."""
+        return "".join(f"{';'.join(stack)} {count}\n" for stack, count in self.stacks.most_common())
+
+    def top_functions(self, limit: int = 30) -> list:
+        """Functions by self samples (where the thread was when sampled), then by inclusive samples."""
+        own, inclusive = Counter(), Counter()
+        for stack, count in self.stacks.items():
+            own[stack[-1]] += count
+            for function in set(stack):
+                inclusive[function] += count
+        return [
+            {"function": function, "total_samples": total, "self_samples": own[function],
+             "total_pct": round(100 * total / self.samples, 1), "self_pct": round(100 * own[function] / self.samples, 1)}
+            for function, total in sorted(inclusive.items(), key=lambda item: (own[item[0]], item[1]), reverse=True)[:limit]
+        ]
+
+    def summary(self) -> dict:
+        return {
+            "id": self.id, "endpoint": self.label, "url": self.url, "status": self.status,
+            "created": self.created.isoformat(timespec="seconds"), "duration_ms": self.duration_ms,
+            "interval_ms": self.interval_ms, "samples": self.samples,
+        }
+
+
+class ProfileStore:
+    """The last `size` request profiles, newest last."""
+
+    def __init__(self, size: int):
+        self.size = size
+        self._profiles = OrderedDict()
+        self._lock = threading.Lock()
+
+    def add(self, profile: RequestProfile):
+        with self._lock:
+            self._profiles[profile.id] = profile
+            while len(self._profiles) > self.size:
+                self._profiles.popitem(last=False)
+
+    def get(self, profile_id: str) -> Optional[RequestProfile]:
+        with self._lock:
+            return self._profiles.get(profile_id)
+
+    def list(self) -> list:
+        with self._lock:
+            return [profile.summary() for profile in reversed(self._profiles.values())]
+
+
+profile_store = ProfileStore(Config.PROFILE_STORE_SIZE)
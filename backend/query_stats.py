@@ -0,0 +1,218 @@
+import contextvars
+import hashlib
+import logging
+import re
+import threading
+import time
+from collections import Counter, deque
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from functools import lru_cache
+from typing import Optional
+
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL = re.compile(r"(?<![\w$])-?\d+(?:\.\d+)?\b")
+_IN_LIST = re.compile(r"\bIN\s*\((?:\s*\?\s*,)*\s*\?\s*\)", re.IGNORECASE)
+_WHITESPACE = re.compile(r"\s+")
+
+
+@lru_cache(maxsize=1024)
+def fingerprint(statement: str) -> tuple:
+    """(id, normalized statement): literals replaced by ?, whitespace collapsed; $n parameters are kept."""
+    normalized = _STRING_LITERAL.sub("?", statement)
+    normalized = _NUMBER_LITERAL.sub("?", normalized)
+    normalized = _IN_LIST.sub("IN (?)", normalized)
+    normalized = _WHITESPACE.sub(" ", normalized).strip().rstrip(";")
+    return hashlib.sha1(normalized.encode("utf-8")).hexdigest()[:12], normalized
+
+
+def _row_count(method: str, result, args) -> int:
+    if method == "fetch":
+        return len(result)
+    if method in ("fetchrow", "fetchval"):
+        return int(result is not None)
+    if method == "executemany":
+        return len(args[0]) if args else 0
+    # execute / copy_*: status strings such as "UPDATE 3", "INSERT 0 1", "COPY 500"
+    last = str(result or "").rsplit(" ", 1)[-1]
+    return int(last) if last.isdigit() else 0
+
+
+class _Scope:
+    """Queries of one request (or background task), per fingerprint."""
+
+    def __init__(self, label: str):
+        self.label = label
+        self.counts = Counter()
+        self.seconds = Counter()
+        self.statements = {}
+
+
+_current_scope: contextvars.ContextVar[Optional[_Scope]] = contextvars.ContextVar("query_scope", default=None)
+
+
+class QueryStats:
+    """Process-wide statement statistics, slow-query log and N+1 flags.
+
+    Statements are aggregated by fingerprint. A statement slower than slow_ms goes to a bounded log;
+    a scope (request) that runs one fingerprint more than n_plus_one_threshold times is flagged.
+    asyncio tasks inherit the scope of the thread that runs them, so run_async queries count
+    toward the request that issued them.
+    """
+
+    def __init__(self, slow_ms: float, slow_log_size: int, n_plus_one_threshold: int):
+        self.slow_ms = slow_ms
+        self.n_plus_one_threshold = n_plus_one_threshold
+        self._lock = threading.Lock()
+        self._slow_log_size = slow_log_size
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.since = datetime.now(timezone.utc)
+            self._fingerprints = {}
+            self._scopes = {}
+            self._slow = deque(maxlen=self._slow_log_size)
+            self._n_plus_one = deque(maxlen=self._slow_log_size)
+
+    def record(self, statement: str, seconds: float, rows: int, error: bool = False):
+        fingerprint_id, normalized = fingerprint(statement)
+        scope = _current_scope.get()
+        label = scope.label if scope else None
+        if scope:
+            scope.counts[fingerprint_id] += 1
+            scope.seconds[fingerprint_id] += seconds
+            scope.statements[fingerprint_id] = normalized
+        with self._lock:
+            entry = self._fingerprints.get(fingerprint_id)
+            if entry is None:
+                entry = self._fingerprints[fingerprint_id] = {
+                    "fingerprint": fingerprint_id, "statement": normalized, "count": 0, "errors": 0,
+                    "total_ms": 0.0, "max_ms": 0.0, "rows": 0, "endpoints": Counter(),
+                }
+            entry["count"] += 1
+            entry["errors"] += int(error)
+            entry["total_ms"] += seconds * 1000
+            entry["max_ms"] = max(entry["max_ms"], seconds * 1000)
+            entry["rows"] += rows
+            entry["endpoints"][label or "(no request)"] += 1
+            if seconds * 1000 >= self.slow_ms:
+                self._slow.append({
+                    "time": datetime.now(timezone.utc).isoformat(timespec="milliseconds"), "fingerprint": fingerprint_id,
+                    "statement": normalized, "duration_ms": round(seconds * 1000, 3), "rows": rows, "endpoint": label,
+                })
+        if seconds * 1000 >= self.slow_ms:
+            logger.warning("Slow query (%.1f ms, %d rows, %s): %s", seconds * 1000, rows, label, normalized[:200])
+
+    def begin(self, label: str) -> tuple:
+        """Attribute the queries run from here (in this thread and tasks it starts) to label; pass the result to end()."""
+        scope = _Scope(label)
+        return scope, _current_scope.set(scope)
+
+    def end(self, handle: tuple):
+        """Close a begin() scope: record its totals and flag fingerprints it ran too often."""
+        scope, token = handle
+        _current_scope.reset(token)
+        self._finish(scope)
+
+    @contextmanager
+    def scope(self, label: str):
+        handle = self.begin(label)
+        try:
+            yield handle[0]
+        finally:
+            self.end(handle)
+
+    def _finish(self, scope: _Scope):
+        queries = sum(scope.counts.values())
+        repeated = [(fp, count) for fp, count in scope.counts.items() if count > self.n_plus_one_threshold]
+        with self._lock:
+            totals = self._scopes.setdefault(scope.label, {"requests": 0, "queries": 0, "total_ms": 0.0, "max_queries": 0})
+            totals["requests"] += 1
+            totals["queries"] += queries
+            totals["total_ms"] += sum(scope.seconds.values()) * 1000
+            totals["max_queries"] = max(totals["max_queries"], queries)
+            for fingerprint_id, count in repeated:
+                self._n_plus_one.append({
+                    "time": datetime.now(timezone.utc).isoformat(timespec="milliseconds"), "endpoint": scope.label,
+                    "fingerprint": fingerprint_id, "statement": scope.statements[fingerprint_id],
+                    "count": count, "total_ms": round(scope.seconds[fingerprint_id] * 1000, 3),
+                })
+        for fingerprint_id, count in repeated:
+            logger.warning("Possible N+1: %s ran %s %d times", scope.label, fingerprint_id, count)
+
+    def summary(self, limit: int = 50) -> dict:
+        with self._lock:
+            fingerprints = sorted(self._fingerprints.values(), key=lambda entry: entry["total_ms"], reverse=True)
+            return {
+                "since": self.since.isoformat(timespec="seconds"),
+                "slow_ms": self.slow_ms,
+                "n_plus_one_threshold": self.n_plus_one_threshold,
+                "total_queries": sum(entry["count"] for entry in fingerprints),
+                "total_ms": round(sum(entry["total_ms"] for entry in fingerprints), 3),
+                "fingerprints": [
+                    {**entry, "total_ms": round(entry["total_ms"], 3), "max_ms": round(entry["max_ms"], 3),
+                     "mean_ms": round(entry["total_ms"] / entry["count"], 3), "endpoints": dict(entry["endpoints"].most_common(5))}
+                    for entry in fingerprints[:limit]
+                ],
+                "endpoints": {
+                    label: {**totals, "total_ms": round(totals["total_ms"], 3),
+                            "queries_per_request": round(totals["queries"] / totals["requests"], 2)}
+                    for label, totals in sorted(self._scopes.items(), key=lambda item: item[1]["total_ms"], reverse=True)
+                },
+                "slow_queries": list(reversed(self._slow)),
+                "n_plus_one": list(reversed(self._n_plus_one)),
+            }
+
+
+query_stats = QueryStats(Config.QUERY_SLOW_MS, Config.QUERY_SLOW_LOG_SIZE, Config.QUERY_N_PLUS_ONE_THRESHOLD)
+
+
+class InstrumentedConnection:
+    """asyncpg connection proxy that times every statement into query_stats.
+
+    fetch, fetchrow, fetchval, execute, executemany and the COPY helpers are recorded; everything else
+    (transaction, close, ...) goes straight to the connection.
+    """
+
+    def __init__(self, connection, stats: QueryStats = query_stats):
+        self._connection = connection
+        self._stats = stats
+
+    async def _run(self, method: str, statement: str, args, kwargs):
+        started = time.perf_counter()
+        try:
+            result = await getattr(self._connection, method)(*args, **kwargs)
+        except Exception:
+            self._stats.record(statement, time.perf_counter() - started, 0, error=True)
+            raise
+        self._stats.record(statement, time.perf_counter() - started, _row_count(method, result, args[1:]))
+        return result
+
+    async def fetch(self, query, *args, **kwargs):
+        return await self._run("fetch", query, (query, *args), kwargs)
+
+    async def fetchrow(self, query, *args, **kwargs):
+        return await self._run("fetchrow", query, (query, *args), kwargs)
+
+    async def fetchval(self, query, *args, **kwargs):
+        return await self._run("fetchval", query, (query, *args), kwargs)
+
+    async def execute(self, query, *args, **kwargs):
+        return await self._run("execute", query, (query, *args), kwargs)
+
+    async def executemany(self, command, args, **kwargs):
+        return await self._run("executemany", command, (command, args), kwargs)
+
+    async def copy_records_to_table(self, table_name, **kwargs):
+        return await self._run("copy_records_to_table", f"COPY {table_name} FROM STDIN (records)", (table_name,), kwargs)
+
+    async def copy_to_table(self, table_name, **kwargs):
+        return await self._run("copy_to_table", f"COPY {table_name} FROM STDIN", (table_name,), kwargs)
+
+    def __getattr__(self, name):
+        return getattr(self._connection, name)
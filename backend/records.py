@@ -0,0 +1,96 @@
+import sys
+from datetime import datetime
+from typing import NamedTuple, Optional, Tuple
+
+# Delivery date reported for orders without one; only filled in when serializing.
+DEFAULT_DELIVERY_DATE = datetime(1970, 1, 1)
+
+
+def intern_str(value: Optional[str]) -> Optional[str]:
+    """Intern a repeated string (ids, names, statuses) so every record shares one copy."""
+    return sys.intern(value) if isinstance(value, str) else value
+
+
+class OrderItemRecord(NamedTuple):
+    p_id: str
+    p_name: str
+    oi_qty: int
+    oi_price: float
+    oi_total: float
+
+    @classmethod
+    def from_row(cls, row) -> "OrderItemRecord":
+        return cls(
+            intern_str(row["p_id"]),
+            intern_str(row["p_name"] or ""),
+            row["oi_qty"] or 0,
+            float(row["oi_price"] or 0),
+            float(row["oi_total"] or 0),
+        )
+
+    def to_dict(self) -> dict:
+        return self._asdict()
+
+
+class OrderRecord(NamedTuple):
+    """Compact cached order. Tuples carry no per-instance __dict__ and no repeated key strings."""
+
+    o_id: str
+    c_id: str
+    c_name: str
+    c_address: str
+    o_delivery_date: Optional[datetime]
+    o_placed_time: datetime
+    total_value: float
+    o_status: str
+    items: Tuple[OrderItemRecord, ...]
+
+    @classmethod
+    def from_row(cls, row, items: Tuple[OrderItemRecord, ...], total_value: Optional[float] = None) -> "OrderRecord":
+        if total_value is None:
+            total_value = sum(item.oi_total for item in items)
+        return cls(
+            row["o_id"],
+            intern_str(row["c_id"]),
+            intern_str(row["c_name"] or ""),
+            intern_str(row["c_address"] or ""),
+            row["o_delivery_date"],
+            row["o_placed_time"],
+            total_value,
+            intern_str(row["o_status"]),
+            items,
+        )
+
+    def to_dict(self) -> dict:
+        """JSON-ready dict in the shape get_orders has always returned."""
+        order = self._asdict()
+        order["o_delivery_date"] = self.o_delivery_date or DEFAULT_DELIVERY_DATE
+        order["items"] = [item.to_dict() for item in self.items]
+        return order
+
+    def to_summary_dict(self) -> dict:
+        """Basic order info for order listings."""
+        return {
+            "o_id": self.o_id,
+            "c_name": self.c_name,
+            "o_placed_time": self.o_placed_time,
+            "o_status": self.o_status,
+            "total_value": self.total_value,
+        }
+
+
+def records_nbytes(orders) -> int:
+    """Approximate memory held by a list of OrderRecords.
+
+    Counts the records, item tuples and their unshared values (floats, datetimes, order ids).
+    Interned strings and small ints are shared across records and are not counted.
+    """
+    size = sys.getsizeof(orders)
+    for order in orders:
+        size += sys.getsizeof(order) + sys.getsizeof(order.o_id) + sys.getsizeof(order.total_value)
+        size += sys.getsizeof(order.o_placed_time) + sys.getsizeof(order.items)
+        if order.o_delivery_date is not None:
+            size += sys.getsizeof(order.o_delivery_date)
+        for item in order.items:
+            size += sys.getsizeof(item) + sys.getsizeof(item.oi_price) + sys.getsizeof(item.oi_total)
+    return size
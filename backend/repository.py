@@ -0,0 +1,343 @@
+import logging
+import threading
+import uuid
+from abc import ABC, abstractmethod
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+from typing import List, NamedTuple, Optional, Tuple
+
+from config import Config
+from records import OrderItemRecord, OrderRecord
+
+logger = logging.getLogger(__name__)
+
+
+# Tables whose versions back the ETags of the catalog and order endpoints
+VERSIONED_TABLES = ("customers", "products", "orders", "order_items")
+
+# Fields get_customers/get_products can be limited to -> their columns (the id is always returned)
+CUSTOMER_FIELDS = {"name": "c_name", "email": "c_email", "address": "c_address"}
+PRODUCT_FIELDS = {"name": "p_name", "price": "p_price", "stock": "p_stock"}
+
+
+class StockReservationError(Exception):
+    """A confirmed order could not reserve its stock; nothing was written."""
+
+
+class PlacedOrder(NamedTuple):
+    order_id: str
+    # Committed [(p_id, new_stock)], for notify_stock_changes
+    stock_changes: List[Tuple[str, int]]
+
+
+class Repository(ABC):
+    """Customers, products and orders, in the shapes db.py has always returned.
+
+    Reads return empty results (None for single lookups) when the store is unreachable.
+    place_order is the one write that spans tables: stock reservation, order id and rows commit
+    together or not at all.
+    """
+
+    @abstractmethod
+    async def get_customers(self, fields: Optional[tuple] = None) -> dict:
+        """{c_id: {"name", "email", "address"}}, or only the CUSTOMER_FIELDS in fields."""
+
+    @abstractmethod
+    async def get_all_customers_dict(self) -> dict:
+        """{c_id: {"name", "email", "address", "created_time"}}"""
+
+    @abstractmethod
+    async def get_products(self, fields: Optional[tuple] = None) -> dict:
+        """{p_id: {"name", "price", "stock"}}, or only the PRODUCT_FIELDS in fields."""
+
+    @abstractmethod
+    async def get_orders(self) -> list:
+        """All orders, newest first, as OrderRecords."""
+
+    @abstractmethod
+    async def get_orders_fingerprint(self) -> Optional[str]:
+        """String that changes whenever any stored column of an order or order item changes."""
+
+    @abstractmethod
+    async def get_table_versions(self) -> Optional[dict]:
+        """{table: (version, changed_at)} for VERSIONED_TABLES, None if unavailable.
+
+        version is a string that changes whenever the table's rows do, at the latest when the change
+        becomes visible, or None while a change to the table may still be uncommitted (the version is
+        then unknown and must not be sent or compared); changed_at is the time of the last change
+        (None if unknown).
+        """
+
+    @abstractmethod
+    async def get_order_by_id(self, order_id: str) -> Optional[dict]:
+        """Order row with "items" (order_items rows) and "total_value"."""
+
+    @abstractmethod
+    async def get_orders_for_export(self, start_date, end_date, status=None, date_field="placed") -> list:
+        """get_order_by_id-shaped orders with o_placed_time ("placed") or o_delivery_date ("delivery")
+        in [start_date, end_date), optionally with a status (case-insensitive), oldest first."""
+
+    @abstractmethod
+    async def update_product_stock(self, product_id: str, new_stock: int) -> Optional[bool]:
+        """Set a product's stock: True if updated, False if there is no such product, None on error."""
+
+    @abstractmethod
+    async def place_order(self, customer_id: str, customer_name: Optional[str], customer_address: Optional[str],
+                          status: str, items: List[Tuple[str, int]]) -> PlacedOrder:
+        """Create an order with the next ORD-<year>-<seq> id, reserving stock for its (p_id, quantity) items.
+
+        Raises StockReservationError if a product is missing or short of stock, ConnectionError if the
+        store is unreachable.
+        """
+
+    @abstractmethod
+    async def insert_order_errors(self, events) -> bool:
+        """Append (e_time, e_kind, p_id, p_name_norm, c_id, e_qty) validation error events."""
+
+    @abstractmethod
+    async def get_catalog_error_counts(self, start_date, end_date, top_n: int) -> list:
+        """[{p_name_norm, request_count, last_requested}] for events in [start_date, end_date], most requested first."""
+
+
+class InMemoryRepository(Repository):
+    """Thread-safe in-process store with the same semantics as the Postgres schema.
+
+    One lock guards all state and is never held across an await, so the repository can be shared by
+    request threads, each with its own event loop. place_order checks every item before changing
+    anything, which gives the all-or-nothing stock reservation of the SQL transaction.
+    """
+
+    def __init__(self, customers: Optional[dict] = None, products: Optional[dict] = None, orders: Optional[list] = None):
+        """customers as get_all_customers_dict, products as get_products, orders as get_order_by_id dicts."""
+        self._lock = threading.Lock()
+        self._customers = {c_id: dict(customer) for c_id, customer in (customers or {}).items()}
+        self._products = {
+            p_id: {"name": product["name"], "price": Decimal(str(product["price"])), "stock": product["stock"]}
+            for p_id, product in (products or {}).items()
+        }
+        self._orders = {}
+        self._next_item_id = 1
+        # year -> last ORD-<year>-<seq> sequence number handed out
+        self._order_seq = {}
+        for order in orders or []:
+            self._add_order({k: v for k, v in order.items() if k not in ("items", "total_value")}, order.get("items") or [])
+        self._order_errors = []
+        # Fingerprints must not collide with another instance's (snapshot files are keyed by them)
+        self._instance = uuid.uuid4().hex[:12]
+        self._version = 0
+        self._table_versions = {table: (0, None) for table in VERSIONED_TABLES}
+        self._records = None
+        self._records_version = None
+
+    @classmethod
+    def from_synthetic(cls, generator, n_orders: int = 0) -> "InMemoryRepository":
+        """Repository holding a SyntheticDataGenerator dataset (the rows copy_dataset would load)."""
+        from services.synthetic_data import ORDER_BLOCK_SIZE
+
+        def timestamp(value: str) -> datetime:
+            return datetime.fromisoformat(value.replace("Z", "+00:00"))
+
+        repository = cls(
+            customers=generator.customers_dict(),
+            products={p_id: {"name": name, "price": price, "stock": stock} for p_id, name, price, stock in generator.products()},
+        )
+        for block in range(-(-n_orders // ORDER_BLOCK_SIZE)):
+            order_rows, item_rows = generator.order_rows(block, n_orders)
+            items_by_order = {}
+            for o_id, p_id, p_name, qty, price, total, available in item_rows:
+                items_by_order.setdefault(o_id, []).append({
+                    "p_id": p_id, "p_name": p_name, "oi_qty": qty,
+                    "oi_price": Decimal(price), "oi_total": Decimal(total), "oi_is_available": available,
+                })
+            for o_id, c_id, c_name, c_address, delivery, status, placed, remarks in order_rows:
+                repository._add_order({
+                    "o_id": o_id, "c_id": c_id, "c_name": c_name, "o_delivery_date": timestamp(delivery),
+                    "c_address": c_address, "o_remarks": remarks, "o_placed_time": timestamp(placed), "o_status": status,
+                }, items_by_order.get(o_id, []))
+        return repository
+
+    def _add_order(self, row: dict, items: list):
+        """Store an order row and its items, assigning item ids; caller holds the lock (or is __init__)."""
+        stored_items = []
+        for item in items:
+            stored_items.append({"oi_id": self._next_item_id, **{k: v for k, v in item.items() if k != "oi_id"}})
+            self._next_item_id += 1
+        self._orders[row["o_id"]] = (dict(row), stored_items)
+
+    def _bump_tables(self, *tables):
+        """Record a change to tables; caller holds the lock."""
+        now = datetime.now(timezone.utc)
+        for table in tables:
+            self._table_versions[table] = (self._table_versions[table][0] + 1, now)
+
+    def _next_order_id(self, year: int) -> str:
+        """ORD-<year>-<seq> after the highest sequence number of that year; caller holds the lock."""
+        prefix = f"ORD-{year}-"
+        if year not in self._order_seq:
+            last_seq = 0
+            for order_id in self._orders:
+                if order_id.startswith(prefix) and order_id[len(prefix):].isdigit():
+                    last_seq = max(last_seq, int(order_id[len(prefix):]))
+            self._order_seq[year] = last_seq
+        self._order_seq[year] += 1
+        return f"{prefix}{self._order_seq[year]:03d}"
+
+    @staticmethod
+    def _order_dict(row: dict, items: list) -> dict:
+        order = dict(row)
+        order["items"] = [dict(item) for item in items]
+        order["total_value"] = float(sum(item["oi_total"] for item in items))
+        return order
+
+    async def get_customers(self, fields: Optional[tuple] = None) -> dict:
+        fields = tuple(CUSTOMER_FIELDS) if fields is None else fields
+        with self._lock:
+            return {c_id: {field: c[field] for field in fields} for c_id, c in self._customers.items()}
+
+    async def get_all_customers_dict(self) -> dict:
+        with self._lock:
+            return {c_id: dict(customer) for c_id, customer in self._customers.items()}
+
+    async def get_products(self, fields: Optional[tuple] = None) -> dict:
+        fields = tuple(PRODUCT_FIELDS) if fields is None else fields
+        with self._lock:
+            return {
+                p_id: {field: float(p[field]) if field == "price" else p[field] for field in fields}
+                for p_id, p in self._products.items()
+            }
+
+    async def get_orders(self) -> list:
+        with self._lock:
+            # Records are immutable, so the list is rebuilt only after orders change
+            if self._records_version != self._version:
+                records = [
+                    OrderRecord.from_row(row, tuple(OrderItemRecord.from_row(item) for item in items),
+                                         float(sum(item["oi_total"] for item in items)))
+                    for row, items in self._orders.values()
+                ]
+                records.sort(key=lambda record: record.o_placed_time, reverse=True)
+                self._records, self._records_version = records, self._version
+            return list(self._records)
+
+    async def get_orders_fingerprint(self) -> Optional[str]:
+        with self._lock:
+            return f"memory:{self._instance}:{self._version}"
+
+    async def get_table_versions(self) -> Optional[dict]:
+        with self._lock:
+            return {
+                table: (f"memory:{self._instance}:{version}", changed_at)
+                for table, (version, changed_at) in self._table_versions.items()
+            }
+
+    async def get_order_by_id(self, order_id: str) -> Optional[dict]:
+        with self._lock:
+            stored = self._orders.get(order_id)
+            return self._order_dict(*stored) if stored else None
+
+    async def get_orders_for_export(self, start_date, end_date, status=None, date_field="placed") -> list:
+        date_column = {"placed": "o_placed_time", "delivery": "o_delivery_date"}[date_field]
+        with self._lock:
+            matches = [
+                (row, items) for row, items in self._orders.values()
+                if row[date_column] is not None and start_date <= row[date_column] < end_date
+                and (status is None or (row["o_status"] or "").lower() == status.lower())
+            ]
+            matches.sort(key=lambda match: (match[0][date_column], match[0]["o_id"]))
+            orders = [self._order_dict(row, items) for row, items in matches]
+        for order in orders:
+            order["c_name"] = order["c_name"] or ""
+            order["c_address"] = order["c_address"] or ""
+        return orders
+
+    async def update_product_stock(self, product_id: str, new_stock: int) -> Optional[bool]:
+        with self._lock:
+            product = self._products.get(product_id)
+            if product is None:
+                return False
+            product["stock"] = new_stock
+            self._bump_tables("products")
+            return True
+
+    async def place_order(self, customer_id: str, customer_name: Optional[str], customer_address: Optional[str],
+                          status: str, items: List[Tuple[str, int]]) -> PlacedOrder:
+        with self._lock:
+            # Check every line (repeated products add up) before reserving anything
+            requested = Counter()
+            for product_id, quantity in items:
+                product = self._products.get(product_id)
+                if product is None:
+                    raise StockReservationError(f"Product {product_id} not found.")
+                requested[product_id] += quantity
+                if requested[product_id] > product["stock"]:
+                    raise StockReservationError(f"Insufficient stock for product {product_id} during update.")
+            stock_changes = []
+            for product_id, quantity in items:
+                product = self._products[product_id]
+                product["stock"] -= quantity
+                stock_changes.append((product_id, product["stock"]))
+
+            now = datetime.now(timezone.utc)
+            order_id = self._next_order_id(now.year)
+            self._add_order({
+                "o_id": order_id, "c_id": customer_id, "c_name": customer_name, "o_delivery_date": now + timedelta(days=3),
+                "c_address": customer_address, "o_remarks": None, "o_placed_time": now, "o_status": status,
+            }, [
+                {"p_id": product_id, "p_name": self._products[product_id]["name"], "oi_qty": quantity,
+                 "oi_price": self._products[product_id]["price"], "oi_total": self._products[product_id]["price"] * quantity,
+                 "oi_is_available": True}
+                for product_id, quantity in items
+            ])
+            self._version += 1
+            self._bump_tables("orders", *(("products", "order_items") if items else ()))
+            return PlacedOrder(order_id, stock_changes)
+
+    async def insert_order_errors(self, events) -> bool:
+        with self._lock:
+            self._order_errors.extend(tuple(event) for event in events)
+            return True
+
+    async def get_catalog_error_counts(self, start_date, end_date, top_n: int) -> list:
+        with self._lock:
+            events = [event for event in self._order_errors if start_date <= event[0] <= end_date]
+        counts, last = Counter(), {}
+        for e_time, _, _, name, _, _ in events:
+            counts[name] += 1
+            if name not in last or e_time > last[name]:
+                last[name] = e_time
+        ranked = sorted(counts, key=lambda name: (counts[name], last[name]), reverse=True)[:top_n]
+        return [{"p_name_norm": name, "request_count": counts[name], "last_requested": last[name]} for name in ranked]
+
+
+_repository = None
+_repository_lock = threading.Lock()
+
+
+def _create_repository() -> Repository:
+    if Config.REPOSITORY_BACKEND == "memory":
+        from services.synthetic_data import PRESETS, SyntheticDataGenerator
+
+        n_orders, n_customers, n_products = PRESETS[Config.MEMORY_REPOSITORY_PRESET]
+        logger.info("Loading the %s synthetic dataset into memory...", Config.MEMORY_REPOSITORY_PRESET)
+        generator = SyntheticDataGenerator(seed=Config.MEMORY_REPOSITORY_SEED, n_customers=n_customers, n_products=n_products)
+        return InMemoryRepository.from_synthetic(generator, n_orders)
+    from db import AsyncpgRepository
+    return AsyncpgRepository()
+
+
+def get_repository() -> Repository:
+    """The process-wide repository, created on first use from Config.REPOSITORY_BACKEND."""
+    global _repository
+    if _repository is None:
+        with _repository_lock:
+            if _repository is None:
+                _repository = _create_repository()
+    return _repository
+
+
+def set_repository(repository: Repository):
+    """Replace the process-wide repository (load tests, tools)."""
+    global _repository
+    with _repository_lock:
+        _repository = repository
@@ -0,0 +1,143 @@
+import gzip
+import zlib
+from datetime import date
+from decimal import Decimal
+from typing import Iterable, Optional
+
+from flask.json.provider import JSONProvider
+from werkzeug.http import http_date, parse_accept_header
+
+from config import Config
+
+try:
+    import orjson
+except ImportError:  # JSON_PROVIDER=orjson falls back to Flask's stdlib provider
+    orjson = None
+
+try:
+    import brotli
+except ImportError:  # gzip only
+    brotli = None
+
+_COMPRESSIBLE_TYPES = ("application/json", "text/", "application/javascript", "image/svg+xml")
+
+
+def _orjson_default(value):
+    """What orjson cannot serialize itself, converted the way Flask's default provider does."""
+    if isinstance(value, date):
+        return http_date(value)
+    if isinstance(value, Decimal):
+        return str(value)
+    if hasattr(value, "__html__"):
+        return str(value.__html__())
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+class OrjsonProvider(JSONProvider):
+    """Flask JSON provider backed by orjson, with the output of the default provider.
+
+    Keys are sorted, datetimes are HTTP dates and Decimals strings, as with stdlib json, so
+    clients see the same documents; responses are indented in debug mode unless compact is set.
+    numpy scalars and arrays serialize natively.
+    """
+
+    sort_keys = True
+    compact: Optional[bool] = None
+
+    def _option(self, indent: bool = False) -> int:
+        option = orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+        if self.sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        return option
+
+    def dumps(self, obj, **kwargs) -> str:
+        return orjson.dumps(obj, default=_orjson_default, option=self._option(bool(kwargs.get("indent")))).decode("utf-8")
+
+    def dumps_bytes(self, obj) -> bytes:
+        """Compact dumps without the str round trip, for streamed bodies."""
+        return orjson.dumps(obj, default=_orjson_default, option=self._option())
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        indent = self.compact is False or (self.compact is None and self._app.debug)
+        body = orjson.dumps(obj, default=_orjson_default, option=self._option(indent))
+        return self._app.response_class(body + b"\n", mimetype="application/json")
+
+
+def create_json_provider(app) -> Optional[JSONProvider]:
+    """The provider selected by Config.JSON_PROVIDER, or None to keep Flask's default."""
+    if Config.JSON_PROVIDER == "orjson" and orjson is not None:
+        return OrjsonProvider(app)
+    return None
+
+
+def json_array_chunks(provider: JSONProvider, items: list, chunk_size: int) -> Iterable[bytes]:
+    """The JSON array of items as byte chunks of chunk_size elements each, for streamed responses."""
+    dumps = getattr(provider, "dumps_bytes", None) or (lambda obj: provider.dumps(obj).encode("utf-8"))
+    yield b"["
+    for start in range(0, len(items), chunk_size):
+        chunk = dumps(items[start:start + chunk_size])
+        yield (b"," if start else b"") + chunk[1:-1]
+    yield b"]"
+
+
+def negotiate_encoding(accept_encoding: str) -> Optional[str]:
+    """'br' or 'gzip' (brotli preferred when installed), whichever the Accept-Encoding header allows."""
+    qualities = {value.lower(): quality for value, quality in parse_accept_header(accept_encoding)}
+    for encoding in (("br", "gzip") if brotli is not None else ("gzip",)):
+        if qualities.get(encoding, qualities.get("*", 0)) > 0:
+            return encoding
+    return None
+
+
+class _StreamCompressor:
+    def __init__(self, encoding: str):
+        if encoding == "br":
+            self._compressor = brotli.Compressor(quality=Config.COMPRESSION_BROTLI_QUALITY)
+            self._compress, self._finish = self._compressor.process, self._compressor.finish
+        else:
+            self._compressor = zlib.compressobj(Config.COMPRESSION_GZIP_LEVEL, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+            self._compress, self._finish = self._compressor.compress, self._compressor.flush
+
+    def iterate(self, chunks: Iterable[bytes]) -> Iterable[bytes]:
+        for chunk in chunks:
+            compressed = self._compress(chunk)
+            if compressed:
+                yield compressed
+        yield self._finish()
+
+
+def compress_response(response, accept_encoding: str):
+    """Compress a JSON/text response for the client's Accept-Encoding.
+
+    Buffered bodies are compressed when at least Config.COMPRESSION_MIN_BYTES long; streamed bodies
+    are compressed chunk by chunk. Already-encoded, non-2xx, 204, 206 and binary (PDF, ZIP) responses
+    are left as they are.
+    """
+    if (response.status_code < 200 or response.status_code >= 300 or response.status_code in (204, 206)
+            or "Content-Encoding" in response.headers or not (response.mimetype or "").startswith(_COMPRESSIBLE_TYPES)):
+        return response
+    response.vary.add("Accept-Encoding")
+    encoding = negotiate_encoding(accept_encoding)
+    if encoding is None:
+        return response
+    if response.is_streamed:
+        if response.direct_passthrough:
+            return response
+        response.response = _StreamCompressor(encoding).iterate(response.response)
+        response.headers.pop("Content-Length", None)
+    else:
+        body = response.get_data()
+        if len(body) < Config.COMPRESSION_MIN_BYTES:
+            return response
+        if encoding == "br":
+            response.set_data(brotli.compress(body, quality=Config.COMPRESSION_BROTLI_QUALITY))
+        else:
+            response.set_data(gzip.compress(body, compresslevel=Config.COMPRESSION_GZIP_LEVEL))
+    response.headers.set("Content-Encoding", encoding)
+    return response
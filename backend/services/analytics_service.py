@@ -1,133 +1,318 @@
+import asyncio
+import logging
+import time
+from concurrent.futures.process import BrokenProcessPool
 from datetime import datetime, timedelta, timezone
-from typing import Tuple, Callable
+from typing import Tuple, Callable, Optional
 from collections import defaultdict
-import pandas as pd
-from prophet import Prophet
+from itertools import chain, repeat
+from operator import attrgetter
+import numpy as np
+from config import Config
+from logging_setup import SAMPLED
+from records import records_nbytes
+from process_pool import get_process_pool, reset_process_pool
+from services.inventory_health import InventoryHealthIndex
+from services.reorder import demand_statistics, reorder_points
+from services.forecasting import NUMPY_ENGINES, forecast_matrix, future_periods, period_range, resolve_engine
+from services.analytics_snapshot import AnalyticsSnapshotStore, SnapshotOrders
+from services.analytics_sql_backend import SqlAnalyticsBackend
+from services.result_cache import ResultCache, memoize_result
+from services.sketches import DailySketches, DaySketch
+
+logger = logging.getLogger(__name__)
+
+
+def _average_forecast(historical_periods: dict, last_period: str, granularity: str, periods_to_forecast: int) -> list:
+    """Flat forecast of the average quantity per period with sales, for the periods after last_period."""
+    avg_quantity_per_period = sum(historical_periods.values()) / len(historical_periods) if historical_periods else 0
+    return [
+        {"period": period, "quantity": int(avg_quantity_per_period)}
+        for period in future_periods(last_period, granularity, periods_to_forecast)
+    ]
+
+
+def _fit_prophet_product_forecast(historical_data: list, last_period: str, granularity: str, periods_to_forecast: int) -> list:
+    """Fit Prophet to one product's [{"period", "quantity"}] history. Runs inside forecast pool workers."""
+    import pandas as pd
+    from prophet import Prophet
+
+    df = pd.DataFrame(historical_data).rename(columns={'period': 'ds', 'quantity': 'y'})
+
+    # Explicitly specify datetime format based on granularity
+    if granularity == 'month':
+        df['ds'] = pd.to_datetime(df['ds'], format='%Y-%m')
+        freq, period_format = 'MS', "%Y-%m"
+    elif granularity == 'week':
+        # Append '-1' to assume weeks start on Monday (day 1 of the week)
+        df['ds'] = pd.to_datetime(df['ds'] + '-1', format='%Y-%W-%w')
+        freq, period_format = 'W-MON', "%Y-%W"
+    else:
+        raise ValueError(f"Unsupported granularity for forecasting: {granularity}")
+
+    model = Prophet(growth='linear', daily_seasonality=False, weekly_seasonality=False, yearly_seasonality=False)
+    model.fit(df)
+    future = model.make_future_dataframe(periods=periods_to_forecast, freq=freq)
+    forecast_df = model.predict(future)
+
+    forecasted_demand_periods = []
+    for ds, yhat in zip(forecast_df['ds'], forecast_df['yhat']):
+        period_str = ds.strftime(period_format)
+        # Only add forecasted periods (not historical ones)
+        if period_str > last_period:
+            forecasted_demand_periods.append({
+                "period": period_str,
+                "quantity": max(0, int(round(float(yhat))))
+            })
+    return forecasted_demand_periods
 
 class AnalyticsService:
-    def __init__(self, get_all_orders_func: Callable, get_all_customers_dict_func: Callable, get_products_func: Callable):
+    def __init__(self, get_all_orders_func: Callable, get_all_customers_dict_func: Callable, get_products_func: Callable,
+                 result_cache: Optional[ResultCache] = None, get_catalog_error_counts_func: Optional[Callable] = None,
+                 sql_backend: Optional[SqlAnalyticsBackend] = None, snapshot_store: Optional[AnalyticsSnapshotStore] = None,
+                 get_data_token_func: Optional[Callable] = None):
         self.get_all_orders_func = get_all_orders_func
-        print("[AnalyticsService] Initialized with orders func.")
+        logger.debug("Initialized with orders func.")
         self.get_all_customers_dict_func = get_all_customers_dict_func
-        print("[AnalyticsService] Initialized with customers func.")
+        logger.debug("Initialized with customers func.")
         self.get_products_func = get_products_func
-        print("[AnalyticsService] Initialized with products func.")
+        logger.debug("Initialized with products func.")
+        # async (start_date, end_date, top_n) -> [{"p_name_norm", "request_count", "last_requested"}]
+        self.get_catalog_error_counts_func = get_catalog_error_counts_func
+        # When set, order aggregates are computed in Postgres and no orders are cached in memory
+        self.sql_backend = sql_backend
+        # When set, the order cache is memory-mapped from an on-disk snapshot shared between workers
+        self.snapshot_store = snapshot_store
+        # async () -> value that changes with the cached tables (None if unknown); see reload_if_changed
+        self.get_data_token_func = get_data_token_func
+        self.data_token = None
+        # OrderRecords (records.py) newest first: a list, or SnapshotOrders when snapshots are enabled
         self.all_cached_orders = []
+        self.cached_orders_bytes = 0
+        # (data_version, DailySketches) for approximate queries: built on first use, then refreshed
+        # by each cache load (only the days whose orders changed are rebuilt)
+        self._daily_sketches = None
         self.all_cached_customers_dict = {}
         self.all_cached_products = {}
+        self.inventory_health = InventoryHealthIndex(Config.LOW_STOCK_THRESHOLD)
+        # Bumped on every cache refresh; part of every memoized result key.
+        self.data_version = 0
+        self.result_cache = result_cache if result_cache is not None else ResultCache(
+            max_entries=Config.ANALYTICS_CACHE_MAX_ENTRIES,
+            max_bytes=Config.ANALYTICS_CACHE_MAX_BYTES,
+        )
+        self.cache_bucket_seconds = Config.ANALYTICS_CACHE_BUCKET_SECONDS
 
     async def load_cached_data(self):
         """Load and cache all orders and customers data."""
-        print("[AnalyticsService] Loading cached data...")
-        self.all_cached_orders = await self.get_all_orders_func()
-        print(f"[AnalyticsService] Cached {len(self.all_cached_orders)} orders.")
-        self.all_cached_customers_dict = await self.get_all_customers_dict_func()
-        print(f"[AnalyticsService] Cached {len(self.all_cached_customers_dict)} customers.")
+        logger.info("Loading cached data...")
+        # Taken before the load, so changes made while loading trigger the next reload
+        data_token = await self.get_data_token_func() if self.get_data_token_func else None
+        if self.sql_backend is None:
+            if self.snapshot_store is not None:
+                self.all_cached_orders = await self.snapshot_store.load_or_build(self.get_all_orders_func)
+            else:
+                self.all_cached_orders = await self.get_all_orders_func()
+            if isinstance(self.all_cached_orders, SnapshotOrders):
+                # Mapped pages are shared with every worker using the same snapshot
+                self.cached_orders_bytes = self.all_cached_orders.nbytes
+                cache_kind = "memory-mapped, shared"
+            else:
+                self.cached_orders_bytes = records_nbytes(self.all_cached_orders)
+                cache_kind = "in process"
+            per_order = self.cached_orders_bytes / len(self.all_cached_orders) if len(self.all_cached_orders) else 0
+            logger.info("Cached %s orders (%.1f MB %s, %.0f bytes/order).", len(self.all_cached_orders), self.cached_orders_bytes / 1024 / 1024, cache_kind, per_order)
+            self.all_cached_customers_dict = await self.get_all_customers_dict_func()
+            logger.info("Cached %s customers.", len(self.all_cached_customers_dict))
+        else:
+            logger.info("SQL backend: orders and customers are aggregated in the database, not cached.")
         self.all_cached_products = await self.get_products_func()
-        print(f"[AnalyticsService] Cached {len(self.all_cached_products)} products.")
-        print("[AnalyticsService] Cached data loaded successfully.")
+        self.inventory_health.load(self.all_cached_products)
+        logger.info("Cached %s products.", len(self.all_cached_products))
+        if self.sql_backend is None and (self._daily_sketches is not None or Config.ANALYTICS_APPROXIMATE):
+            # On the loading thread, before the new version is visible, so requests never rebuild them
+            self._refresh_sketches(self.data_version + 1)
+        self.data_version += 1
+        self.data_token = data_token
+        self.result_cache.clear()
+        logger.info("Cached data loaded successfully (data version %s).", self.data_version)
+
+    async def reload_if_changed(self) -> bool:
+        """Reload the cache if the data token moved since the last load; True if it reloaded.
+
+        Without a token function every call reloads; with the token unavailable (database
+        unreachable) the current cache is kept.
+        """
+        if self.get_data_token_func is not None:
+            data_token = await self.get_data_token_func()
+            if data_token is None or data_token == self.data_token:
+                return False
+        await self.load_cached_data()
+        return True
+
+    def _orders_in_range(self, start_date: datetime, end_date: datetime) -> list:
+        """Cached orders placed within [start_date, end_date]."""
+        if isinstance(self.all_cached_orders, SnapshotOrders):
+            return self.all_cached_orders.between(start_date, end_date)
+        return [
+            order for order in self.all_cached_orders
+            if order.o_placed_time and start_date <= order.o_placed_time <= end_date
+        ]
+
+    def _count_new_customers(self, start_date: datetime, end_date: datetime) -> int:
+        logger.debug("KPIs: Using %s cached customers for new customer count.", len(self.all_cached_customers_dict))
+        new_customers_count = 0
+        for customer in self.all_cached_customers_dict.values():
+            created_time = customer.get("created_time")
+            if created_time and start_date <= created_time <= end_date:
+                new_customers_count += 1
+        return new_customers_count
+
+    def _use_sketches(self, approximate: Optional[bool]) -> bool:
+        """Approximate answers come from the daily sketches; the SQL backend is always exact."""
+        if approximate is None:
+            approximate = Config.ANALYTICS_APPROXIMATE
+        return approximate and self.sql_backend is None
+
+    def _refresh_sketches(self, data_version: int):
+        """Bring the daily sketches up to the order cache, rebuilding only the days that changed."""
+        started = time.perf_counter()
+        if self._daily_sketches is None:
+            sketches = DailySketches(Config.ANALYTICS_HLL_PRECISION, Config.ANALYTICS_TOPK_CAPACITY)
+        else:
+            sketches = self._daily_sketches[1]
+        sketches = sketches.refreshed(self.all_cached_orders)
+        self._daily_sketches = (data_version, sketches)
+        logger.info("Daily sketches: rebuilt %s of %s days in %.2fs.", sketches.rebuilt_days, len(sketches.days), time.perf_counter() - started)
+
+    def _sketch_window(self, start_date: datetime, end_date: datetime) -> DaySketch:
+        """Merged sketch of the window; the per-day sketches are built here only on first use."""
+        if self._daily_sketches is None or self._daily_sketches[0] != self.data_version:
+            self._refresh_sketches(self.data_version)
+        return self._daily_sketches[1].window(start_date, end_date, self._orders_in_range)
 
     def _get_date_range(self, time_filter: str) -> Tuple[datetime, datetime]:
-        print(f"[AnalyticsService] _get_date_range called for filter: {time_filter}")
+        logger.debug("_get_date_range called for filter: %s", time_filter, extra=SAMPLED)
         now = datetime.now(timezone.utc)
-        print(f"DEBUG: Current UTC time (now): {now}")
+        logger.debug("Current UTC time (now): %s", now, extra=SAMPLED)
         
         if time_filter == "last_7_days":
             # Last 7 days from current time
             end_date = now
             start_date = end_date - timedelta(days=7)
             start_date = start_date.replace(hour=0, minute=0, second=0, microsecond=0)
-            print(f"DEBUG: Filter '{time_filter}': Start={start_date}, End={end_date}")
+            logger.debug("Filter '%s': Start=%s, End=%s", time_filter, start_date, end_date, extra=SAMPLED)
             
         elif time_filter == "last_30_days":
             # Last 30 days from current time
             end_date = now
             start_date = end_date - timedelta(days=30)
-            print(f"DEBUG: Filter '{time_filter}': Start={start_date}, End={end_date}")
+            logger.debug("Filter '%s': Start=%s, End=%s", time_filter, start_date, end_date, extra=SAMPLED)
             
         elif time_filter == "last_365_days":
             # Rolling 365 days from current time
             end_date = now
             start_date = end_date - timedelta(days=365)
-            print(f"DEBUG: Filter '{time_filter}': Start={start_date}, End={end_date}")
+            logger.debug("Filter '%s': Start=%s, End=%s", time_filter, start_date, end_date, extra=SAMPLED)
             
         elif time_filter == "all_time":
             start_date = datetime(2000, 1, 1, tzinfo=timezone.utc)
             end_date = now
-            print(f"DEBUG: Filter '{time_filter}': Start={start_date}, End={end_date}")
+            logger.debug("Filter '%s': Start=%s, End=%s", time_filter, start_date, end_date, extra=SAMPLED)
             
         else:
             raise ValueError(f"Unknown time_filter: {time_filter}")
             
-        print(f"[AnalyticsService] Date range: {start_date} to {end_date}")
+        logger.debug("Date range: %s to %s", start_date, end_date, extra=SAMPLED)
         return (start_date, end_date)
 
-    async def get_kpis(self, time_filter: str = "all_time") -> dict:
+    @memoize_result
+    async def get_kpis(self, time_filter: str = "all_time", approximate: Optional[bool] = None) -> dict:
         try:
-            print(f"[AnalyticsService] get_kpis called for filter: {time_filter}")
+            logger.debug("get_kpis called for filter: %s", time_filter)
             start_date, end_date = self._get_date_range(time_filter)
-            print(f"[AnalyticsService] KPIs: Date range calculated.")
-            print(f"[AnalyticsService] KPIs: Using {len(self.all_cached_orders)} cached orders.")
-            filtered_orders = [
-                order for order in self.all_cached_orders
-                if order.get("o_placed_time") and start_date <= order["o_placed_time"] <= end_date
-            ]
-            print(f"[AnalyticsService] KPIs: Filtered down to {len(filtered_orders)} orders.")
+            logger.debug("KPIs: Date range calculated.")
+            if self._use_sketches(approximate):
+                window = self._sketch_window(start_date, end_date)
+                kpis_result = {
+                    "totalRevenue": window.revenue,
+                    "totalOrders": window.orders,
+                    "avgOrderValue": window.revenue / window.orders if window.orders > 0 else 0.0,
+                    "newCustomers": self._count_new_customers(start_date, end_date),
+                    "uniqueCustomers": window.customers.count(),
+                    "approximate": True,
+                    "uniqueCustomersRelativeError": round(window.customers.relative_error, 4)
+                }
+                logger.debug("KPIs: Returning approximate KPIs: %s", kpis_result)
+                return kpis_result
+            if self.sql_backend is not None:
+                totals = await self.sql_backend.get_kpi_totals(start_date, end_date)
+                total_revenue = totals["total_revenue"]
+                total_orders = totals["total_orders"]
+                kpis_result = {
+                    "totalRevenue": total_revenue,
+                    "totalOrders": total_orders,
+                    "avgOrderValue": total_revenue / total_orders if total_orders > 0 else 0.0,
+                    "newCustomers": totals["new_customers"],
+                    "uniqueCustomers": totals["unique_customers"]
+                }
+                logger.debug("KPIs: Returning SQL KPIs: %s", kpis_result)
+                return kpis_result
+            logger.debug("KPIs: Using %s cached orders.", len(self.all_cached_orders))
+            filtered_orders = self._orders_in_range(start_date, end_date)
+            logger.debug("KPIs: Filtered down to %s orders.", len(filtered_orders))
             total_revenue = 0.0
             total_orders = 0
             unique_customer_ids = set()
-            new_customers_count = 0
             for order in filtered_orders:
-                total_revenue += float(order.get("total_value", 0))
+                total_revenue += order.total_value
                 total_orders += 1
-                c_id = order.get("c_id")
+                c_id = order.c_id
                 if c_id:
                     unique_customer_ids.add(c_id)
-            print(f"[AnalyticsService] KPIs: Using {len(self.all_cached_customers_dict)} cached customers for new customer count.")
-            for customer in self.all_cached_customers_dict.values():
-                created_time = customer.get("created_time")
-                if created_time and start_date <= created_time <= end_date:
-                    new_customers_count += 1
+            new_customers_count = self._count_new_customers(start_date, end_date)
             avg_order_value = total_revenue / total_orders if total_orders > 0 else 0.0
             kpis_result = {
                 "totalRevenue": total_revenue,
                 "totalOrders": total_orders,
                 "avgOrderValue": avg_order_value,
-                "newCustomers": new_customers_count
+                "newCustomers": new_customers_count,
+                "uniqueCustomers": len(unique_customer_ids)
             }
-            print(f"[AnalyticsService] KPIs: Returning KPIs: {kpis_result}")
+            logger.debug("KPIs: Returning KPIs: %s", kpis_result)
             return kpis_result
         except Exception as e:
-            print(f"[AnalyticsService] Error in get_kpis: {e}")
+            logger.error("Error in get_kpis: %s", e)
             raise
 
+    @memoize_result
     async def get_sales_trends(self, time_filter: str = "all_time", granularity: str = "month") -> list:
         try:
-            print(f"[AnalyticsService] get_sales_trends called for filter: {time_filter}, granularity: {granularity}")
+            logger.debug("get_sales_trends called for filter: %s, granularity: %s", time_filter, granularity)
             from collections import defaultdict
             start_date, end_date = self._get_date_range(time_filter)
-            print(f"[AnalyticsService] Sales Trends: Date range calculated.")
-            print(f"[AnalyticsService] Sales Trends: Using {len(self.all_cached_orders)} cached orders.")
-            filtered_orders = [
-                order for order in self.all_cached_orders
-                if order.get("o_placed_time") and start_date <= order["o_placed_time"] <= end_date
-            ]
-            print(f"[AnalyticsService] Sales Trends: Filtered down to {len(filtered_orders)} orders for trends.")
-            revenue_by_period = defaultdict(float)
-            for order in filtered_orders:
-                o_placed_time = order.get("o_placed_time")
-                if not o_placed_time:
-                    continue
-                if granularity == "month":
-                    period_str = o_placed_time.strftime("%Y-%m")
-                elif granularity == "week":
-                    period_str = o_placed_time.strftime("%Y-%W")
-                elif granularity == "year":
-                    period_str = o_placed_time.strftime("%Y")
-                else:
-                    raise ValueError(f"Unknown granularity: {granularity}")
-                for item in order.get("items", []):
-                    revenue_by_period[period_str] += float(item.get("oi_total", 0))
+            logger.debug("Sales Trends: Date range calculated.")
+            if self.sql_backend is not None:
+                revenue_by_period = await self.sql_backend.get_revenue_by_period(start_date, end_date, granularity)
+            else:
+                logger.debug("Sales Trends: Using %s cached orders.", len(self.all_cached_orders))
+                filtered_orders = self._orders_in_range(start_date, end_date)
+                logger.debug("Sales Trends: Filtered down to %s orders for trends.", len(filtered_orders))
+                revenue_by_period = defaultdict(float)
+                for order in filtered_orders:
+                    o_placed_time = order.o_placed_time
+                    if not o_placed_time:
+                        continue
+                    if granularity == "month":
+                        period_str = o_placed_time.strftime("%Y-%m")
+                    elif granularity == "week":
+                        period_str = o_placed_time.strftime("%Y-%W")
+                    elif granularity == "year":
+                        period_str = o_placed_time.strftime("%Y")
+                    else:
+                        raise ValueError(f"Unknown granularity: {granularity}")
+                    for item in order.items:
+                        revenue_by_period[period_str] += item.oi_total
             # Fill in missing periods
             periods = []
             current = start_date.replace(hour=0, minute=0, second=0, microsecond=0)
@@ -151,32 +336,34 @@ class AnalyticsService:
             result = []
             for period in sorted(periods):
                 result.append({"period": period, "revenue": revenue_by_period.get(period, 0.0)})
-            print(f"[AnalyticsService] Sales Trends: Returning {len(result)} trend periods.")
+            logger.debug("Sales Trends: Returning %s trend periods.", len(result))
             return result
         except Exception as e:
-            print(f"[AnalyticsService] Error in get_sales_trends: {e}")
+            logger.error("Error in get_sales_trends: %s", e)
             raise
 
+    @memoize_result
     async def get_order_status_distribution(self, time_filter: str = "all_time") -> dict:
         try:
-            print(f"[AnalyticsService] get_order_status_distribution called for filter: {time_filter}")
+            logger.debug("get_order_status_distribution called for filter: %s", time_filter)
             from collections import defaultdict
             start_date, end_date = self._get_date_range(time_filter)
-            print(f"[AnalyticsService] Order Status Distribution: Date range calculated.")
-            print(f"[AnalyticsService] Order Status Distribution: Using {len(self.all_cached_orders)} cached orders.")
-            
-            filtered_orders = [
-                order for order in self.all_cached_orders
-                if order.get("o_placed_time") and start_date <= order["o_placed_time"] <= end_date
-            ]
-            print(f"[AnalyticsService] Order Status Distribution: Filtered down to {len(filtered_orders)} orders.")
+            logger.debug("Order Status Distribution: Date range calculated.")
             
             status_counts = defaultdict(int)
-            for order in filtered_orders:
-                # Normalize status name to ensure consistency
-                status = order.get('o_status', 'Unknown')
-                normalized_status = status.title() if status else 'Unknown'
-                status_counts[normalized_status] += 1
+            if self.sql_backend is not None:
+                for status, count in (await self.sql_backend.get_status_counts(start_date, end_date)).items():
+                    normalized_status = status.title() if status else 'Unknown'
+                    status_counts[normalized_status] += count
+            else:
+                logger.debug("Order Status Distribution: Using %s cached orders.", len(self.all_cached_orders))
+                filtered_orders = self._orders_in_range(start_date, end_date)
+                logger.debug("Order Status Distribution: Filtered down to %s orders.", len(filtered_orders))
+                for order in filtered_orders:
+                    # Normalize status name to ensure consistency
+                    status = order.o_status or 'Unknown'
+                    normalized_status = status.title() if status else 'Unknown'
+                    status_counts[normalized_status] += 1
             
             # Filter out statuses with zero counts and return only non-zero statuses
             final_status_distribution = {
@@ -185,87 +372,77 @@ class AnalyticsService:
                 if count > 0
             }
             
-            print(f"[AnalyticsService] Order Status Distribution: Returning {len(final_status_distribution)} status types with non-zero counts.")
+            logger.debug("Order Status Distribution: Returning %s status types with non-zero counts.", len(final_status_distribution))
             return final_status_distribution
         except Exception as e:
-            print(f"[AnalyticsService] Error in get_order_status_distribution: {e}")
+            logger.error("Error in get_order_status_distribution: %s", e)
             raise
 
     async def get_inventory_health(self) -> dict:
+        # Not memoized: the index is updated in place on every stock change
         try:
-            print(f"[AnalyticsService] get_inventory_health called")
-            
-            # Use cached products data
-            products_dict = self.all_cached_products
-            print(f"[AnalyticsService] Inventory Health: Using {len(products_dict)} cached products.")
-            
-            total_inventory_value = 0.0
-            low_stock_items = []
-            out_of_stock_items = []
-            LOW_STOCK_THRESHOLD = 5
-            
-            for p_id, product in products_dict.items():
-                price = float(product.get('price', 0))
-                stock = int(product.get('stock', 0))
-                
-                # Calculate total inventory value
-                total_inventory_value += price * stock
-                
-                # Check for low stock items (stock > 0 but <= threshold)
-                if stock <= LOW_STOCK_THRESHOLD and stock > 0:
-                    low_stock_items.append({
-                        'p_id': p_id,
-                        'p_name': product.get('name', 'Unknown Product'),
-                        'p_stock': stock
-                    })
-                
-                # Check for out of stock items
-                elif stock == 0:
-                    out_of_stock_items.append({
-                        'p_id': p_id,
-                        'p_name': product.get('name', 'Unknown Product'),
-                        'p_stock': stock
-                    })
-            
-            result = {
-                "totalInventoryValue": total_inventory_value,
-                "lowStockItems": low_stock_items,
-                "outOfStockItems": out_of_stock_items
-            }
-            
-            print(f"[AnalyticsService] Inventory Health: Total value: ${total_inventory_value:.2f}, Low stock: {len(low_stock_items)}, Out of stock: {len(out_of_stock_items)}")
+            logger.debug("get_inventory_health called")
+            result = self.inventory_health.summary()
+            logger.debug("Inventory Health: Total value: $%.2f, Low stock: %s, Out of stock: %s", result['totalInventoryValue'], len(result['lowStockItems']), len(result['outOfStockItems']))
             return result
         except Exception as e:
-            print(f"[AnalyticsService] Error in get_inventory_health: {e}")
+            logger.error("Error in get_inventory_health: %s", e)
             raise
 
-    async def get_product_performance(self, time_filter: str = "all_time", top_n: int = 10) -> list:
+    def apply_stock_change(self, p_id: str, new_stock: int):
+        """Stock listener (db.register_stock_listener): keep the products cache and health index current."""
+        product = self.all_cached_products.get(p_id)
+        if product is not None:
+            product["stock"] = new_stock
+        self.inventory_health.update_stock(p_id, new_stock)
+
+    @memoize_result
+    async def get_product_performance(self, time_filter: str = "all_time", top_n: int = 10, approximate: Optional[bool] = None) -> list:
         try:
-            print(f"[AnalyticsService] get_product_performance called for filter: {time_filter}, top_n: {top_n}")
+            logger.debug("get_product_performance called for filter: %s, top_n: %s", time_filter, top_n)
             from collections import defaultdict
             
             start_date, end_date = self._get_date_range(time_filter)
-            print(f"[AnalyticsService] Product Performance: Date range calculated.")
+            logger.debug("Product Performance: Date range calculated.")
+            
+            if self._use_sketches(approximate):
+                # Space-Saving estimates: quantity overstates the true total by at most max_overcount,
+                # revenue is a lower bound (counted only while the product was monitored)
+                products = self._sketch_window(start_date, end_date).products
+                result = [
+                    {
+                        "p_id": p_id,
+                        "p_name": p_name,
+                        "total_quantity_sold": quantity,
+                        "total_revenue": revenue,
+                        "max_overcount": error
+                    }
+                    for p_id, quantity, error, revenue, p_name in products.top(top_n)
+                ]
+                logger.debug("Product Performance: Returning top %s products (approximate, error <= %.1f).", len(result), products.max_error)
+                return result
+            
+            if self.sql_backend is not None:
+                result = await self.sql_backend.get_product_totals(start_date, end_date, top_n)
+                logger.debug("Product Performance: Returning top %s products by quantity sold (SQL).", len(result))
+                return result
             
             all_orders = self.all_cached_orders
-            print(f"[AnalyticsService] Product Performance: Using {len(all_orders)} cached orders.")
+            logger.debug("Product Performance: Using %s cached orders.", len(all_orders))
             
-            filtered_orders = [
-                order for order in all_orders
-                if order.get("o_placed_time") and start_date <= order["o_placed_time"] <= end_date
-            ]
-            print(f"[AnalyticsService] Product Performance: Filtered down to {len(filtered_orders)} orders.")
+            filtered_orders = self._orders_in_range(start_date, end_date)
+            logger.debug("Product Performance: Filtered down to %s orders.", len(filtered_orders))
             
             # Create defaultdict to store aggregated data per product
             product_data = defaultdict(lambda: {'total_quantity_sold': 0, 'total_revenue': 0.0, 'p_name': ''})
             
             # Loop through filtered orders and their items
             for order in filtered_orders:
-                for item in order.get("items", []):
-                    p_id = item.get("p_id")
-                    p_name = item.get("p_name", "")
-                    oi_qty = int(item.get("oi_qty", 0))
-                    oi_total = float(item.get("oi_total", 0))
+                for item in order.items:
+                    p_id = item.p_id
+                    p_name = item.p_name
+                    oi_qty = item.oi_qty
+                    oi_total = item.oi_total
                     
                     if p_id:
                         product_data[p_id]['total_quantity_sold'] += oi_qty
@@ -290,22 +467,46 @@ class AnalyticsService:
             # Return only the top_n products
             result = product_list[:top_n]
             
-            print(f"[AnalyticsService] Product Performance: Returning top {len(result)} products by quantity sold.")
+            logger.debug("Product Performance: Returning top %s products by quantity sold.", len(result))
             return result
             
         except Exception as e:
-            print(f"[AnalyticsService] Error in get_product_performance: {e}")
+            logger.error("Error in get_product_performance: %s", e)
             raise
 
-    async def get_sales_forecast(self, time_filter: str = "last_365_days", periods_to_forecast: int = 3, granularity: str = "month") -> list:
+    @memoize_result
+    async def get_sales_forecast(self, time_filter: str = "last_365_days", periods_to_forecast: int = 3, granularity: str = "month", engine: Optional[str] = None) -> list:
         try:
-            print(f"[AnalyticsService] get_sales_forecast called for filter: {time_filter}, periods_to_forecast: {periods_to_forecast}, granularity: {granularity}")
+            engine = resolve_engine(engine, Config.FORECAST_ENGINE)
+            logger.debug("get_sales_forecast called for filter: %s, periods_to_forecast: %s, granularity: %s, engine: %s", time_filter, periods_to_forecast, granularity, engine)
             
             # Get historical sales data
             historical_sales_trends_raw = await self.get_sales_trends(time_filter=time_filter, granularity=granularity)
-            print(f"[AnalyticsService] Sales Forecast: Retrieved {len(historical_sales_trends_raw)} historical periods.")
-            
-            # Prepare data for Prophet
+            logger.debug("Sales Forecast: Retrieved %s historical periods.", len(historical_sales_trends_raw))
+            
+            if engine in NUMPY_ENGINES:
+                if granularity not in ("month", "week", "year"):
+                    raise ValueError(f"Unsupported granularity for forecasting: {granularity}")
+                # Copy rather than tag in place: the trends list is a shared memoized result
+                result = [{**item, "type": "historical"} for item in historical_sales_trends_raw]
+                if len(historical_sales_trends_raw) < 2:
+                    logger.debug("Sales Forecast: Insufficient historical data for forecasting. Returning historical data only.")
+                    return result
+                revenues = [item["revenue"] for item in historical_sales_trends_raw]
+                yhat = forecast_matrix([revenues], periods_to_forecast, engine, granularity)[0]
+                last_period = historical_sales_trends_raw[-1]["period"]
+                for period_str, value in zip(future_periods(last_period, granularity, periods_to_forecast), yhat):
+                    result.append({
+                        "period": period_str,
+                        "revenue": round(float(value), 2),
+                        "type": "forecast"
+                    })
+                logger.debug("Sales Forecast: Returning %s total periods (historical + forecast).", len(result))
+                return result
+
+            # Prepare data for Prophet (imported on first use; it is slow to import)
+            import pandas as pd
+            from prophet import Prophet
             df = pd.DataFrame(historical_sales_trends_raw).rename(columns={'period': 'ds', 'revenue': 'y'})
             if granularity == 'month':
                 df['ds'] = pd.to_datetime(df['ds'], format='%Y-%m')
@@ -317,10 +518,9 @@ class AnalyticsService:
                 raise ValueError(f"Unsupported granularity for forecasting: {granularity}")
             
             if len(df) < 2:
-                print(f"[AnalyticsService] Sales Forecast: Insufficient historical data for forecasting. Returning historical data only.")
-                for item in historical_sales_trends_raw:
-                    item["type"] = "historical"
-                return historical_sales_trends_raw
+                logger.debug("Sales Forecast: Insufficient historical data for forecasting. Returning historical data only.")
+                # Copy rather than tag in place: the trends list is a shared memoized result
+                return [{**item, "type": "historical"} for item in historical_sales_trends_raw]
             
             model = Prophet(seasonality_mode='multiplicative', daily_seasonality=False)
             model.fit(df)
@@ -366,63 +566,32 @@ class AnalyticsService:
                         "revenue": round(float(yhat), 2),
                         "type": "forecast"
                     })
-            print(f"[AnalyticsService] Sales Forecast: Returning {len(result)} total periods (historical + forecast).")
+            logger.debug("Sales Forecast: Returning %s total periods (historical + forecast).", len(result))
             return result
         except Exception as e:
-            print(f"[AnalyticsService] Error in get_sales_forecast: {e}")
+            logger.error("Error in get_sales_forecast: %s", e)
             raise
 
-    async def get_inventory_needs_forecast(self, time_filter: str = "last_365_days", top_n_products: int = 5, periods_to_forecast: int = 3, granularity: str = "month") -> list:
+    @memoize_result
+    async def get_inventory_needs_forecast(self, time_filter: str = "last_365_days", top_n_products: int = 5, periods_to_forecast: int = 3, granularity: str = "month", engine: Optional[str] = None) -> list:
         try:
-            print(f"[AnalyticsService] get_inventory_needs_forecast called for filter: {time_filter}, top_n_products: {top_n_products}, periods_to_forecast: {periods_to_forecast}, granularity: {granularity}")
+            engine = resolve_engine(engine, Config.FORECAST_ENGINE)
+            logger.debug("get_inventory_needs_forecast called for filter: %s, top_n_products: %s, periods_to_forecast: %s, granularity: %s, engine: %s", time_filter, top_n_products, periods_to_forecast, granularity, engine)
             from collections import defaultdict
             
             start_date, end_date = self._get_date_range(time_filter)
-            print(f"[AnalyticsService] Inventory Needs Forecast: Date range calculated.")
-            
-            all_orders = self.all_cached_orders
-            print(f"[AnalyticsService] Inventory Needs Forecast: Using {len(all_orders)} cached orders.")
+            logger.debug("Inventory Needs Forecast: Date range calculated.")
             
-            filtered_orders = [
-                order for order in all_orders
-                if order.get("o_placed_time") and start_date <= order["o_placed_time"] <= end_date
-            ]
-            print(f"[AnalyticsService] Inventory Needs Forecast: Filtered down to {len(filtered_orders)} orders.")
-            
-            # Get historical sales data per product by period
-            product_period_data = defaultdict(lambda: defaultdict(int))  # p_id -> period -> quantity
-            product_names = {}  # p_id -> p_name
-            product_total_quantity = defaultdict(int)  # p_id -> total_quantity_sold
-            
-            # Aggregate sales data by product and period
-            for order in filtered_orders:
-                o_placed_time = order.get("o_placed_time")
-                if not o_placed_time:
-                    continue
-                
-                # Determine period based on granularity
-                if granularity == "month":
-                    period_str = o_placed_time.strftime("%Y-%m")
-                elif granularity == "week":
-                    period_str = o_placed_time.strftime("%Y-%W")
-                else:
-                    raise ValueError(f"Unsupported granularity: {granularity}")
-                
-                # Process each item in the order
-                for item in order.get("items", []):
-                    p_id = item.get("p_id")
-                    p_name = item.get("p_name", "")
-                    oi_qty = int(item.get("oi_qty", 0))
-                    
-                    if p_id and oi_qty > 0:
-                        product_period_data[p_id][period_str] += oi_qty
-                        product_total_quantity[p_id] += oi_qty
-                        if p_id not in product_names and p_name:
-                            product_names[p_id] = p_name
+            if self.sql_backend is not None:
+                product_period_data, product_names, product_total_quantity = \
+                    await self.sql_backend.get_product_period_quantities(start_date, end_date, granularity)
+            else:
+                product_period_data, product_names, product_total_quantity = \
+                    self._aggregate_product_periods(start_date, end_date, granularity)
             
             # Identify top N products by total quantity sold
             top_products = sorted(product_total_quantity.items(), key=lambda x: x[1], reverse=True)[:top_n_products]
-            print(f"[AnalyticsService] Inventory Needs Forecast: Identified top {len(top_products)} products.")
+            logger.debug("Inventory Needs Forecast: Identified top %s products.", len(top_products))
             
             # Get the last period from historical data for forecasting
             all_periods = set()
@@ -430,202 +599,278 @@ class AnalyticsService:
                 all_periods.update(product_period_data[p_id].keys())
             
             if not all_periods:
-                print(f"[AnalyticsService] Inventory Needs Forecast: No historical data available.")
+                logger.debug("Inventory Needs Forecast: No historical data available.")
                 return []
             
             last_period = sorted(all_periods)[-1]
-            print(f"[AnalyticsService] Inventory Needs Forecast: Last historical period: {last_period}")
-            
-            # Forecast for each top product using Prophet
+            logger.debug("Inventory Needs Forecast: Last historical period: %s", last_period)
+            
+            if engine in NUMPY_ENGINES:
+                # One vectorized pass over a dense (product x period) matrix; periods without sales are zeros
+                period_grid = period_range(sorted(all_periods)[0], last_period, granularity)
+                quantities = [
+                    [product_period_data[p_id].get(period, 0) for period in period_grid]
+                    for p_id, _ in top_products
+                ]
+                forecast_labels = future_periods(last_period, granularity, periods_to_forecast)
+                yhat = forecast_matrix(quantities, periods_to_forecast, engine, granularity) if top_products else []
+                result = []
+                for (p_id, _), row in zip(top_products, yhat):
+                    result.append({
+                        "p_id": p_id,
+                        "p_name": product_names.get(p_id, f"Product {p_id}"),
+                        "forecasted_demand_periods": [
+                            {"period": period_str, "quantity": max(0, int(round(float(value))))}
+                            for period_str, value in zip(forecast_labels, row)
+                        ]
+                    })
+                logger.debug("Inventory Needs Forecast: Generated %s forecasts for %s products.", engine, len(result))
+                return result
+
+            # Forecast each top product: Prophet fits go to the process pool, short histories use the average
+            fits = []
             result = []
             for p_id, total_quantity in top_products:
                 p_name = product_names.get(p_id, f"Product {p_id}")
                 historical_periods = product_period_data[p_id]
-                
-                print(f"[AnalyticsService] Inventory Needs Forecast: Forecasting for product {p_id} ({p_name})")
-                
-                # Extract historical quantities sold per period for this product
-                historical_data = []
-                for period in sorted(historical_periods.keys()):
-                    historical_data.append({
-                        "period": period,
-                        "quantity": historical_periods[period]
-                    })
-                
-                # Convert to Prophet's pd.DataFrame(ds, y) format
+                historical_data = [
+                    {"period": period, "quantity": historical_periods[period]}
+                    for period in sorted(historical_periods.keys())
+                ]
+                entry = {"p_id": p_id, "p_name": p_name, "forecasted_demand_periods": None}
+                result.append(entry)
                 if len(historical_data) < 2:
-                    print(f"[AnalyticsService] Inventory Needs Forecast: Insufficient data for product {p_id}. Using average calculation.")
-                    # Fallback to average calculation for insufficient data
-                    avg_quantity_per_period = sum(historical_periods.values()) / len(historical_periods) if historical_periods else 0
-                    forecasted_demand_periods = []
-                    current_period = last_period
-                    
-                    for i in range(1, periods_to_forecast + 1):
-                        # Calculate next period
-                        if granularity == "month":
-                            year, month = map(int, current_period.split("-"))
-                            if month == 12:
-                                year += 1
-                                month = 1
-                            else:
-                                month += 1
-                            next_period = f"{year:04d}-{month:02d}"
-                        elif granularity == "week":
-                            year, week = map(int, current_period.split("-W"))
-                            week += 1
-                            if week > 52:
-                                year += 1
-                                week = 1
-                            next_period = f"{year:04d}-W{week:02d}"
-                        else:
-                            raise ValueError(f"Unsupported granularity for forecasting: {granularity}")
-                        
-                        forecasted_demand_periods.append({
-                            "period": next_period,
-                            "quantity": int(avg_quantity_per_period)
-                        })
-                        current_period = next_period
+                    logger.debug("Inventory Needs Forecast: Insufficient data for product %s. Using average calculation.", p_id)
+                    entry["forecasted_demand_periods"] = _average_forecast(historical_periods, last_period, granularity, periods_to_forecast)
                 else:
-                    # Use Prophet for forecasting
-                    df = pd.DataFrame(historical_data).rename(columns={'period': 'ds', 'quantity': 'y'})
-                    
-                    # Explicitly specify datetime format based on granularity
-                    if granularity == 'month':
-                        df['ds'] = pd.to_datetime(df['ds'], format='%Y-%m')
-                    elif granularity == 'week':
-                        # Append '-1' to assume weeks start on Monday (day 1 of the week)
-                        df['ds'] = pd.to_datetime(df['ds'] + '-1', format='%Y-%W-%w')
-                    else:
-                        raise ValueError(f"Unsupported granularity for forecasting: {granularity}")
-                    
-                    # Initialize, fit, and predict using Prophet model for this specific product's quantity
-                    model = Prophet(growth='linear', daily_seasonality=False, weekly_seasonality=False, yearly_seasonality=False)
-                    model.fit(df)
-                    
-                    # Make future dataframe for prediction with correct frequency
-                    if granularity == 'month':
-                        future = model.make_future_dataframe(periods=periods_to_forecast, freq='MS')
-                    elif granularity == 'week':
-                        # Use 'W-MON' for weeks starting on Monday
-                        future = model.make_future_dataframe(periods=periods_to_forecast, freq='W-MON')
-                    else:
-                        raise ValueError(f"Unsupported granularity for forecasting: {granularity}")
-                    
-                    # Generate prediction
-                    forecast_df = model.predict(future)
-                    
-                    # Extract ds and yhat from forecast_df
-                    forecasted_demand_periods = []
-                    for _, row in forecast_df.iterrows():
-                        ds = row['ds']
-                        yhat = row['yhat']
-                        
-                        # Map back to desired period format based on granularity
-                        if granularity == "month":
-                            period_str = ds.strftime("%Y-%m")
-                        elif granularity == "week":
-                            period_str = ds.strftime("%Y-%W")
-                        else:
-                            raise ValueError(f"Unsupported granularity for forecasting: {granularity}")
-                        
-                        # Only add forecasted periods (not historical ones)
-                        if period_str > last_period:
-                            forecasted_demand_periods.append({
-                                "period": period_str,
-                                "quantity": max(0, int(round(float(yhat))))
-                            })
+                    fits.append((entry, historical_periods, historical_data))
+
+            forecasts = await self._run_product_fits(
+                [historical_data for _, _, historical_data in fits], last_period, granularity, periods_to_forecast
+            )
+            for (entry, historical_periods, _), forecast in zip(fits, forecasts):
+                if isinstance(forecast, BaseException):
+                    logger.warning("Inventory Needs Forecast: Prophet fit failed for product %s (%r). Using average calculation.", entry['p_id'], forecast)
+                    forecast = _average_forecast(historical_periods, last_period, granularity, periods_to_forecast)
+                entry["forecasted_demand_periods"] = forecast
+            
+            logger.debug("Inventory Needs Forecast: Generated forecasts for %s products.", len(result))
+            return result
+            
+        except Exception as e:
+            logger.error("Error in get_inventory_needs_forecast: %s", e)
+            raise
+
+    def _aggregate_product_periods(self, start_date: datetime, end_date: datetime, granularity: str):
+        """Per-product quantities by period from the order cache: (p_id -> period -> qty, p_id -> name, p_id -> total)."""
+        all_orders = self.all_cached_orders
+        logger.debug("Inventory Needs Forecast: Using %s cached orders.", len(all_orders))
+        
+        filtered_orders = self._orders_in_range(start_date, end_date)
+        logger.debug("Inventory Needs Forecast: Filtered down to %s orders.", len(filtered_orders))
+        
+        # Get historical sales data per product by period
+        product_period_data = defaultdict(lambda: defaultdict(int))  # p_id -> period -> quantity
+        product_names = {}  # p_id -> p_name
+        product_total_quantity = defaultdict(int)  # p_id -> total_quantity_sold
+        
+        # Aggregate sales data by product and period
+        for order in filtered_orders:
+            o_placed_time = order.o_placed_time
+            if not o_placed_time:
+                continue
+            
+            # Determine period based on granularity
+            if granularity == "month":
+                period_str = o_placed_time.strftime("%Y-%m")
+            elif granularity == "week":
+                period_str = o_placed_time.strftime("%Y-%W")
+            else:
+                raise ValueError(f"Unsupported granularity: {granularity}")
+            
+            # Process each item in the order
+            for item in order.items:
+                p_id = item.p_id
+                p_name = item.p_name
+                oi_qty = item.oi_qty
                 
-                result.append({
-                    "p_id": p_id,
-                    "p_name": p_name,
-                    "forecasted_demand_periods": forecasted_demand_periods
+                if p_id and oi_qty > 0:
+                    product_period_data[p_id][period_str] += oi_qty
+                    product_total_quantity[p_id] += oi_qty
+                    if p_id not in product_names and p_name:
+                        product_names[p_id] = p_name
+        return product_period_data, product_names, product_total_quantity
+
+    async def _run_product_fits(self, histories: list, last_period: str, granularity: str, periods_to_forecast: int) -> list:
+        """Fit one Prophet model per history and return forecasts in input order.
+
+        Fits run in the "forecast" process pool; a failed or timed-out fit yields its exception in place
+        of the forecast so the caller can fall back. The i-th fit may wait behind i // workers earlier
+        fits in the queue, so its deadline is scaled by its queue position.
+        """
+        if not histories:
+            return []
+        workers = Config.FORECAST_POOL_WORKERS
+        if workers <= 0:
+            results = []
+            for historical_data in histories:
+                try:
+                    results.append(_fit_prophet_product_forecast(historical_data, last_period, granularity, periods_to_forecast))
+                except Exception as e:
+                    results.append(e)
+            return results
+
+        loop = asyncio.get_running_loop()
+        pool = get_process_pool("forecast", workers)
+        timeout = Config.FORECAST_FIT_TIMEOUT_SECONDS
+        try:
+            futures = [
+                pool.submit(_fit_prophet_product_forecast, historical_data, last_period, granularity, periods_to_forecast)
+                for historical_data in histories
+            ]
+        except BrokenProcessPool:
+            reset_process_pool("forecast")
+            raise
+        waits = [
+            asyncio.wait_for(asyncio.wrap_future(future, loop=loop), timeout=timeout * (i // workers + 1))
+            for i, future in enumerate(futures)
+        ]
+        results = await asyncio.gather(*waits, return_exceptions=True)
+        for future, outcome in zip(futures, results):
+            if isinstance(outcome, asyncio.TimeoutError):
+                # Only cancels fits still queued; a fit already running finishes in its worker and is discarded
+                future.cancel()
+        if any(isinstance(outcome, BrokenProcessPool) for outcome in results):
+            reset_process_pool("forecast")
+        return results
+
+    @memoize_result
+    async def _get_demand_statistics(self, lookback_days: int, halflife_days: float) -> dict:
+        """EWMA daily demand and its variability for every catalog product over the last lookback_days full UTC days."""
+        today = datetime.now(timezone.utc).replace(hour=0, minute=0, second=0, microsecond=0)
+        start_date = today - timedelta(days=lookback_days)
+        end_date = today - timedelta(microseconds=1)
+        p_ids = list(self.all_cached_products)
+        catalog_index = {p_id: i for i, p_id in enumerate(p_ids)}
+
+        snapshot_sales = None
+        if isinstance(self.all_cached_orders, SnapshotOrders):
+            snapshot_sales = self.all_cached_orders.item_sales(start_date, end_date)
+        if self.sql_backend is not None:
+            rows = await self.sql_backend.get_daily_product_quantities(start_date, end_date)
+            product_index = [catalog_index.get(p_id, -1) for p_id, _, _ in rows]
+            day_index = [(day - start_date.date()).days for _, day, _ in rows]
+            quantities = [quantity for _, _, quantity in rows]
+        elif snapshot_sales is not None:
+            # Straight from the mapped columns, without building records
+            p_id_values, p_id_code, placed_us, quantities = snapshot_sales
+            code_to_catalog = np.array([catalog_index.get(p_id, -1) for p_id in p_id_values], dtype=np.int64)
+            product_index = code_to_catalog[p_id_code]
+            day_index = (placed_us - int(start_date.timestamp()) * 1_000_000) // 86_400_000_000
+            # Returns and zero lines are not demand (as in the other two branches)
+            product_index[quantities <= 0] = -1
+        else:
+            # Column by column: per-order days repeated over each order's items, item columns via map
+            orders = self._orders_in_range(start_date, end_date)
+            items = list(chain.from_iterable(map(attrgetter("items"), orders)))
+            item_counts = np.fromiter(map(len, map(attrgetter("items"), orders)), dtype=np.int64, count=len(orders))
+            order_days = np.fromiter(
+                ((placed_time - start_date).days for placed_time in map(attrgetter("o_placed_time"), orders)),
+                dtype=np.int64, count=len(orders)
+            )
+            day_index = np.repeat(order_days, item_counts)
+            product_index = np.fromiter(
+                map(catalog_index.get, map(attrgetter("p_id"), items), repeat(-1)), dtype=np.int64, count=len(items)
+            )
+            quantities = np.fromiter(map(attrgetter("oi_qty"), items), dtype=np.float64, count=len(items))
+            # Returns and zero lines are not demand
+            product_index[quantities <= 0] = -1
+
+        velocity, std = demand_statistics(product_index, day_index, quantities, len(p_ids), lookback_days, halflife_days)
+        return {"p_ids": p_ids, "velocity": velocity, "std": std}
+
+    async def get_reorder_recommendations(self, lead_time_days: Optional[float] = None, service_level: Optional[float] = None,
+                                          lookback_days: Optional[int] = None, limit: int = 100, only_needed: bool = False) -> dict:
+        """Days of cover and reorder points for the whole catalog, most urgent first.
+
+        Demand statistics are memoized per data version; current stock (kept live by apply_stock_change)
+        is applied on every call, so this method itself is not memoized.
+        """
+        try:
+            lead_time_days = Config.REORDER_LEAD_TIME_DAYS if lead_time_days is None else lead_time_days
+            service_level = Config.REORDER_SERVICE_LEVEL if service_level is None else service_level
+            lookback_days = Config.REORDER_LOOKBACK_DAYS if lookback_days is None else lookback_days
+            logger.debug("get_reorder_recommendations called: lead time %sd, service level %s, lookback %sd", lead_time_days, service_level, lookback_days)
+            stats = await self._get_demand_statistics(lookback_days, Config.REORDER_EWMA_HALFLIFE_DAYS)
+            p_ids = stats["p_ids"]
+            stock = np.fromiter(
+                (self.all_cached_products.get(p_id, {}).get("stock", 0) or 0 for p_id in p_ids),
+                dtype=np.float64, count=len(p_ids)
+            )
+            points = reorder_points(stats["velocity"], stats["std"], stock, lead_time_days, service_level)
+            order = np.argsort(points["days_of_cover"], kind="stable")
+            if only_needed:
+                order = order[points["reorder_needed"][order]]
+            if limit:
+                order = order[:limit]
+
+            products = []
+            for i in order.tolist():
+                days_of_cover = float(points["days_of_cover"][i])
+                products.append({
+                    "p_id": p_ids[i],
+                    "p_name": self.all_cached_products.get(p_ids[i], {}).get("name", ""),
+                    "p_stock": int(stock[i]),
+                    "daily_velocity": round(float(stats["velocity"][i]), 4),
+                    "daily_std": round(float(stats["std"][i]), 4),
+                    "days_of_cover": round(days_of_cover, 1) if np.isfinite(days_of_cover) else None,
+                    "safety_stock": round(float(points["safety_stock"][i]), 2),
+                    "reorder_point": round(float(points["reorder_point"][i]), 2),
+                    "reorder_needed": bool(points["reorder_needed"][i]),
+                    "suggested_order_quantity": int(points["suggested_order_quantity"][i]),
                 })
-            
-            print(f"[AnalyticsService] Inventory Needs Forecast: Generated forecasts for {len(result)} products.")
+            result = {
+                "leadTimeDays": lead_time_days,
+                "serviceLevel": service_level,
+                "lookbackDays": lookback_days,
+                "totalProducts": len(p_ids),
+                "reorderCount": int(points["reorder_needed"].sum()),
+                "products": products
+            }
+            logger.debug("Reorder: %s of %s products at or below their reorder point.", result['reorderCount'], len(p_ids))
             return result
-            
         except Exception as e:
-            print(f"[AnalyticsService] Error in get_inventory_needs_forecast: {e}")
+            logger.error("Error in get_reorder_recommendations: %s", e)
             raise
 
+    @memoize_result
     async def get_catalog_suggestions(self, time_filter: str = "all_time", top_n: int = 5) -> list:
         try:
-            print(f"[AnalyticsService] get_catalog_suggestions called for filter: {time_filter}, top_n: {top_n}")
-            from collections import defaultdict
+            logger.debug("get_catalog_suggestions called for filter: %s, top_n: %s", time_filter, top_n)
             
             start_date, end_date = self._get_date_range(time_filter)
-            print(f"[AnalyticsService] Catalog Suggestions: Date range calculated.")
+            logger.debug("Catalog Suggestions: Date range calculated.")
             
-            all_orders = self.all_cached_orders
-            print(f"[AnalyticsService] Catalog Suggestions: Using {len(all_orders)} cached orders.")
-            
-            # Create defaultdict to store counts and last request date for problematic items
-            item_requests = defaultdict(lambda: {'request_count': 0, 'last_requested': None})
+            if self.get_catalog_error_counts_func is None:
+                logger.debug("Catalog Suggestions: No order error source configured.")
+                return []
             
-            # Loop through all orders
-            for order in all_orders:
-                # Check if order is within the time filter
-                o_placed_time = order.get('o_placed_time')
-                if not o_placed_time or not (start_date <= o_placed_time <= end_date):
-                    continue
-                
-                # Check if order has analysis field with error_items
-                analysis = order.get('analysis')
-                if not analysis or 'error_items' not in analysis:
-                    continue
-                
-                error_items = analysis['error_items']
-                if not error_items:
-                    continue
-                
-                # Process each error item
-                for error_item in error_items:
-                    # Check if this is a product-related error (not found or out of stock)
-                    error_message = error_item.get('error_message', '').lower()
-                    
-                    # Look for indicators of product not found or out of stock
-                    is_product_error = any(keyword in error_message for keyword in [
-                        'not found', 'out of stock', 'insufficient stock', 'unavailable'
-                    ])
-                    
-                    if is_product_error:
-                        # Get product identifier (prefer product_name, fallback to product_id)
-                        item_name = error_item.get('product_name')
-                        if not item_name:
-                            item_name = error_item.get('product_id', 'Unknown Product')
-                        
-                        # Increment request count
-                        item_requests[item_name]['request_count'] += 1
-                        
-                        # Update last requested date (keep the most recent)
-                        if item_requests[item_name]['last_requested'] is None or o_placed_time > item_requests[item_name]['last_requested']:
-                            item_requests[item_name]['last_requested'] = o_placed_time
-            
-            print(f"[AnalyticsService] Catalog Suggestions: Found {len(item_requests)} items with errors.")
+            # Aggregated in the database over the indexed order_errors event table
+            rows = await self.get_catalog_error_counts_func(start_date, end_date, top_n)
             
-            # Convert defaultdict into a list of dictionaries
-            suggestions_list = []
-            for item_name, data in item_requests.items():
+            result = []
+            for row in rows:
                 # Format the date as YYYY-MM-DD
-                last_requested_str = None
-                if data['last_requested']:
-                    last_requested_str = data['last_requested'].strftime("%Y-%m-%d")
-                
-                suggestions_list.append({
-                    "item_name": item_name,
-                    "request_count": data['request_count'],
-                    "last_requested": last_requested_str
+                last_requested = row.get("last_requested")
+                result.append({
+                    "item_name": row["p_name_norm"],
+                    "request_count": row["request_count"],
+                    "last_requested": last_requested.strftime("%Y-%m-%d") if last_requested else None
                 })
             
-            # Sort by request_count in descending order
-            suggestions_list.sort(key=lambda x: x['request_count'], reverse=True)
-            
-            # Return only the top_n suggestions
-            result = suggestions_list[:top_n]
-            
-            print(f"[AnalyticsService] Catalog Suggestions: Returning top {len(result)} suggestions.")
+            logger.debug("Catalog Suggestions: Returning top %s suggestions.", len(result))
             return result
             
         except Exception as e:
-            print(f"[AnalyticsService] Error in get_catalog_suggestions: {e}")
-            raise 
\ No newline at end of file
+            logger.error("Error in get_catalog_suggestions: %s", e)
+            raise
@@ -0,0 +1,309 @@
+import json
+import logging
+import os
+import shutil
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Awaitable, Callable, Optional
+import numpy as np
+from records import OrderRecord, OrderItemRecord, intern_str
+
+try:
+    import fcntl
+except ImportError:  # Windows: writers are not serialized across workers
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_FORMAT_VERSION = 1
+_CURRENT_FILE = "CURRENT"
+_LOCK_FILE = ".lock"
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+_NO_DATE = np.iinfo(np.int64).min
+# Records are built from column slices of this many orders at a time
+_CHUNK_ORDERS = 4096
+
+# Columns are plain .npy files. Order columns are indexed by order position (newest first),
+# item columns by item position; item_offsets[i]:item_offsets[i + 1] are the items of order i.
+# Repeated strings are dictionary-encoded: *_code columns index into the matching *_values array.
+_ORDER_COLUMNS = ("o_id", "c_id_code", "c_name_code", "c_address_code", "o_delivery_date_us",
+                  "o_placed_time_us", "total_value", "o_status_code", "item_offsets")
+_ITEM_COLUMNS = ("p_id_code", "p_name_code", "oi_qty", "oi_price", "oi_total")
+_DICTIONARIES = ("c_id_values", "c_name_values", "c_address_values", "o_status_values", "p_id_values", "p_name_values")
+
+
+def _to_us(value: Optional[datetime]) -> int:
+    if value is None:
+        return _NO_DATE
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return (value - _EPOCH) // timedelta(microseconds=1)
+
+
+def _from_us(value: int) -> Optional[datetime]:
+    return None if value == _NO_DATE else _EPOCH + timedelta(microseconds=value)
+
+
+def _encode(values: list):
+    """Dictionary-encode strings: (int32 codes, fixed-width unicode array of distinct values)."""
+    index = {}
+    codes = np.fromiter((index.setdefault(value or "", len(index)) for value in values), dtype=np.int32, count=len(values))
+    return codes, np.array(list(index) or [""], dtype=str)
+
+
+def _string_array(values: list) -> np.ndarray:
+    return np.array(values, dtype=str) if values else np.empty(0, dtype="<U1")
+
+
+class SnapshotOrders:
+    """Read-only sequence of OrderRecords backed by memory-mapped snapshot columns.
+
+    The column pages live in the OS page cache and are shared by every worker mapping the same
+    snapshot; records are built on the fly while iterating, so a worker holds only the decoded
+    dictionaries (distinct ids, names and statuses).
+    """
+
+    def __init__(self, path: str, manifest: dict):
+        self.path = path
+        self.manifest = manifest
+        self.columns = {
+            name: np.load(os.path.join(path, f"{name}.npy"), mmap_mode="r")
+            for name in _ORDER_COLUMNS + _ITEM_COLUMNS
+        }
+        self.dictionaries = {
+            name: [intern_str(value) for value in np.load(os.path.join(path, f"{name}.npy")).tolist()]
+            for name in _DICTIONARIES
+        }
+        self._placed_time = self.columns["o_placed_time_us"]
+
+    @property
+    def nbytes(self) -> int:
+        """Bytes of mapped column data (shared between workers, not per process)."""
+        return sum(column.nbytes for column in self.columns.values())
+
+    def __len__(self) -> int:
+        return len(self._placed_time)
+
+    def __iter__(self):
+        for start in range(0, len(self), _CHUNK_ORDERS):
+            yield from self._build(start, min(start + _CHUNK_ORDERS, len(self)))
+
+    def __getitem__(self, index: int) -> OrderRecord:
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("order index out of range")
+        return self._build(index, index + 1)[0]
+
+    def _bounds(self, start_date: datetime, end_date: datetime):
+        """(first, last) order positions placed in [start_date, end_date], or None if the time column is unsorted."""
+        if not self.manifest.get("placed_time_sorted"):
+            return None
+        # Stored newest first; search the ascending reversed view and map the bounds back
+        ascending = self._placed_time[::-1]
+        low = int(np.searchsorted(ascending, _to_us(start_date), side="left"))
+        high = int(np.searchsorted(ascending, _to_us(end_date), side="right"))
+        return len(self) - high, len(self) - low
+
+    def between(self, start_date: datetime, end_date: datetime) -> list:
+        """Records placed in [start_date, end_date], found by binary search on the time column."""
+        bounds = self._bounds(start_date, end_date)
+        if bounds is None:
+            return [order for order in self if order.o_placed_time and start_date <= order.o_placed_time <= end_date]
+        first, last = bounds
+        return self._build(first, last) if first < last else []
+
+    def item_sales(self, start_date: datetime, end_date: datetime):
+        """Item-level arrays for orders in the range, read straight from the columns.
+
+        Returns (p_id_values, p_id_code, placed_time_us, oi_qty) with one entry per item, or None if
+        the time column is unsorted.
+        """
+        bounds = self._bounds(start_date, end_date)
+        if bounds is None:
+            return None
+        first, last = bounds
+        last = max(first, last)
+        offsets = np.asarray(self.columns["item_offsets"][first:last + 1])
+        item_start, item_stop = int(offsets[0]), int(offsets[-1])
+        placed = np.repeat(np.asarray(self._placed_time[first:last]), np.diff(offsets))
+        return (
+            self.dictionaries["p_id_values"],
+            np.asarray(self.columns["p_id_code"][item_start:item_stop]),
+            placed,
+            np.asarray(self.columns["oi_qty"][item_start:item_stop]),
+        )
+
+    def _build(self, start: int, stop: int) -> list:
+        c = self.columns
+        d = self.dictionaries
+        offsets = c["item_offsets"][start:stop + 1].tolist()
+        item_start, item_stop = offsets[0], offsets[-1]
+        items = list(map(
+            OrderItemRecord._make,
+            zip(
+                [d["p_id_values"][code] for code in c["p_id_code"][item_start:item_stop].tolist()],
+                [d["p_name_values"][code] for code in c["p_name_code"][item_start:item_stop].tolist()],
+                c["oi_qty"][item_start:item_stop].tolist(),
+                c["oi_price"][item_start:item_stop].tolist(),
+                c["oi_total"][item_start:item_stop].tolist(),
+            )
+        ))
+        records = []
+        rows = zip(
+            c["o_id"][start:stop].tolist(),
+            c["c_id_code"][start:stop].tolist(),
+            c["c_name_code"][start:stop].tolist(),
+            c["c_address_code"][start:stop].tolist(),
+            c["o_delivery_date_us"][start:stop].tolist(),
+            c["o_placed_time_us"][start:stop].tolist(),
+            c["total_value"][start:stop].tolist(),
+            c["o_status_code"][start:stop].tolist(),
+        )
+        for i, (o_id, c_id, c_name, c_address, delivery_us, placed_us, total_value, status) in enumerate(rows):
+            records.append(OrderRecord(
+                o_id,
+                d["c_id_values"][c_id],
+                d["c_name_values"][c_name],
+                d["c_address_values"][c_address],
+                _from_us(delivery_us),
+                _from_us(placed_us),
+                total_value,
+                d["o_status_values"][status],
+                tuple(items[offsets[i] - item_start:offsets[i + 1] - item_start]),
+            ))
+        return records
+
+
+class AnalyticsSnapshotStore:
+    """Versioned on-disk snapshots of the analytics order cache.
+
+    Each snapshot is a directory of .npy columns plus manifest.json, written under a temporary name
+    and renamed into place; CURRENT names the latest one. A snapshot is reused while its manifest
+    fingerprint matches the database, so the first worker to boot scans the orders and the others
+    memory-map its files. fingerprint_func is an async callable returning a string that changes
+    whenever a stored order or item column does; it runs on every load, so it should be cheap
+    (db._get_orders_snapshot_key_async reads the table versions).
+    """
+
+    def __init__(self, directory: str, fingerprint_func: Callable[[], Awaitable[str]], keep: int = 2):
+        self.directory = directory
+        self.fingerprint_func = fingerprint_func
+        self.keep = max(keep, 1)
+        os.makedirs(directory, exist_ok=True)
+
+    async def load_or_build(self, build_func: Callable[[], Awaitable[list]]):
+        """Map the current snapshot if it matches the database, otherwise rebuild it with build_func."""
+        fingerprint = await self.fingerprint_func()
+        snapshot = self.open_current(fingerprint)
+        if snapshot is not None:
+            logger.info("Mapped snapshot %s.", snapshot.manifest['version'])
+            return snapshot
+        if fingerprint is None:
+            # Database unreachable: nothing to compare against, and nothing worth snapshotting
+            logger.info("No database fingerprint; loading without a snapshot.")
+            return await build_func()
+        lock = self._lock()
+        try:
+            # Another worker may have written it while we waited for the lock
+            snapshot = self.open_current(fingerprint)
+            if snapshot is not None:
+                logger.info("Mapped snapshot %s written by another worker.", snapshot.manifest['version'])
+                return snapshot
+            orders = await build_func()
+            snapshot = self.write(orders, fingerprint)
+            logger.info("Wrote snapshot %s (%s orders).", snapshot.manifest['version'], len(orders))
+            return snapshot
+        finally:
+            if lock is not None:
+                lock.close()
+
+    def open_current(self, fingerprint: Optional[str] = None) -> Optional[SnapshotOrders]:
+        try:
+            with open(os.path.join(self.directory, _CURRENT_FILE)) as f:
+                name = f.read().strip()
+            path = os.path.join(self.directory, name)
+            with open(os.path.join(path, "manifest.json")) as f:
+                manifest = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if manifest.get("format_version") != SNAPSHOT_FORMAT_VERSION:
+            return None
+        if fingerprint is not None and manifest.get("fingerprint") != fingerprint:
+            return None
+        try:
+            return SnapshotOrders(path, manifest)
+        except (OSError, ValueError) as e:
+            logger.warning("Could not map snapshot %s: %s", name, e)
+            return None
+
+    def write(self, orders: list, fingerprint: str) -> SnapshotOrders:
+        """Write orders as a new snapshot, make it current and return it mapped."""
+        version = time.time_ns()
+        name = f"snapshot-{version}"
+        tmp_path = os.path.join(self.directory, f".tmp-{name}-{uuid.uuid4().hex}")
+        os.makedirs(tmp_path)
+        try:
+            columns = self._columns(orders)
+            for column_name, values in columns.items():
+                np.save(os.path.join(tmp_path, f"{column_name}.npy"), values, allow_pickle=False)
+            manifest = {
+                "format_version": SNAPSHOT_FORMAT_VERSION,
+                "version": version,
+                "fingerprint": fingerprint,
+                "created_at": datetime.now(timezone.utc).isoformat(),
+                "orders": len(orders),
+                "items": int(columns["item_offsets"][-1]),
+                "placed_time_sorted": bool(np.all(np.diff(columns["o_placed_time_us"]) <= 0)),
+            }
+            with open(os.path.join(tmp_path, "manifest.json"), "w") as f:
+                json.dump(manifest, f)
+            path = os.path.join(self.directory, name)
+            os.rename(tmp_path, path)
+        except BaseException:
+            shutil.rmtree(tmp_path, ignore_errors=True)
+            raise
+        current_tmp = os.path.join(self.directory, f".{_CURRENT_FILE}-{uuid.uuid4().hex}")
+        with open(current_tmp, "w") as f:
+            f.write(name)
+        os.replace(current_tmp, os.path.join(self.directory, _CURRENT_FILE))
+        self._prune(name)
+        return SnapshotOrders(path, manifest)
+
+    @staticmethod
+    def _columns(orders: list) -> dict:
+        columns = {}
+        items = [item for order in orders for item in order.items]
+        columns["o_id"] = _string_array([order.o_id for order in orders])
+        for field in ("c_id", "c_name", "c_address", "o_status"):
+            columns[f"{field}_code"], columns[f"{field}_values"] = _encode([getattr(order, field) for order in orders])
+        columns["o_delivery_date_us"] = np.array([_to_us(order.o_delivery_date) for order in orders], dtype=np.int64)
+        columns["o_placed_time_us"] = np.array([_to_us(order.o_placed_time) for order in orders], dtype=np.int64)
+        columns["total_value"] = np.array([order.total_value for order in orders], dtype=np.float64)
+        columns["item_offsets"] = np.concatenate(([0], np.cumsum([len(order.items) for order in orders], dtype=np.int64)))
+        for field in ("p_id", "p_name"):
+            columns[f"{field}_code"], columns[f"{field}_values"] = _encode([getattr(item, field) for item in items])
+        columns["oi_qty"] = np.array([item.oi_qty for item in items], dtype=np.int64)
+        columns["oi_price"] = np.array([item.oi_price for item in items], dtype=np.float64)
+        columns["oi_total"] = np.array([item.oi_total for item in items], dtype=np.float64)
+        return columns
+
+    def _lock(self):
+        """Hold an exclusive lock on the store while rebuilding, so only one worker scans the database."""
+        if fcntl is None:
+            return None
+        lock = open(os.path.join(self.directory, _LOCK_FILE), "w")
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        return lock
+
+    def _prune(self, current_name: str):
+        """Delete all but the newest `keep` snapshots. Workers still mapping a deleted one keep their pages."""
+        snapshots = sorted(
+            (entry for entry in os.listdir(self.directory) if entry.startswith("snapshot-")),
+            key=lambda entry: int(entry.split("-", 1)[1]),
+            reverse=True,
+        )
+        for entry in snapshots[self.keep:]:
+            if entry != current_name:
+                shutil.rmtree(os.path.join(self.directory, entry), ignore_errors=True)
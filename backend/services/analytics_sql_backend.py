@@ -0,0 +1,177 @@
+from collections import defaultdict
+from datetime import datetime
+from db import get_connection
+
+# date_trunc unit per granularity. Postgres has no equivalent of strftime's %W (Monday-based week
+# of year), so weeks are truncated to days in SQL and folded into "%Y-%W" labels in Python.
+_TRUNC_UNITS = {"month": "month", "week": "day", "year": "year"}
+_PERIOD_FORMATS = {"month": "%Y-%m", "week": "%Y-%W", "year": "%Y"}
+
+class SqlAnalyticsBackend:
+    """GROUP BY aggregations over orders/order_items for AnalyticsService's "sql" backend.
+
+    Each method returns the same intermediate aggregates the in-memory backend builds by scanning
+    its order cache, so AnalyticsService can shape identical results without holding any orders.
+    Timestamps are bucketed in UTC, matching strftime on the UTC datetimes asyncpg returns.
+    The queries rely on the indexes of migrations/002_analytics_indexes.sql.
+    """
+
+    async def _connect(self):
+        connection = await get_connection()
+        if not connection:
+            raise ConnectionError("Database connection failed.")
+        return connection
+
+    async def get_kpi_totals(self, start_date: datetime, end_date: datetime) -> dict:
+        connection = await self._connect()
+        try:
+            row = await connection.fetchrow(
+                """
+                SELECT
+                    (SELECT count(*) FROM orders WHERE o_placed_time BETWEEN $1 AND $2) AS total_orders,
+                    (SELECT count(DISTINCT nullif(c_id, '')) FROM orders WHERE o_placed_time BETWEEN $1 AND $2) AS unique_customers,
+                    (SELECT coalesce(sum(oi.oi_total), 0)
+                       FROM orders o JOIN order_items oi ON oi.o_id = o.o_id
+                      WHERE o.o_placed_time BETWEEN $1 AND $2) AS total_revenue,
+                    (SELECT count(*) FROM customers WHERE c_created_time BETWEEN $1 AND $2) AS new_customers;
+                """,
+                start_date, end_date
+            )
+            return {
+                "total_orders": row["total_orders"],
+                "unique_customers": row["unique_customers"],
+                "total_revenue": float(row["total_revenue"]),
+                "new_customers": row["new_customers"],
+            }
+        finally:
+            await connection.close()
+
+    async def get_revenue_by_period(self, start_date: datetime, end_date: datetime, granularity: str) -> dict:
+        """{period label: revenue} for orders placed in the range."""
+        if granularity not in _TRUNC_UNITS:
+            raise ValueError(f"Unknown granularity: {granularity}")
+        connection = await self._connect()
+        try:
+            rows = await connection.fetch(
+                """
+                SELECT date_trunc($3, o.o_placed_time AT TIME ZONE 'UTC') AS bucket, sum(oi.oi_total) AS revenue
+                FROM orders o JOIN order_items oi ON oi.o_id = o.o_id
+                WHERE o.o_placed_time BETWEEN $1 AND $2
+                GROUP BY bucket;
+                """,
+                start_date, end_date, _TRUNC_UNITS[granularity]
+            )
+        finally:
+            await connection.close()
+        revenue_by_period = defaultdict(float)
+        for row in rows:
+            revenue_by_period[row["bucket"].strftime(_PERIOD_FORMATS[granularity])] += float(row["revenue"] or 0)
+        return revenue_by_period
+
+    async def get_status_counts(self, start_date: datetime, end_date: datetime) -> dict:
+        """{raw o_status: order count}; the caller normalizes status names."""
+        connection = await self._connect()
+        try:
+            rows = await connection.fetch(
+                """
+                SELECT o_status, count(*) AS order_count
+                FROM orders
+                WHERE o_placed_time BETWEEN $1 AND $2
+                GROUP BY o_status;
+                """,
+                start_date, end_date
+            )
+            return {row["o_status"]: row["order_count"] for row in rows}
+        finally:
+            await connection.close()
+
+    async def get_product_totals(self, start_date: datetime, end_date: datetime, top_n: int) -> list:
+        """Top products by quantity: [{"p_id", "p_name", "total_quantity_sold", "total_revenue"}].
+
+        The name is the most recent non-empty one and ties go to the most recently ordered product
+        (then item insertion order), as in the in-memory scan over orders sorted newest first.
+        """
+        connection = await self._connect()
+        try:
+            rows = await connection.fetch(
+                """
+                SELECT oi.p_id,
+                       (array_agg(oi.p_name ORDER BY o.o_placed_time DESC) FILTER (WHERE oi.p_name <> ''))[1] AS p_name,
+                       sum(oi.oi_qty) AS total_quantity_sold,
+                       sum(oi.oi_total) AS total_revenue
+                FROM orders o JOIN order_items oi ON oi.o_id = o.o_id
+                WHERE o.o_placed_time BETWEEN $1 AND $2 AND oi.p_id <> ''
+                GROUP BY oi.p_id
+                ORDER BY total_quantity_sold DESC, max(o.o_placed_time) DESC,
+                         (array_agg(oi.oi_id ORDER BY o.o_placed_time DESC, oi.oi_id))[1]
+                LIMIT $3;
+                """,
+                start_date, end_date, top_n
+            )
+        finally:
+            await connection.close()
+        return [
+            {
+                "p_id": row["p_id"],
+                "p_name": row["p_name"] or "",
+                "total_quantity_sold": int(row["total_quantity_sold"] or 0),
+                "total_revenue": float(row["total_revenue"] or 0),
+            }
+            for row in rows
+        ]
+
+    async def get_product_period_quantities(self, start_date: datetime, end_date: datetime, granularity: str):
+        """Per-product quantities by period for inventory forecasting.
+
+        Returns (product_period_data, product_names, product_total_quantity) shaped like the in-memory
+        aggregation, with products in most-recently-ordered-first order.
+        """
+        if granularity not in ("month", "week"):
+            raise ValueError(f"Unsupported granularity: {granularity}")
+        connection = await self._connect()
+        try:
+            rows = await connection.fetch(
+                """
+                SELECT oi.p_id,
+                       date_trunc($3, o.o_placed_time AT TIME ZONE 'UTC') AS bucket,
+                       sum(oi.oi_qty) AS quantity,
+                       (array_agg(oi.p_name ORDER BY o.o_placed_time DESC) FILTER (WHERE oi.p_name <> ''))[1] AS p_name,
+                       max(o.o_placed_time) AS last_placed,
+                       (array_agg(oi.oi_id ORDER BY o.o_placed_time DESC, oi.oi_id))[1] AS last_item
+                FROM orders o JOIN order_items oi ON oi.o_id = o.o_id
+                WHERE o.o_placed_time BETWEEN $1 AND $2 AND oi.p_id <> '' AND oi.oi_qty > 0
+                GROUP BY oi.p_id, bucket
+                ORDER BY last_placed DESC, last_item;
+                """,
+                start_date, end_date, _TRUNC_UNITS[granularity]
+            )
+        finally:
+            await connection.close()
+        product_period_data = defaultdict(lambda: defaultdict(int))
+        product_names = {}
+        product_total_quantity = defaultdict(int)
+        for row in rows:
+            p_id = row["p_id"]
+            quantity = int(row["quantity"])
+            product_period_data[p_id][row["bucket"].strftime(_PERIOD_FORMATS[granularity])] += quantity
+            product_total_quantity[p_id] += quantity
+            if p_id not in product_names and row["p_name"]:
+                product_names[p_id] = row["p_name"]
+        return product_period_data, product_names, product_total_quantity
+
+    async def get_daily_product_quantities(self, start_date: datetime, end_date: datetime) -> list:
+        """[(p_id, UTC day, quantity)] for every product and day with sales in the range."""
+        connection = await self._connect()
+        try:
+            rows = await connection.fetch(
+                """
+                SELECT oi.p_id, (o.o_placed_time AT TIME ZONE 'UTC')::date AS day, sum(oi.oi_qty) AS quantity
+                FROM orders o JOIN order_items oi ON oi.o_id = o.o_id
+                WHERE o.o_placed_time BETWEEN $1 AND $2 AND oi.p_id <> '' AND oi.oi_qty > 0
+                GROUP BY oi.p_id, day;
+                """,
+                start_date, end_date
+            )
+        finally:
+            await connection.close()
+        return [(row["p_id"], row["day"], int(row["quantity"])) for row in rows]
@@ -1,7 +1,6 @@
 # backend/services/communications_service.py
 import json
 from typing import Dict
-import google.generativeai as genai
 from config import Config
 from models import CustomerMessage, ValidationResult
 
@@ -10,8 +9,16 @@ class CommunicationsService:
     """Communications Agent: Generates professional customer responses from validation results."""
     
     def __init__(self):
-        genai.configure(api_key=Config.GOOGLE_API_KEY)
-        self.model = genai.GenerativeModel(Config.GEMINI_MODEL)
+        self._model = None
+
+    @property
+    def model(self):
+        """Gemini model, created on first use (google.generativeai is slow to import)."""
+        if self._model is None:
+            import google.generativeai as genai
+            genai.configure(api_key=Config.GOOGLE_API_KEY)
+            self._model = genai.GenerativeModel(Config.GEMINI_MODEL)
+        return self._model
     
     def generate_customer_message(self, validation_result: ValidationResult) -> CustomerMessage:
         """Generate a professional customer message from a ValidationResult."""
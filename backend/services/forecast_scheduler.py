@@ -0,0 +1,130 @@
+import asyncio
+import logging
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Optional
+from config import Config
+from query_stats import query_stats
+from services.forecasting import resolve_engine
+
+logger = logging.getLogger(__name__)
+
+
+class ForecastScheduler:
+    """Precomputes the standard forecasts on a background thread.
+
+    Every FORECAST_REFRESH_SECONDS, or as soon as FORECAST_REFRESH_AFTER_ORDERS new orders have been
+    reported through notify_new_order, the scheduler reloads the analytics cache (only if its data
+    changed, see AnalyticsService.reload_if_changed) and refits the sales
+    forecast and the top-N inventory-needs forecast for each configured (time_filter, granularity).
+    Results are kept with the data version they were computed from, so endpoints can serve them
+    immediately along with freshness metadata.
+    """
+
+    def __init__(self, analytics_service, interval_seconds: float = None, order_threshold: int = None):
+        self.analytics_service = analytics_service
+        self.interval_seconds = interval_seconds if interval_seconds is not None else Config.FORECAST_REFRESH_SECONDS
+        self.order_threshold = order_threshold if order_threshold is not None else Config.FORECAST_REFRESH_AFTER_ORDERS
+        self.time_filters = Config.FORECAST_PRECOMPUTE_TIME_FILTERS
+        self.granularities = Config.FORECAST_PRECOMPUTE_GRANULARITIES
+        self.top_n = Config.FORECAST_PRECOMPUTE_TOP_N
+        self.periods = Config.FORECAST_PRECOMPUTE_PERIODS
+        self.results = {}
+        self.new_orders = 0
+        self.last_run = None
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+
+    @staticmethod
+    def _key(kind: str, time_filter: str, granularity: str, periods: int, engine: Optional[str], top_n: Optional[int] = None):
+        return (kind, time_filter, granularity, periods, resolve_engine(engine, Config.FORECAST_ENGINE), top_n)
+
+    def start(self):
+        """Start the scheduler thread; the first run precomputes from the already loaded cache."""
+        with self._lock:
+            if self._thread is not None:
+                return
+            self._thread = threading.Thread(target=self._run, name="forecast-scheduler", daemon=True)
+            self._thread.start()
+        logger.info("Started (every %ss or %s new orders).", self.interval_seconds, self.order_threshold)
+
+    def stop(self):
+        self._stop.set()
+        self._wake.set()
+
+    def notify_new_order(self, count: int = 1):
+        """Record newly created orders; wakes the scheduler once the threshold is reached."""
+        with self._lock:
+            self.new_orders += count
+            due = self.order_threshold > 0 and self.new_orders >= self.order_threshold
+        if due:
+            self._wake.set()
+
+    def _run(self):
+        reload_data = False
+        while not self._stop.is_set():
+            try:
+                with query_stats.scope("forecast_scheduler"):
+                    self.refresh(reload_data=reload_data)
+            except Exception as e:
+                logger.error("Refresh failed: %s", e)
+            reload_data = True
+            self._wake.wait(timeout=self.interval_seconds)
+            self._wake.clear()
+
+    def refresh(self, reload_data: bool = True):
+        """Optionally reload the analytics cache if its data changed, then recompute every standard forecast."""
+        started = time.perf_counter()
+        with self._lock:
+            self.new_orders = 0
+        if reload_data and not asyncio.run(self.analytics_service.reload_if_changed()):
+            logger.debug("Data unchanged; precomputing from the current cache.")
+        data_version = self.analytics_service.data_version
+        asyncio.run(self._precompute(data_version))
+        self.last_run = {
+            "finished_at": datetime.now(timezone.utc).isoformat(),
+            "seconds": round(time.perf_counter() - started, 3),
+            "data_version": data_version,
+        }
+        logger.info("Precomputed %s forecasts for data version %s in %ss.", len(self.results), data_version, self.last_run['seconds'])
+
+    async def _precompute(self, data_version: int):
+        for time_filter in self.time_filters:
+            for granularity in self.granularities:
+                try:
+                    sales = await self.analytics_service.get_sales_forecast(
+                        time_filter=time_filter, periods_to_forecast=self.periods, granularity=granularity
+                    )
+                    self._store(self._key("sales", time_filter, granularity, self.periods, None), sales, data_version)
+                    needs = await self.analytics_service.get_inventory_needs_forecast(
+                        time_filter=time_filter, top_n_products=self.top_n, periods_to_forecast=self.periods, granularity=granularity
+                    )
+                    self._store(self._key("inventory_needs", time_filter, granularity, self.periods, None, self.top_n), needs, data_version)
+                except Exception as e:
+                    logger.warning("Failed to precompute %s/%s: %s", time_filter, granularity, e)
+
+    def _store(self, key, result, data_version: int):
+        with self._lock:
+            self.results[key] = {"result": result, "data_version": data_version, "computed_at": time.time()}
+
+    def get_sales_forecast(self, time_filter: str, periods: int, granularity: str, engine: Optional[str] = None) -> Optional[dict]:
+        """Precomputed entry {"result", "data_version", "computed_at"} or None if not a precomputed combination."""
+        with self._lock:
+            return self.results.get(self._key("sales", time_filter, granularity, periods, engine))
+
+    def get_inventory_needs_forecast(self, time_filter: str, top_n: int, periods: int, granularity: str, engine: Optional[str] = None) -> Optional[dict]:
+        with self._lock:
+            return self.results.get(self._key("inventory_needs", time_filter, granularity, periods, engine, top_n))
+
+    def freshness_headers(self, entry: dict) -> dict:
+        computed_at = entry["computed_at"]
+        return {
+            "X-Forecast-Source": "precomputed",
+            "X-Forecast-Computed-At": datetime.fromtimestamp(computed_at, timezone.utc).isoformat(),
+            "X-Forecast-Age-Seconds": str(int(time.time() - computed_at)),
+            "X-Forecast-Data-Version": str(entry["data_version"]),
+            "X-Forecast-Current-Data-Version": str(self.analytics_service.data_version),
+        }
@@ -0,0 +1,154 @@
+from datetime import datetime, timedelta
+import numpy as np
+
+# "prophet" fits one Prophet model per series; the others are batched NumPy engines that
+# forecast every series of a (n_series, n_periods) matrix in one vectorized pass.
+FORECAST_ENGINES = ("prophet", "linear", "holt_winters", "seasonal_naive")
+NUMPY_ENGINES = ("linear", "holt_winters", "seasonal_naive")
+
+SEASON_LENGTHS = {"month": 12, "week": 52, "year": 1}
+
+
+def resolve_engine(engine: str, default: str) -> str:
+    engine = (engine or default or "prophet").lower()
+    if engine not in FORECAST_ENGINES:
+        raise ValueError(f"Unknown forecast engine: {engine}. Expected one of {', '.join(FORECAST_ENGINES)}")
+    return engine
+
+
+def next_period(period: str, granularity: str) -> str:
+    """Return the period label following period ("%Y-%m", "%Y-%W" or "%Y")."""
+    if granularity == "month":
+        year, month = map(int, period.split("-"))
+        if month == 12:
+            year += 1
+            month = 1
+        else:
+            month += 1
+        return f"{year:04d}-{month:02d}"
+    elif granularity == "week":
+        start = _week_start(period)
+        next_monday = start + timedelta(days=7 - start.weekday())
+        new_year = datetime(start.year + 1, 1, 1)
+        return min(next_monday, new_year).strftime("%Y-%W")
+    elif granularity == "year":
+        return f"{int(period) + 1:04d}"
+    else:
+        raise ValueError(f"Unsupported granularity for forecasting: {granularity}")
+
+
+def _week_start(period: str) -> datetime:
+    """First day labelled period by strftime("%Y-%W"): its Monday, or January 1 for week 00.
+
+    Days before a year's first Monday are week "YYYY-00", so the week containing January 1 is
+    split in two labels ("2022-52" up to December 31, "2023-00" from January 1).
+    """
+    year, week = map(int, period.split("-"))
+    if week == 0:
+        return datetime(year, 1, 1)
+    return datetime.strptime(f"{year:04d}-{week:02d}-1", "%Y-%W-%w")
+
+
+def future_periods(last_period: str, granularity: str, count: int) -> list:
+    periods = []
+    current = last_period
+    for _ in range(count):
+        current = next_period(current, granularity)
+        periods.append(current)
+    return periods
+
+
+def period_range(first_period: str, last_period: str, granularity: str) -> list:
+    """All period labels from first_period to last_period inclusive."""
+    periods = [first_period]
+    while periods[-1] < last_period:
+        periods.append(next_period(periods[-1], granularity))
+    return periods
+
+
+def forecast_matrix(values, periods_to_forecast: int, engine: str, granularity: str,
+                    alpha: float = 0.5, beta: float = 0.2, gamma: float = 0.1) -> np.ndarray:
+    """Forecast every row of values (n_series x n_periods) with a NumPy engine.
+
+    Returns an (n_series x periods_to_forecast) float array. Rows must share one period grid;
+    use zeros for periods without sales.
+    """
+    y = np.asarray(values, dtype=np.float64)
+    if y.ndim == 1:
+        y = y[np.newaxis, :]
+    if y.shape[1] == 0 or periods_to_forecast <= 0:
+        return np.zeros((y.shape[0], max(periods_to_forecast, 0)))
+    season_length = SEASON_LENGTHS.get(granularity, 1)
+    if engine == "linear":
+        return _linear_trend(y, periods_to_forecast)
+    elif engine == "holt_winters":
+        return _holt_winters(y, periods_to_forecast, season_length, alpha, beta, gamma)
+    elif engine == "seasonal_naive":
+        return _seasonal_naive(y, periods_to_forecast, season_length)
+    else:
+        raise ValueError(f"Not a NumPy forecast engine: {engine}")
+
+
+def _least_squares_slope(y: np.ndarray) -> np.ndarray:
+    n = y.shape[1]
+    t_centered = np.arange(n, dtype=np.float64) - (n - 1) / 2
+    denominator = (t_centered ** 2).sum()
+    if denominator == 0:
+        return np.zeros(y.shape[0])
+    return (y - y.mean(axis=1)[:, np.newaxis]) @ t_centered / denominator
+
+
+def _linear_trend(y: np.ndarray, horizon: int) -> np.ndarray:
+    """Least-squares line per series, extrapolated."""
+    n = y.shape[1]
+    slope = _least_squares_slope(y)
+    future_t = np.arange(n, n + horizon, dtype=np.float64) - (n - 1) / 2
+    return y.mean(axis=1)[:, np.newaxis] + slope[:, np.newaxis] * future_t[np.newaxis, :]
+
+
+def _holt(y: np.ndarray, horizon: int, alpha: float, beta: float) -> np.ndarray:
+    """Holt's linear (double exponential) smoothing per series.
+
+    The trend starts from the least-squares slope rather than y[1] - y[0], which is unstable
+    for the intermittent demand typical of per-product quantities.
+    """
+    n = y.shape[1]
+    level = y[:, 0].copy()
+    trend = _least_squares_slope(y)
+    for t in range(1, n):
+        previous_level = level
+        level = alpha * y[:, t] + (1 - alpha) * (level + trend)
+        trend = beta * (level - previous_level) + (1 - beta) * trend
+    steps = np.arange(1, horizon + 1, dtype=np.float64)
+    return level[:, np.newaxis] + trend[:, np.newaxis] * steps[np.newaxis, :]
+
+
+def _holt_winters(y: np.ndarray, horizon: int, season_length: int, alpha: float, beta: float, gamma: float) -> np.ndarray:
+    """Additive Holt-Winters per series; falls back to Holt's method with fewer than three full seasons,
+    too little history to separate seasonality from noise."""
+    n = y.shape[1]
+    m = season_length
+    if m < 2 or n < 3 * m:
+        return _holt(y, horizon, alpha, beta)
+    first_season_mean = y[:, :m].mean(axis=1)
+    level = first_season_mean.copy()
+    trend = (y[:, m:2 * m].mean(axis=1) - first_season_mean) / m
+    season = y[:, :m] - first_season_mean[:, np.newaxis]
+    for t in range(m, n):
+        seasonal = season[:, t % m].copy()
+        previous_level = level
+        level = alpha * (y[:, t] - seasonal) + (1 - alpha) * (level + trend)
+        trend = beta * (level - previous_level) + (1 - beta) * trend
+        season[:, t % m] = gamma * (y[:, t] - level) + (1 - gamma) * seasonal
+    steps = np.arange(1, horizon + 1)
+    return level[:, np.newaxis] + trend[:, np.newaxis] * steps[np.newaxis, :] + season[:, (n + steps - 1) % m]
+
+
+def _seasonal_naive(y: np.ndarray, horizon: int, season_length: int) -> np.ndarray:
+    """Repeat the last full season, or the last value when the history is shorter than a season."""
+    n = y.shape[1]
+    m = season_length
+    steps = np.arange(horizon)
+    if m < 2 or n < m:
+        return np.repeat(y[:, -1:], horizon, axis=1)
+    return y[:, n - m + (steps % m)]
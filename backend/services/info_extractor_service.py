@@ -1,5 +1,4 @@
 from typing import Optional
-import google.generativeai as genai
 from config import Config
 from models import ExtractedOrderInfo, OrderProduct
 import json
@@ -28,7 +27,8 @@ class InfoExtractorService:
             f"\nEmail:\n{email_text}"
         )
 
-        # Configure Gemini
+        # Configure Gemini (imported on first use; it is slow to import)
+        import google.generativeai as genai
         genai.configure(api_key=Config.GOOGLE_API_KEY)
         model = genai.GenerativeModel(Config.GEMINI_MODEL)
         response = model.generate_content(prompt)
@@ -0,0 +1,88 @@
+import threading
+from bisect import bisect_left, insort
+from typing import Optional
+
+
+class InventoryHealthIndex:
+    """Inventory value and low/out-of-stock lists, kept current on every stock change.
+
+    load() indexes the products cache once; update_stock() then adjusts the running total value and
+    moves one product between the sorted low-stock ((stock, p_id)) and out-of-stock (p_id) lists,
+    so summary() is O(k) in the number of listed products instead of a scan over the catalog.
+    The running total is kept in integer cents, so any number of updates cannot drift it.
+    """
+
+    def __init__(self, low_stock_threshold: int = 5):
+        self.low_stock_threshold = low_stock_threshold
+        self._products = {}
+        self._low_stock = []
+        self._out_of_stock = []
+        self._total_cents = 0
+        self._lock = threading.Lock()
+
+    def load(self, products: dict):
+        """Rebuild from {p_id: {"name", "price", "stock"}}."""
+        with self._lock:
+            self._products = {}
+            self._low_stock = []
+            self._out_of_stock = []
+            self._total_cents = 0
+            for p_id, product in products.items():
+                self._add(p_id, product.get("name", "Unknown Product"), float(product.get("price", 0)), int(product.get("stock", 0)),
+                          keep_sorted=False)
+            # Appended unsorted; one sort instead of an insort (list shift) per product
+            self._low_stock.sort()
+            self._out_of_stock.sort()
+
+    def update_stock(self, p_id: str, new_stock: int, name: Optional[str] = None, price: Optional[float] = None):
+        """Record a product's new stock level; name and price are required only for products not yet indexed."""
+        with self._lock:
+            current = self._products.get(p_id)
+            if current is not None:
+                name = current[0] if name is None else name
+                price = current[1] if price is None else price
+                self._remove(p_id)
+            elif price is None:
+                return
+            self._add(p_id, name or "Unknown Product", float(price), int(new_stock))
+
+    def _add(self, p_id: str, name: str, price: float, stock: int, keep_sorted: bool = True):
+        """Caller holds the lock; with keep_sorted=False entries are appended and the caller sorts."""
+        self._products[p_id] = (name, price, stock)
+        self._total_cents += round(price * 100) * stock
+        if 0 < stock <= self.low_stock_threshold:
+            if keep_sorted:
+                insort(self._low_stock, (stock, p_id))
+            else:
+                self._low_stock.append((stock, p_id))
+        elif stock == 0:
+            if keep_sorted:
+                insort(self._out_of_stock, p_id)
+            else:
+                self._out_of_stock.append(p_id)
+
+    def _remove(self, p_id: str):
+        name, price, stock = self._products.pop(p_id)
+        self._total_cents -= round(price * 100) * stock
+        if 0 < stock <= self.low_stock_threshold:
+            del self._low_stock[bisect_left(self._low_stock, (stock, p_id))]
+        elif stock == 0:
+            del self._out_of_stock[bisect_left(self._out_of_stock, p_id)]
+
+    @property
+    def total_value(self) -> float:
+        return self._total_cents / 100
+
+    def summary(self) -> dict:
+        with self._lock:
+            return {
+                "totalInventoryValue": self.total_value,
+                "lowStockItems": [
+                    {"p_id": p_id, "p_name": self._products[p_id][0], "p_stock": stock}
+                    for stock, p_id in self._low_stock
+                ],
+                "outOfStockItems": [
+                    {"p_id": p_id, "p_name": self._products[p_id][0], "p_stock": 0}
+                    for p_id in self._out_of_stock
+                ],
+            }
@@ -0,0 +1,108 @@
+import asyncio
+import atexit
+import logging
+import queue
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Callable, Optional
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+ERROR_KIND_NOT_FOUND = "not_found"
+ERROR_KIND_INSUFFICIENT_STOCK = "insufficient_stock"
+
+
+def normalize_product_name(name: str) -> str:
+    """Case- and whitespace-insensitive form used to group requests for the same item."""
+    return " ".join((name or "").lower().split())
+
+
+class OrderErrorLog:
+    """Buffers validation error events and writes them to order_errors in batches.
+
+    record() never blocks the request: events go onto a bounded queue (dropped when full) and a
+    background thread flushes them every ORDER_ERROR_LOG_FLUSH_SECONDS or once
+    ORDER_ERROR_LOG_BATCH_SIZE events are waiting, through the async write_batch_func.
+    """
+
+    def __init__(self, write_batch_func: Callable, batch_size: int = None, flush_seconds: float = None, max_queue: int = None):
+        self.write_batch_func = write_batch_func
+        self.batch_size = batch_size or Config.ORDER_ERROR_LOG_BATCH_SIZE
+        self.flush_seconds = flush_seconds if flush_seconds is not None else Config.ORDER_ERROR_LOG_FLUSH_SECONDS
+        self._queue = queue.Queue(maxsize=max_queue or Config.ORDER_ERROR_LOG_MAX_QUEUE)
+        self._thread = None
+        self._lock = threading.Lock()
+        self._stopping = threading.Event()
+        self.written = 0
+        self.dropped = 0
+
+    def record(self, kind: str, product_id: Optional[str], product_name: Optional[str],
+               customer_id: Optional[str] = None, quantity: Optional[int] = None):
+        self._ensure_started()
+        event = (
+            datetime.now(timezone.utc),
+            kind,
+            product_id or None,
+            normalize_product_name(product_name or product_id),
+            customer_id,
+            quantity,
+        )
+        try:
+            self._queue.put_nowait(event)
+        except queue.Full:
+            self.dropped += 1
+
+    def _ensure_started(self):
+        if self._thread is not None:
+            return
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="order-error-log", daemon=True)
+                self._thread.start()
+                atexit.register(self.close)
+
+    def _run(self):
+        loop = asyncio.new_event_loop()
+        try:
+            while not (self._stopping.is_set() and self._queue.empty()):
+                batch = self._next_batch()
+                if batch:
+                    self._write(loop, batch)
+        finally:
+            loop.close()
+
+    def _next_batch(self) -> list:
+        """Wait up to flush_seconds for the first event, then drain up to batch_size without waiting."""
+        batch = []
+        deadline = time.monotonic() + self.flush_seconds
+        while len(batch) < self.batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0 or self._stopping.is_set():
+                try:
+                    batch.append(self._queue.get_nowait())
+                    continue
+                except queue.Empty:
+                    break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _write(self, loop, batch: list):
+        try:
+            if loop.run_until_complete(self.write_batch_func(batch)):
+                self.written += len(batch)
+            else:
+                self.dropped += len(batch)
+        except Exception as e:
+            logger.error("Failed to write %s error events: %s", len(batch), e)
+            self.dropped += len(batch)
+
+    def close(self, timeout: float = 5.0):
+        """Flush queued events and stop the writer thread."""
+        self._stopping.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
@@ -1,9 +1,12 @@
+import logging
 from services.info_extractor_service import InfoExtractorService
 from services.validator_service import ValidatorService
 from services.communications_service import CommunicationsService
 from services.db_update_service import DBUpdateService
 from models import ExtractedOrderInfo, ValidationResult, CustomerMessage, OrderUpdateResult
 
+logger = logging.getLogger(__name__)
+
 class OrderProcessor:
     def __init__(self,
                  info_extractor_service_instance: InfoExtractorService,
@@ -23,7 +26,7 @@ class OrderProcessor:
             # print(f"[OrderProcessor] Extracted info: {extracted_info.json()}")
             result['extracted_info'] = extracted_info.dict()
         except Exception as e:
-            print(f"[OrderProcessor] Error in process_order: {e}")
+            logger.error("Error in process_order: %s", e)
             result['extracted_info'] = {'error': str(e)}
             return result
         try:
@@ -31,7 +34,7 @@ class OrderProcessor:
             # print(f"[OrderProcessor] Validation result: {validation_result.json()}")
             result['validation_result'] = validation_result.dict()
         except Exception as e:
-            print(f"[OrderProcessor] Error in process_order: {e}")
+            logger.error("Error in process_order: %s", e)
             result['validation_result'] = {'error': str(e)}
             return result
         try:
@@ -39,7 +42,7 @@ class OrderProcessor:
             # print(f"[OrderProcessor] Customer message status: {customer_message.status}")
             result['customer_message'] = customer_message.dict()
         except Exception as e:
-            print(f"[OrderProcessor] Error in process_order: {e}")
+            logger.error("Error in process_order: %s", e)
             result['customer_message'] = {'error': str(e)}
         try:
             # print("[OrderProcessor] About to call DBUpdateService.update_order...")
@@ -47,7 +50,7 @@ class OrderProcessor:
             # print(f"[OrderProcessor] DB update result: {order_update_result.success}, ID: {order_update_result.order_id}")
             result['order_update_result'] = order_update_result.dict()
         except Exception as e:
-            print(f"[OrderProcessor] Error in process_order: {e}")
+            logger.error("Error in process_order: %s", e)
             result['order_update_result'] = {'error': str(e)}
         # print(f"[OrderProcessor] Finished process_order for: {validation_result.customer_info.get('id')}, Status: {validation_result.overall_status}")
         return result 
\ No newline at end of file
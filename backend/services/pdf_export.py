@@ -0,0 +1,175 @@
+import zipfile
+import zlib
+from collections import deque
+from concurrent.futures.process import BrokenProcessPool
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from process_pool import get_process_pool, reset_process_pool
+from services.pdf_service import PdfService
+
+# One PdfService per pool worker, created on its first task so the layout is built once per process
+_worker_pdf_service = None
+
+
+def _render_for_export(order: dict, merged: bool):
+    """Runs in a pool worker: the order's PDF bytes, or (compressed page streams, fonts) for a merged PDF."""
+    global _worker_pdf_service
+    if _worker_pdf_service is None:
+        _worker_pdf_service = PdfService()
+    if not merged:
+        return _worker_pdf_service.generate_sales_order_pdf(order)
+    pages, fonts = _worker_pdf_service.sales_order_pages(order)
+    return [zlib.compress(page.encode("latin-1")) for page in pages], fonts
+
+
+class StreamingPdfWriter:
+    """Assembles one PDF from page content streams, emitting each page as soon as it is added.
+
+    Only object offsets and page ids are kept in memory; the page tree, catalog and cross-reference
+    table are written by finish(). Fonts are the standard Type 1 fonts PdfService uses, each written
+    once and shared by every page.
+    """
+
+    _PAGES_ID = 1
+    _CATALOG_ID = 2
+
+    def __init__(self, page_size: Tuple[float, float]):
+        self.media_box = f"[0 0 {page_size[0]:.4f} {page_size[1]:.4f}]"
+        self._offset = 0
+        self._offsets = {}
+        self._next_id = 3
+        self._font_ids = {}
+        self._page_ids = []
+
+    def _emit(self, data: bytes) -> bytes:
+        self._offset += len(data)
+        return data
+
+    def _object(self, body: bytes, object_id: Optional[int] = None) -> Tuple[int, bytes]:
+        if object_id is None:
+            object_id = self._next_id
+            self._next_id += 1
+        self._offsets[object_id] = self._offset
+        return object_id, self._emit(b"%d 0 obj\n" % object_id + body + b"\nendobj\n")
+
+    def start(self) -> bytes:
+        return self._emit(b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n")
+
+    def add_page(self, compressed_content: bytes, fonts: Dict[str, str]) -> bytes:
+        """Page from a zlib-compressed content stream using fonts {resource name: standard font name}."""
+        from reportlab.pdfbase import pdfmetrics
+
+        chunks = []
+        font_refs = []
+        for resource_name, font_name in sorted(fonts.items()):
+            font_id = self._font_ids.get(font_name)
+            if font_id is None:
+                encoding = pdfmetrics.getFont(font_name).encName
+                encoding_entry = f" /Encoding /{encoding}" if encoding in ("WinAnsiEncoding", "MacRomanEncoding") else ""
+                font_id, data = self._object(f"<< /Type /Font /Subtype /Type1 /BaseFont /{font_name}{encoding_entry} >>".encode("ascii"))
+                self._font_ids[font_name] = font_id
+                chunks.append(data)
+            font_refs.append(f"/{resource_name} {font_id} 0 R")
+        content_id, data = self._object(
+            b"<< /Length %d /Filter /FlateDecode >>\nstream\n" % len(compressed_content) + compressed_content + b"\nendstream"
+        )
+        chunks.append(data)
+        page_id, data = self._object(
+            f"<< /Type /Page /Parent {self._PAGES_ID} 0 R /MediaBox {self.media_box} "
+            f"/Resources << /Font << {' '.join(font_refs)} >> /ProcSet [/PDF /Text] >> /Contents {content_id} 0 R >>".encode("ascii")
+        )
+        chunks.append(data)
+        self._page_ids.append(page_id)
+        return b"".join(chunks)
+
+    def finish(self) -> bytes:
+        kids = " ".join(f"{page_id} 0 R" for page_id in self._page_ids)
+        chunks = [
+            self._object(f"<< /Type /Pages /Kids [{kids}] /Count {len(self._page_ids)} >>".encode("ascii"), self._PAGES_ID)[1],
+            self._object(f"<< /Type /Catalog /Pages {self._PAGES_ID} 0 R >>".encode("ascii"), self._CATALOG_ID)[1],
+        ]
+        xref_offset = self._offset
+        size = self._next_id
+        xref = [b"xref\n0 %d\n" % size, b"0000000000 65535 f \n"]
+        xref.extend(b"%010d 00000 n \n" % self._offsets[object_id] for object_id in range(1, size))
+        xref.append(b"trailer\n<< /Size %d /Root %d 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (size, self._CATALOG_ID, xref_offset))
+        chunks.append(self._emit(b"".join(xref)))
+        return b"".join(chunks)
+
+
+class _ChunkSink:
+    """Write-only file object that hands zipfile's output back to a generator in chunks."""
+
+    def __init__(self):
+        self.chunks = []
+
+    def write(self, data) -> int:
+        self.chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self) -> bytes:
+        data = b"".join(self.chunks)
+        self.chunks = []
+        return data
+
+
+class PdfExportService:
+    """Renders many sales order PDFs in the "pdf_export" process pool and streams them out.
+
+    At most `window` orders are submitted ahead of the one being written, so memory holds a bounded
+    number of rendered PDFs no matter how many orders are exported; output keeps the input order.
+    """
+
+    def __init__(self, workers: int, window: int, timeout: float):
+        self.workers = workers
+        self.window = max(window, 1)
+        self.timeout = timeout
+
+    def render(self, orders: Iterable[dict], merged: bool = False) -> Iterator[Tuple[dict, object]]:
+        """Yield (order, _render_for_export result) for each order, in order."""
+        if self.workers <= 0:
+            for order in orders:
+                yield order, _render_for_export(order, merged)
+            return
+
+        pool = get_process_pool("pdf_export", self.workers)
+        pending = deque()
+        try:
+            for order in orders:
+                pending.append((order, pool.submit(_render_for_export, order, merged)))
+                if len(pending) >= self.window:
+                    order, future = pending.popleft()
+                    yield order, future.result(timeout=self.timeout)
+            while pending:
+                order, future = pending.popleft()
+                yield order, future.result(timeout=self.timeout)
+        except BrokenProcessPool:
+            reset_process_pool("pdf_export")
+            raise
+        finally:
+            # Client went away or a render failed: drop whatever is still queued
+            for _, future in pending:
+                future.cancel()
+
+    def stream_zip(self, orders: List[dict]) -> Iterator[bytes]:
+        """ZIP archive with one sales_order_<o_id>.pdf per order, yielded as each PDF is added."""
+        sink = _ChunkSink()
+        # PDF page streams are already deflated, so entries are stored rather than compressed again
+        with zipfile.ZipFile(sink, mode="w", compression=zipfile.ZIP_STORED) as archive:
+            for order, pdf_bytes in self.render(orders):
+                archive.writestr(f"sales_order_{order['o_id']}.pdf", pdf_bytes)
+                yield sink.drain()
+        yield sink.drain()
+
+    def stream_merged(self, orders: List[dict]) -> Iterator[bytes]:
+        """One PDF with every order's pages in sequence, yielded as each order is added."""
+        from reportlab.lib.pagesizes import A4
+
+        writer = StreamingPdfWriter(A4)  # PdfService lays sales orders out on A4
+        yield writer.start()
+        for _, (pages, fonts) in self.render(orders, merged=True):
+            yield b"".join(writer.add_page(page, fonts) for page in pages)
+        yield writer.finish()
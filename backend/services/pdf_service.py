@@ -1,119 +1,232 @@
-from reportlab.lib.pagesizes import A4
-from reportlab.pdfgen import canvas
-from reportlab.lib.units import mm
-from reportlab.lib import colors
 from io import BytesIO
 from datetime import datetime
+from typing import Dict, List, Tuple
 
-class PdfService:
-    def generate_sales_order_pdf(self, order_data: dict) -> bytes:
-        # print("[PdfService] order_data received:", order_data)
-        buffer = BytesIO()
-        c = canvas.Canvas(buffer, pagesize=A4)
+ROWS_PER_PAGE = 10
+
+
+class _SalesOrderLayout:
+    """Coordinates of the sales order form, computed once per process (all values in points)."""
+
+    def __init__(self):
+        from reportlab.lib.pagesizes import A4
+        from reportlab.lib.units import mm
+        from reportlab.pdfbase.pdfmetrics import stringWidth
+
+        self.page_size = A4
         width, height = A4
 
         # 1. Global Layout Constants & Margins
-        left_margin = 25 * mm
-        right_margin = 25 * mm
-        content_top_y = height - 20 * mm
-        table_width = width - left_margin - right_margin
+        self.width = width
+        self.left_margin = 25 * mm
+        self.content_top_y = height - 20 * mm
 
         # 2. Customer Information Block Placement
-        customer_info_y_start = content_top_y - 20 * mm
+        self.customer_info_y_start = self.content_top_y - 20 * mm
         info_line_height = 7 * mm
-        c.setFont("Helvetica-Bold", 16)
-        c.drawCentredString(width / 2, content_top_y, "Sales Order Form")
-        c.setFont("Helvetica", 10)
-        # Customer Name
-        c.drawString(left_margin, customer_info_y_start, f"Customer Name: {order_data.get('c_name', '')}")
-        # Delivery Date
-        delivery_date = order_data.get('o_delivery_date', '')
-        if delivery_date:
-            if isinstance(delivery_date, datetime):
-                delivery_date = delivery_date.strftime("%Y-%m-%d")
-            else:
-                try:
-                    delivery_date = datetime.strptime(str(delivery_date)[:10], "%Y-%m-%d").strftime("%Y-%m-%d")
-                except Exception:
-                    delivery_date = str(delivery_date)
-        c.drawString(left_margin, customer_info_y_start - info_line_height, f"Delivery Date: {delivery_date}")
-        # Address
-        c.drawString(left_margin, customer_info_y_start - 2 * info_line_height, f"Address: {order_data.get('c_address', '')}")
+        # (label, y); values are stamped right after the label
+        self.info_labels = [
+            ("Customer Name: ", self.customer_info_y_start),
+            ("Delivery Date: ", self.customer_info_y_start - info_line_height),
+            ("Address: ", self.customer_info_y_start - 2 * info_line_height),
+        ]
+        self.info_value_x = [self.left_margin + stringWidth(label, "Helvetica", 10) for label, _ in self.info_labels]
 
         # 3. Table Dimensions and Column Widths
-        table_header_top_y = customer_info_y_start - (info_line_height * 4)
-        table_header_height = 10 * mm
-        table_data_row_height = 10 * mm
-        num_data_rows = 10
-        col_widths = [25*mm, 50*mm, 15*mm, 20*mm, 25*mm, 25*mm]  # 160mm total
-        col_titles = ["Product Code", "Product Name", "Qty", "Price", "Total", "Remarks"]
-        table_left = left_margin
-        table_right = table_left + sum(col_widths)
-        table_bottom_y = table_header_top_y - (table_header_height + (num_data_rows * table_data_row_height))
+        self.table_header_top_y = self.customer_info_y_start - (info_line_height * 4)
+        self.table_header_height = 10 * mm
+        self.table_data_row_height = 10 * mm
+        self.col_widths = [25*mm, 50*mm, 15*mm, 20*mm, 25*mm, 25*mm]  # 160mm total
+        self.col_titles = ["Product Code", "Product Name", "Qty", "Price", "Total", "Remarks"]
+        self.table_left = self.left_margin
+        self.table_right = self.table_left + sum(self.col_widths)
+        self.table_bottom_y = self.table_header_top_y - (self.table_header_height + (ROWS_PER_PAGE * self.table_data_row_height))
+        self.col_text_x = []
+        current_x = self.table_left
+        for col_width in self.col_widths:
+            self.col_text_x.append(current_x + 2)
+            current_x += col_width
+        self.header_text_y = self.table_header_top_y - (self.table_header_height / 2) + 1*mm
+        self.row_text_y = [
+            self.table_header_top_y - self.table_header_height - (row * self.table_data_row_height)
+            - (self.table_data_row_height / 2) + 1*mm
+            for row in range(ROWS_PER_PAGE)
+        ]
+
+        # 7. Footer Placement
+        self.total_sales_y = self.table_bottom_y - 12 * mm
+        self.remarks_y = self.total_sales_y - 8 * mm
+        # Value aligned to start of Total column
+        self.total_col_x = self.table_left + sum(self.col_widths[:4]) + 2
+        self.remarks_value_x = self.left_margin + stringWidth("Remarks: ", "Helvetica", 10)
+        self.page_number_y = 12 * mm
+        self.page_number_x = self.table_right
+
+        self.page_ops, self.footer_ops = self._render_static_ops()
+
+    def _render_static_ops(self):
+        """PDF operators for the static page template and footer labels, rendered once.
+
+        Font resource names (/F1, /F2) depend on the order fonts are first used in a document,
+        so every document registers them through _register_fonts before adding these operators.
+        """
+        from reportlab.pdfgen import canvas
 
+        scratch = canvas.Canvas(BytesIO(), pagesize=self.page_size)
+        _register_fonts(scratch)
+
+        page = scratch.beginText()
+        page.setFont("Helvetica-Bold", 16)
+        page.setTextOrigin(self.width / 2 - scratch.stringWidth("Sales Order Form", "Helvetica-Bold", 16) / 2, self.content_top_y)
+        page.textOut("Sales Order Form")
+        page.setFont("Helvetica", 10)
+        for label, y in self.info_labels:
+            page.setTextOrigin(self.left_margin, y)
+            page.textOut(label)
         # 4. Table Header Text Placement
-        header_text_y = table_header_top_y - (table_header_height / 2) + 1*mm
-        c.setFont("Helvetica-Bold", 10)
-        current_x = table_left
-        for i, title in enumerate(col_titles):
-            c.drawString(current_x + 2, header_text_y, title)
-            current_x += col_widths[i]
-        c.setFont("Helvetica", 10)
-
-        # 5. Table Data Text Placement
-        items = order_data.get('items', [])
-        # print("[PdfService] items:", items)
-        total_amount = 0
-        for row in range(num_data_rows):
-            data_y = table_header_top_y - table_header_height - (row * table_data_row_height)
-            current_x = table_left
-            if row < len(items):
-                item = items[row]
-                code = str(item.get('p_id') or item.get('product_code', ''))
-                name = str(item.get('p_name') or item.get('product_name', ''))
-                qty = item.get('oi_qty') if 'oi_qty' in item else item.get('quantity', '')
-                price = item.get('oi_price') if 'oi_price' in item else item.get('price', 0)
-                total = item.get('oi_total') if 'oi_total' in item else (float(price) * float(qty or 0))
-                remarks = str(item.get('remarks', ''))
-                total_amount += float(total or 0)
-                values = [code, name, str(qty), f"{price:.2f}", f"{total:.2f}", remarks]
-            else:
-                values = ["" for _ in col_titles]
-            for i, value in enumerate(values):
-                c.drawString(current_x + 2, data_y - (table_data_row_height / 2) + 1*mm, value)
-                current_x += col_widths[i]
-
-        # 6. Draw Table Grid (including missing top border)
-        # Top border
-        c.line(table_left, table_header_top_y, table_right, table_header_top_y)
-        # Horizontal lines (header bottom + data rows)
-        for r in range(num_data_rows + 1):
-            y = table_header_top_y - table_header_height - (r * table_data_row_height)
-            c.line(table_left, y, table_right, y)
-        # Header bottom border
-        c.line(table_left, table_header_top_y - table_header_height, table_right, table_header_top_y - table_header_height)
-        # Vertical lines
-        x_pos = table_left
-        for w in col_widths:
-            c.line(x_pos, table_header_top_y, x_pos, table_bottom_y)
+        page.setFont("Helvetica-Bold", 10)
+        for x, title in zip(self.col_text_x, self.col_titles):
+            page.setTextOrigin(x, self.header_text_y)
+            page.textOut(title)
+
+        # 6. Table Grid: top border, header bottom and data row lines, vertical lines
+        grid = scratch.beginPath()
+        for r in range(-1, ROWS_PER_PAGE + 1):
+            y = self.table_header_top_y - self.table_header_height - (r * self.table_data_row_height) if r >= 0 else self.table_header_top_y
+            grid.moveTo(self.table_left, y)
+            grid.lineTo(self.table_right, y)
+        x_pos = self.table_left
+        for w in self.col_widths + [0]:
+            grid.moveTo(x_pos, self.table_header_top_y)
+            grid.lineTo(x_pos, self.table_bottom_y)
             x_pos += w
-        c.line(x_pos, table_header_top_y, x_pos, table_bottom_y)  # last right border
 
-        # 7. Footer Placement
-        total_sales_y = table_bottom_y - 12 * mm
-        remarks_y = total_sales_y - 8 * mm
+        footer = scratch.beginText()
         # Total Sales Order Amount label
-        c.setFont("Helvetica-Bold", 11)
-        c.drawString(left_margin, total_sales_y, "Total Sales Order Amount:")
-        # Value aligned to start of Total column
-        total_col_x = table_left + sum(col_widths[:4]) + 2
-        c.drawString(total_col_x, total_sales_y, f"{total_amount:.2f}")
-        c.setFont("Helvetica", 10)
-        # Remarks
-        c.drawString(left_margin, remarks_y, f"Remarks: {order_data.get('remarks', '')}")
+        footer.setFont("Helvetica-Bold", 11)
+        footer.setTextOrigin(self.left_margin, self.total_sales_y)
+        footer.textOut("Total Sales Order Amount:")
+        footer.setFont("Helvetica", 10)
+        footer.setTextOrigin(self.left_margin, self.remarks_y)
+        footer.textOut("Remarks: ")
+        return f"{page.getCode()}\n{grid.getCode()} S", footer.getCode()
+
 
-        c.showPage()
+def _register_fonts(c):
+    """Register the form's fonts in a fixed order so their resource names match the prerendered operators."""
+    c.setFont("Helvetica-Bold", 10)
+    c.setFont("Helvetica", 10)
+
+
+class PdfService:
+    """Renders sales order PDFs from a prerendered page template.
+
+    The static layout (title, field labels, column titles, table grid and footer labels) is rendered
+    to PDF operators once per process and copied into every page's content stream; only the
+    per-order values go through reportlab's text layer. Orders with more than ROWS_PER_PAGE items
+    continue on further pages.
+    """
+
+    def __init__(self):
+        self._layout = None
+
+    def _get_layout(self) -> _SalesOrderLayout:
+        # reportlab is imported on first render to keep app startup light
+        if self._layout is None:
+            self._layout = _SalesOrderLayout()
+        return self._layout
+
+    def generate_sales_order_pdf(self, order_data: dict) -> bytes:
+        from reportlab.pdfgen import canvas
+
+        # print("[PdfService] order_data received:", order_data)
+        layout = self._get_layout()
+        buffer = BytesIO()
+        c = canvas.Canvas(buffer, pagesize=layout.page_size)
+        _register_fonts(c)
+        for content in self._page_contents(c, layout, order_data):
+            c.addLiteral(content)
+            c.showPage()
         c.save()
         pdf = buffer.getvalue()
         buffer.close()
-        return pdf 
\ No newline at end of file
+        return pdf
+
+    def sales_order_pages(self, order_data: dict) -> Tuple[List[str], Dict[str, str]]:
+        """Page content streams for an order plus the fonts they use ({resource name: base font}).
+
+        For writers that assemble several orders into one PDF (see services/pdf_export.py).
+        """
+        from reportlab.pdfgen import canvas
+
+        layout = self._get_layout()
+        c = canvas.Canvas(BytesIO(), pagesize=layout.page_size)
+        _register_fonts(c)
+        pages = self._page_contents(c, layout, order_data)
+        # Characters outside WinAnsi switch to Symbol/ZapfDingbats, which the canvas registers as it goes
+        fonts = {internal_name.lstrip("/"): font_name for font_name, internal_name in c._doc.fontMapping.items()}
+        return pages, fonts
+
+    def _page_contents(self, c, layout: _SalesOrderLayout, order_data: dict) -> List[str]:
+        """PDF operators for each page of the order: the prerendered template plus the order's values."""
+        rows = []
+        total_amount = 0
+        for item in order_data.get('items') or []:
+            values, total = self._item_values(item)
+            rows.append(values)
+            total_amount += float(total or 0)
+        customer_values = [
+            str(order_data.get('c_name', '')),
+            self._format_date(order_data.get('o_delivery_date', '')),
+            str(order_data.get('c_address', '')),
+        ]
+
+        pages = []
+        page_count = max(1, -(-len(rows) // ROWS_PER_PAGE))
+        for page in range(page_count):
+            text = c.beginText()
+            text.setFont("Helvetica", 10)
+            for x, (_, y), value in zip(layout.info_value_x, layout.info_labels, customer_values):
+                text.setTextOrigin(x, y)
+                text.textOut(value)
+            for row, values in enumerate(rows[page * ROWS_PER_PAGE:(page + 1) * ROWS_PER_PAGE]):
+                y = layout.row_text_y[row]
+                for x, value in zip(layout.col_text_x, values):
+                    text.setTextOrigin(x, y)
+                    text.textOut(value)
+            if page_count > 1:
+                page_label = f"Page {page + 1} of {page_count}"
+                text.setTextOrigin(layout.page_number_x - c.stringWidth(page_label, "Helvetica", 10), layout.page_number_y)
+                text.textOut(page_label)
+            if page == page_count - 1:
+                text.setTextOrigin(layout.remarks_value_x, layout.remarks_y)
+                text.textOut(str(order_data.get('remarks', '')))
+                text.setFont("Helvetica-Bold", 11)
+                text.setTextOrigin(layout.total_col_x, layout.total_sales_y)
+                text.textOut(f"{total_amount:.2f}")
+                pages.append(f"{layout.page_ops}\n{text.getCode()}\n{layout.footer_ops}")
+            else:
+                pages.append(f"{layout.page_ops}\n{text.getCode()}")
+        return pages
+
+    @staticmethod
+    def _item_values(item: dict):
+        code = str(item.get('p_id') or item.get('product_code', ''))
+        name = str(item.get('p_name') or item.get('product_name', ''))
+        qty = item.get('oi_qty') if 'oi_qty' in item else item.get('quantity', '')
+        price = item.get('oi_price') if 'oi_price' in item else item.get('price', 0)
+        total = item.get('oi_total') if 'oi_total' in item else (float(price) * float(qty or 0))
+        remarks = str(item.get('remarks', ''))
+        return [code, name, str(qty), f"{price:.2f}", f"{total:.2f}", remarks], total
+
+    @staticmethod
+    def _format_date(delivery_date) -> str:
+        if delivery_date:
+            if isinstance(delivery_date, datetime):
+                delivery_date = delivery_date.strftime("%Y-%m-%d")
+            else:
+                try:
+                    delivery_date = datetime.strptime(str(delivery_date)[:10], "%Y-%m-%d").strftime("%Y-%m-%d")
+                except Exception:
+                    delivery_date = str(delivery_date)
+        return str(delivery_date)
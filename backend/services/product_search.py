@@ -0,0 +1,279 @@
+import bisect
+import heapq
+import logging
+import re
+import threading
+import time
+import unicodedata
+from itertools import count
+from typing import Callable, Optional
+
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+_TOKEN = re.compile(r"[a-z0-9]+")
+
+# Score of a query token's match, by kind: exact term, prefix of a term (last token only), 1 or 2 typos
+_EXACT, _PREFIX, _TYPO_1, _TYPO_2 = 3, 2, 1.5, 1
+# A prefix expands to at most this many terms (shortest first)
+_MAX_PREFIX_TERMS = 256
+# Document keys are name length << _SEQ_BITS | sequence number, so comparing keys orders products
+# by shorter name, then by when they were indexed (p_id order for a bulk load)
+_SEQ_BITS = 40
+
+
+def tokenize(text: str) -> list:
+    """Lowercase ASCII-folded alphanumeric tokens: 'Heavy-Duty Café Pens' -> ['heavy', 'duty', 'cafe', 'pens']."""
+    folded = unicodedata.normalize("NFKD", text or "").encode("ascii", "ignore").decode("ascii").lower()
+    return _TOKEN.findall(folded)
+
+
+def _max_typos(token: str) -> int:
+    """Edits tolerated for a token: none below 4 characters or with digits (ids, sizes), 1 up to 7, 2 from 8."""
+    if len(token) < 4 or not token.isalpha():
+        return 0
+    return 1 if len(token) < 8 else 2
+
+
+def _deletes(token: str, distance: int) -> set:
+    """token with up to distance characters removed (SymSpell deletion neighbourhood), token included."""
+    variants = {token}
+    frontier = {token}
+    for _ in range(distance):
+        frontier = {word[:i] + word[i + 1:] for word in frontier for i in range(len(word))}
+        variants |= frontier
+    return variants
+
+
+def _edit_distance(a: str, b: str, limit: int) -> int:
+    """Optimal string alignment distance (a transposition is one edit), or limit + 1 once it exceeds limit."""
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    previous2, previous = None, list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        current = [i] + [0] * len(b)
+        for j in range(1, len(b) + 1):
+            current[j] = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (a[i - 1] != b[j - 1]))
+            if i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                current[j] = min(current[j], previous2[j - 2] + 1)
+        if min(current) > limit:
+            return limit + 1
+        previous2, previous = previous, current
+    return previous[-1]
+
+
+class ProductSearchService:
+    """In-memory inverted index over product names and ids, with prefix and typo-tolerant matching.
+
+    Every query token must match a term of the product: exactly, with up to _max_typos edits, or -
+    for the last token, as typed so far - as a prefix. A product scores the best match kind of
+    each token, summed; equal scores go to shorter names first. Candidate and score sets are
+    computed with set operations over integer document keys, so a query costs a few set unions
+    and intersections plus a top-k over plain ints.
+
+    The index is built from load_products_func ({p_id: {"name", "price", "stock"}}) and kept current
+    incrementally: apply_stock_change (a db stock listener) updates stock in place, and when
+    versions_func reports a new products version (checked at most every
+    PRODUCT_SEARCH_REFRESH_SECONDS) the catalog is reloaded and only products whose name changed
+    are re-indexed.
+    """
+
+    def __init__(self, load_products_func: Callable[[], dict], versions_func: Optional[Callable[[], Optional[dict]]] = None,
+                 refresh_seconds: float = None):
+        self.load_products_func = load_products_func
+        self.versions_func = versions_func
+        self.refresh_seconds = refresh_seconds if refresh_seconds is not None else Config.PRODUCT_SEARCH_REFRESH_SECONDS
+        self._lock = threading.Lock()
+        self._refresh_lock = threading.Lock()
+        self._seq = count()
+        # p_id -> document key; key -> [p_id, name, price, stock, terms]
+        self._keys = {}
+        self._docs = {}
+        # term -> set of document keys
+        self._postings = {}
+        # Sorted terms for prefix ranges, words and terms with digits apart (a word prefix never
+        # expands to the many id/number terms)
+        self._words = []
+        self._numbers = []
+        # deletion variant -> words (typo candidates)
+        self._variants = {}
+        self._version = None
+        self._checked_at = 0.0
+        self.loaded = False
+
+    # --- Index maintenance ---
+
+    def load(self):
+        """(Re)load the catalog; unchanged products keep their postings. Runs as a warm-up task."""
+        versions = self.versions_func() if self.versions_func else None
+        started = time.perf_counter()
+        products = self.load_products_func()
+        with self._lock:
+            for p_id in set(self._keys) - set(products):
+                self._remove(p_id)
+            for p_id in sorted(products):
+                product = products[p_id]
+                self._upsert(p_id, product["name"], product["price"], product["stock"], keep_sorted=False)
+            # New terms were appended; one sort is much cheaper than an insort per term
+            self._words.sort()
+            self._numbers.sort()
+            self._version = versions.get("products") if versions else None
+            self._checked_at = time.monotonic()
+            self.loaded = True
+        logger.info("Indexed %d products (%d terms) in %.2fs.", len(products), len(self._postings), time.perf_counter() - started)
+
+    def upsert(self, p_id: str, name: str, price: float, stock: int):
+        with self._lock:
+            self._upsert(p_id, name, price, stock)
+
+    def remove(self, p_id: str):
+        with self._lock:
+            self._remove(p_id)
+
+    def apply_stock_change(self, p_id: str, new_stock: int):
+        """Stock listener (db.register_stock_listener): stock is not indexed, so only the stored value changes."""
+        with self._lock:
+            key = self._keys.get(p_id)
+            if key is not None:
+                self._docs[key][3] = new_stock
+
+    def refresh_if_stale(self):
+        """Reload when the products version has moved; one reload at a time while others keep searching."""
+        if not self.loaded:
+            with self._refresh_lock:
+                if not self.loaded:
+                    self.load()
+            return
+        if self.versions_func is None or time.monotonic() - self._checked_at < self.refresh_seconds:
+            return
+        if not self._refresh_lock.acquire(blocking=False):
+            return
+        try:
+            self._checked_at = time.monotonic()
+            versions = self.versions_func()
+            products_version = versions.get("products") if versions else None
+            # A None version (write in flight) is checked again next time
+            if products_version and products_version[0] is not None and products_version != self._version:
+                self.load()
+        finally:
+            self._refresh_lock.release()
+
+    def _upsert(self, p_id: str, name: str, price: float, stock: int, keep_sorted: bool = True):
+        """Caller holds the lock; with keep_sorted=False new terms are appended and the caller sorts."""
+        key = self._keys.get(p_id)
+        if key is not None and self._docs[key][1] == name:
+            self._docs[key][2], self._docs[key][3] = price, stock
+            return
+        if key is not None:
+            self._remove(p_id)
+        terms = tuple(dict.fromkeys(tokenize(name) + tokenize(p_id)))
+        key = len(name) << _SEQ_BITS | next(self._seq)
+        self._keys[p_id] = key
+        self._docs[key] = [p_id, name, price, stock, terms]
+        for term in terms:
+            postings = self._postings.get(term)
+            if postings is None:
+                postings = self._postings[term] = set()
+                vocabulary = self._words if term.isalpha() else self._numbers
+                if keep_sorted:
+                    bisect.insort(vocabulary, term)
+                else:
+                    vocabulary.append(term)
+                for variant in _deletes(term, _max_typos(term)):
+                    self._variants.setdefault(variant, set()).add(term)
+            postings.add(key)
+
+    def _remove(self, p_id: str):
+        """Caller holds the lock."""
+        key = self._keys.pop(p_id, None)
+        if key is None:
+            return
+        for term in self._docs.pop(key)[4]:
+            postings = self._postings[term]
+            postings.discard(key)
+            if postings:
+                continue
+            del self._postings[term]
+            vocabulary = self._words if term.isalpha() else self._numbers
+            del vocabulary[bisect.bisect_left(vocabulary, term)]
+            for variant in _deletes(term, _max_typos(term)):
+                words = self._variants[variant]
+                words.discard(term)
+                if not words:
+                    del self._variants[variant]
+
+    # --- Queries ---
+
+    def _token_levels(self, token: str, prefix: bool) -> list:
+        """[(score, document keys)] for one query token, best kind first, each product in one level only.
+
+        Caller holds the lock.
+        """
+        terms = {}
+        if token in self._postings:
+            terms[token] = _EXACT
+        if prefix:
+            vocabulary = self._words if token.isalpha() else self._numbers
+            start = bisect.bisect_left(vocabulary, token)
+            end = bisect.bisect_left(vocabulary, token + "\uffff", start)
+            completions = vocabulary[start:end]
+            if len(completions) > _MAX_PREFIX_TERMS:
+                completions = heapq.nsmallest(_MAX_PREFIX_TERMS, completions, key=len)
+            for term in completions:
+                terms.setdefault(term, _PREFIX)
+        typos = _max_typos(token)
+        if typos:
+            candidates = set()
+            for variant in _deletes(token, typos):
+                candidates.update(self._variants.get(variant, ()))
+            for term in candidates - terms.keys():
+                distance = _edit_distance(token, term, typos)
+                if distance <= typos:
+                    terms[term] = _TYPO_1 if distance == 1 else _TYPO_2
+        levels, assigned = [], set()
+        for score in (_EXACT, _PREFIX, _TYPO_1, _TYPO_2):
+            keys = set().union(*(self._postings[term] for term, term_score in terms.items() if term_score == score))
+            keys -= assigned
+            if keys:
+                levels.append((score, keys))
+                assigned |= keys
+        return levels
+
+    def search(self, query: str, limit: int = 10) -> list:
+        """Top `limit` products for query: [{"p_id", "p_name", "p_price", "p_stock", "score"}], best first."""
+        self.refresh_if_stale()
+        tokens = list(dict.fromkeys(tokenize(query)))
+        if not tokens or limit <= 0:
+            return []
+        with self._lock:
+            # {score: keys}: the products matching every token so far, by summed score
+            groups = None
+            for position, token in enumerate(tokens):
+                levels = self._token_levels(token, prefix=position == len(tokens) - 1)
+                if groups is None:
+                    groups = dict(levels)
+                else:
+                    combined = {}
+                    for score, keys in groups.items():
+                        for level_score, level_keys in levels:
+                            matched = keys & level_keys
+                            if matched:
+                                combined.setdefault(score + level_score, set()).update(matched)
+                    groups = combined
+                if not groups:
+                    return []
+            top = []
+            for score in sorted(groups, reverse=True):
+                top += [(key, score) for key in heapq.nsmallest(limit - len(top), groups[score])]
+                if len(top) >= limit:
+                    break
+            return [
+                {"p_id": self._docs[key][0], "p_name": self._docs[key][1], "p_price": self._docs[key][2],
+                 "p_stock": self._docs[key][3], "score": score}
+                for key, score in top
+            ]
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"products": len(self._docs), "terms": len(self._postings), "typo_variants": len(self._variants)}
@@ -0,0 +1,61 @@
+from statistics import NormalDist
+import numpy as np
+
+
+def demand_statistics(product_index, day_index, quantities, n_products: int, n_days: int, halflife_days: float):
+    """EWMA daily demand and its standard deviation for every product at once.
+
+    product_index/day_index/quantities are parallel arrays of sales (one entry per order item,
+    day 0 = first day of the window, n_days - 1 = today). Days without sales count as zero demand.
+    Weights decay with halflife_days and are normalized over the window, so the results are the
+    exponentially weighted mean and variance of the dense (n_products x n_days) daily series,
+    computed without materializing it. Returns (velocity, std), float arrays of length n_products.
+    """
+    product_index = np.asarray(product_index, dtype=np.int64)
+    day_index = np.asarray(day_index, dtype=np.int64)
+    quantities = np.asarray(quantities, dtype=np.float64)
+    velocity = np.zeros(n_products)
+    if n_days <= 0 or n_products <= 0:
+        return velocity, np.zeros(n_products)
+    keep = (product_index >= 0) & (day_index >= 0) & (day_index < n_days)
+    product_index, day_index, quantities = product_index[keep], day_index[keep], quantities[keep]
+
+    # Total quantity per (product, day) over the days that had sales
+    keys, inverse = np.unique(product_index * n_days + day_index, return_inverse=True)
+    daily_quantity = np.bincount(inverse, weights=quantities, minlength=len(keys))
+    daily_product, daily_day = np.divmod(keys, n_days)
+
+    decay = 0.5 ** (1.0 / halflife_days)
+    weights = decay ** np.arange(n_days - 1, -1, -1, dtype=np.float64)
+    weights /= weights.sum()
+    day_weights = weights[daily_day]
+    velocity = np.bincount(daily_product, weights=day_weights * daily_quantity, minlength=n_products)
+    second_moment = np.bincount(daily_product, weights=day_weights * daily_quantity ** 2, minlength=n_products)
+    variance = np.maximum(second_moment - velocity ** 2, 0.0)
+    return velocity, np.sqrt(variance)
+
+
+def reorder_points(velocity, std, stock, lead_time_days: float, service_level: float) -> dict:
+    """Days of cover, safety stock and reorder point per product.
+
+    Demand over the lead time is treated as normal with mean velocity * L and standard deviation
+    std * sqrt(L); safety stock covers it at the given cycle service level.
+    """
+    if not 0 < service_level < 1:
+        raise ValueError("service_level must be between 0 and 1")
+    if not lead_time_days >= 0:
+        raise ValueError("lead_time_days must be 0 or more")
+    velocity = np.asarray(velocity, dtype=np.float64)
+    stock = np.asarray(stock, dtype=np.float64)
+    z = NormalDist().inv_cdf(service_level)
+    safety_stock = z * np.asarray(std, dtype=np.float64) * np.sqrt(lead_time_days)
+    reorder_point = velocity * lead_time_days + safety_stock
+    with np.errstate(divide="ignore", invalid="ignore"):
+        days_of_cover = np.where(velocity > 0, stock / velocity, np.inf)
+    return {
+        "days_of_cover": days_of_cover,
+        "safety_stock": safety_stock,
+        "reorder_point": reorder_point,
+        "reorder_needed": (velocity > 0) & (stock <= reorder_point),
+        "suggested_order_quantity": np.ceil(np.maximum(reorder_point - stock, 0.0)),
+    }
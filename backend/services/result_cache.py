@@ -0,0 +1,108 @@
+import functools
+import inspect
+import sys
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, Optional, Tuple
+
+
+def estimate_size(obj: Any) -> int:
+    """Rough deep size in bytes of JSON-like results (dicts, lists, tuples, scalars)."""
+    size = sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        for key, value in obj.items():
+            size += estimate_size(key) + estimate_size(value)
+    elif isinstance(obj, (list, tuple, set, frozenset)):
+        for value in obj:
+            size += estimate_size(value)
+    return size
+
+
+class ResultCache:
+    """Thread-safe LRU cache bounded by entry count and approximate total size in bytes."""
+
+    def __init__(self, max_entries: int = 256, max_bytes: int = 64 * 1024 * 1024):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[Hashable, Tuple[Any, int]]" = OrderedDict()
+        self._total_bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable) -> Tuple[bool, Any]:
+        """Return (hit, value); a hit marks the entry as most recently used."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return False, None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return True, entry[0]
+
+    def put(self, key: Hashable, value: Any, size: Optional[int] = None) -> bool:
+        """Store value under key, evicting least recently used entries to stay within limits.
+
+        Returns False when the value alone is larger than the cache allows.
+        """
+        if self.max_entries <= 0:
+            return False
+        if size is None:
+            size = estimate_size(value)
+        if size > self.max_bytes:
+            return False
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._total_bytes -= old[1]
+            self._entries[key] = (value, size)
+            self._total_bytes += size
+            while len(self._entries) > self.max_entries or self._total_bytes > self.max_bytes:
+                _, (_, evicted_size) = self._entries.popitem(last=False)
+                self._total_bytes -= evicted_size
+        return True
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._total_bytes = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self._total_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "max_entries": self.max_entries,
+                "max_bytes": self.max_bytes,
+            }
+
+
+def memoize_result(method: Callable) -> Callable:
+    """Memoize an async service method in ``self.result_cache``.
+
+    The key is (method name, bound arguments with defaults applied, ``self.data_version``,
+    ``now`` bucket of ``self.cache_bucket_seconds``), so identical calls share an entry, a data
+    refresh invalidates everything, and rolling date windows move on once per bucket.
+    Cached results are shared between callers and must not be mutated.
+    """
+    signature = inspect.signature(method)
+
+    @functools.wraps(method)
+    async def wrapper(self, *args, **kwargs):
+        bound = signature.bind(self, *args, **kwargs)
+        bound.apply_defaults()
+        params = tuple((name, value) for name, value in bound.arguments.items() if name != "self")
+        bucket = int(time.time() // self.cache_bucket_seconds) if self.cache_bucket_seconds > 0 else 0
+        key = (method.__name__, params, self.data_version, bucket)
+        hit, value = self.result_cache.get(key)
+        if hit:
+            return value
+        result = await method(self, *args, **kwargs)
+        self.result_cache.put(key, result)
+        return result
+
+    return wrapper
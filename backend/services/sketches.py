@@ -0,0 +1,265 @@
+import hashlib
+import heapq
+import math
+from datetime import date, datetime, time, timedelta, timezone
+from typing import Callable, Hashable, Iterable, Optional, Sequence
+import numpy as np
+
+
+def _hash64(value) -> int:
+    """Stable 64-bit hash (Python's hash() is salted per process, so sketches would not merge across workers)."""
+    return int.from_bytes(hashlib.blake2b(str(value).encode("utf-8"), digest_size=8).digest(), "big")
+
+
+class HyperLogLog:
+    """Distinct-count sketch in 2**precision one-byte registers.
+
+    The relative standard error of count() is about 1.04 / sqrt(2**precision): 1.6% at the default
+    precision 12 (4 KB). Sketches with the same precision merge losslessly, so per-day sketches
+    combine into the sketch of any set of days.
+    """
+
+    def __init__(self, precision: int = 12):
+        if not 4 <= precision <= 18:
+            raise ValueError("HyperLogLog precision must be between 4 and 18")
+        self.precision = precision
+        self.registers = bytearray(1 << precision)
+
+    @property
+    def relative_error(self) -> float:
+        return 1.04 / math.sqrt(len(self.registers))
+
+    def add(self, value: Hashable):
+        x = _hash64(value)
+        index = x >> (64 - self.precision)
+        rest_bits = 64 - self.precision
+        rest = x & ((1 << rest_bits) - 1)
+        rank = rest_bits - rest.bit_length() + 1
+        if rank > self.registers[index]:
+            self.registers[index] = rank
+
+    def merge(self, other: "HyperLogLog"):
+        if other.precision != self.precision:
+            raise ValueError("Cannot merge HyperLogLog sketches with different precision")
+        merged = np.maximum(np.frombuffer(self.registers, dtype=np.uint8), np.frombuffer(other.registers, dtype=np.uint8))
+        self.registers = bytearray(merged.tobytes())
+
+    def count(self) -> int:
+        registers = np.frombuffer(self.registers, dtype=np.uint8)
+        m = len(registers)
+        alpha = 0.7213 / (1 + 1.079 / m)
+        estimate = alpha * m * m / float(np.sum(np.exp2(-registers.astype(np.float64))))
+        zeros = int(np.count_nonzero(registers == 0))
+        if estimate <= 2.5 * m and zeros:
+            # Small-range correction (linear counting)
+            estimate = m * math.log(m / zeros)
+        return int(round(estimate))
+
+
+class SpaceSaving:
+    """Weighted heavy-hitters summary (Space-Saving) holding at most `capacity` keys.
+
+    Each monitored key carries an estimated weight that overstates the true weight by at most its
+    `error`, and every error is at most total_weight / capacity; any key whose true weight exceeds
+    total_weight / capacity is guaranteed to be monitored. merge() keeps the same bounds
+    (Agarwal et al., "Mergeable Summaries"). A secondary `value` (e.g. revenue) and a `label` are
+    tracked per key while it is monitored, so values are lower bounds.
+
+    The minimum key is tracked with a heap of (count, push number, key) entries; entries whose count
+    is no longer the key's are skipped when popped and dropped when the heap is rebuilt, so an
+    eviction costs O(log capacity) amortized instead of a scan of every key.
+    """
+
+    def __init__(self, capacity: int = 200):
+        self.capacity = max(capacity, 1)
+        self.counts = {}
+        self.errors = {}
+        self.values = {}
+        self.labels = {}
+        self.total_weight = 0
+        self._heap = []
+        self._pushes = 0
+
+    def _push(self, key: Hashable):
+        if len(self._heap) >= 4 * self.capacity:
+            self._rebuild_heap()
+        self._pushes += 1
+        heapq.heappush(self._heap, (self.counts[key], self._pushes, key))
+
+    def _rebuild_heap(self):
+        self._heap = [(count, i, key) for i, (key, count) in enumerate(self.counts.items())]
+        self._pushes = len(self._heap)
+        heapq.heapify(self._heap)
+
+    def _min_key(self) -> Hashable:
+        """Monitored key with the lowest count; the summary must not be empty."""
+        while True:
+            count, _, key = self._heap[0]
+            if self.counts.get(key) == count:
+                return key
+            heapq.heappop(self._heap)
+
+    def _floor(self) -> float:
+        """Weight a key not in the summary may have been evicted with."""
+        return self.counts[self._min_key()] if len(self.counts) >= self.capacity else 0
+
+    def add(self, key: Hashable, weight: float = 1, value: float = 0.0, label: Optional[str] = None):
+        self.total_weight += weight
+        if key in self.counts:
+            self.counts[key] += weight
+            self.values[key] += value
+        elif len(self.counts) < self.capacity:
+            self.counts[key] = weight
+            self.errors[key] = 0
+            self.values[key] = value
+        else:
+            evicted = self._min_key()
+            heapq.heappop(self._heap)
+            floor = self.counts.pop(evicted)
+            del self.errors[evicted], self.values[evicted]
+            self.labels.pop(evicted, None)
+            self.counts[key] = floor + weight
+            self.errors[key] = floor
+            self.values[key] = value
+        self._push(key)
+        if label and key not in self.labels:
+            self.labels[key] = label
+
+    def merge(self, other: "SpaceSaving"):
+        """Fold other into this summary. Labels already held here take precedence."""
+        own_floor, other_floor = self._floor(), other._floor()
+        merged = []
+        for key in self.counts.keys() | other.counts.keys():
+            count = self.counts.get(key, own_floor) + other.counts.get(key, other_floor)
+            error = self.errors.get(key, own_floor) + other.errors.get(key, other_floor)
+            value = self.values.get(key, 0.0) + other.values.get(key, 0.0)
+            merged.append((count, key, error, value))
+        merged.sort(key=lambda entry: (-entry[0], str(entry[1])))
+        merged = merged[:self.capacity]
+        labels = {**other.labels, **self.labels}
+        self.counts = {key: count for count, key, _, _ in merged}
+        self.errors = {key: error for _, key, error, _ in merged}
+        self.values = {key: value for _, key, _, value in merged}
+        self.labels = {key: labels[key] for key in self.counts if key in labels}
+        self.total_weight += other.total_weight
+        self._rebuild_heap()
+
+    @property
+    def max_error(self) -> float:
+        return self.total_weight / self.capacity
+
+    def top(self, n: int) -> list:
+        """[(key, estimated weight, error bound, value, label)] for the n heaviest keys."""
+        keys = sorted(self.counts, key=self.counts.get, reverse=True)[:n]
+        return [(key, self.counts[key], self.errors[key], self.values[key], self.labels.get(key, "")) for key in keys]
+
+
+class DaySketch:
+    """Mergeable summary of one day's orders: exact order count and revenue, sketched customers and products."""
+
+    __slots__ = ("orders", "revenue", "customers", "products")
+
+    def __init__(self, precision: int, capacity: int):
+        self.orders = 0
+        self.revenue = 0.0
+        self.customers = HyperLogLog(precision)
+        self.products = SpaceSaving(capacity)
+
+    def add_order(self, order):
+        self.orders += 1
+        self.revenue += order.total_value
+        if order.c_id:
+            self.customers.add(order.c_id)
+        for item in order.items:
+            if item.p_id:
+                self.products.add(item.p_id, item.oi_qty, item.oi_total, item.p_name)
+
+    def merge(self, other: "DaySketch"):
+        self.orders += other.orders
+        self.revenue += other.revenue
+        self.customers.merge(other.customers)
+        self.products.merge(other.products)
+
+
+def _day_start(day: date) -> datetime:
+    return datetime.combine(day, time.min, tzinfo=timezone.utc)
+
+
+def _order_day(order) -> Optional[date]:
+    return order.o_placed_time.astimezone(timezone.utc).date() if order.o_placed_time else None
+
+
+class DailySketches:
+    """Per-UTC-day DaySketches over the order cache, merged on demand for any time window.
+
+    Memory grows with the number of days that have orders, not with orders, customers or products.
+    Each day keeps a signature (order count, XOR of order hashes) of the orders it was built from,
+    so refreshed() rebuilds only the days whose orders changed. Signatures use hash(), which is
+    salted per process; they are only compared within one.
+    """
+
+    def __init__(self, precision: int = 12, capacity: int = 200):
+        self.precision = precision
+        self.capacity = capacity
+        self.days = {}
+        self.signatures = {}
+        # Days rebuilt by the refreshed() call that produced these sketches
+        self.rebuilt_days = 0
+
+    @classmethod
+    def from_orders(cls, orders: Sequence, precision: int = 12, capacity: int = 200) -> "DailySketches":
+        return cls(precision, capacity).refreshed(orders)
+
+    def refreshed(self, orders: Sequence) -> "DailySketches":
+        """Sketches of orders (the whole cache): unchanged days share this object's DaySketches, the
+        others are rebuilt. This object is left as it is, so readers may keep using it meanwhile."""
+        signatures = {}
+        for order in orders:
+            day = _order_day(order)
+            if day is not None:
+                count, digest = signatures.get(day, (0, 0))
+                signatures[day] = (count + 1, digest ^ hash((order.o_id, order.c_id, order.total_value, order.items)))
+        result = DailySketches(self.precision, self.capacity)
+        result.signatures = signatures
+        changed = set()
+        for day, signature in signatures.items():
+            if self.signatures.get(day) == signature:
+                result.days[day] = self.days[day]
+            else:
+                result.days[day] = DaySketch(self.precision, self.capacity)
+                changed.add(day)
+        if changed:
+            for order in orders:
+                day = _order_day(order)
+                if day in changed:
+                    result.days[day].add_order(order)
+        result.rebuilt_days = len(changed)
+        return result
+
+    def window(self, start_date: datetime, end_date: datetime, orders_in_range: Callable[[datetime, datetime], Iterable]) -> DaySketch:
+        """Sketch of orders placed in [start_date, end_date].
+
+        Whole days inside the window come from the day sketches; the partial days at either edge are
+        summarized from orders_in_range(start, end), so windows need not align with midnight.
+        """
+        result = DaySketch(self.precision, self.capacity)
+        start_day = start_date.astimezone(timezone.utc).date()
+        first_full = start_day if _day_start(start_day) >= start_date else start_day + timedelta(days=1)
+        # The end day is partial unless end_date is its last microsecond
+        end_day = end_date.astimezone(timezone.utc).date()
+        last_full = end_day if _day_start(end_day + timedelta(days=1)) - timedelta(microseconds=1) <= end_date else end_day - timedelta(days=1)
+        if first_full > last_full:
+            edges = [(start_date, end_date)]
+        else:
+            for day, sketch in sorted(self.days.items(), reverse=True):
+                if first_full <= day <= last_full:
+                    result.merge(sketch)
+            edges = [
+                (start_date, _day_start(first_full) - timedelta(microseconds=1)),
+                (_day_start(last_full + timedelta(days=1)), end_date),
+            ]
+        for edge_start, edge_end in edges:
+            if edge_start <= edge_end:
+                for order in orders_in_range(edge_start, edge_end):
+                    result.add_order(order)
+        return result
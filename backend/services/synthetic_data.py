@@ -0,0 +1,308 @@
+import csv
+import io
+from datetime import datetime, timedelta, timezone
+from typing import AsyncIterator, Iterator, Optional
+import numpy as np
+
+# Orders are generated in fixed blocks, each from its own seeded stream, so a dataset depends only on
+# the seed and sizes (not on batch sizes or how much of it is consumed) and blocks can be generated
+# independently.
+ORDER_BLOCK_SIZE = 50_000
+
+# name, (orders, customers, products)
+PRESETS = {
+    "10k": (10_000, 1_000, 500),
+    "1m": (1_000_000, 50_000, 5_000),
+    "10m": (10_000_000, 500_000, 20_000),
+}
+
+_FIRST_NAMES = [
+    "Aarav", "Amelia", "Carlos", "Chen", "Divya", "Elena", "Fatima", "George", "Hana", "Ibrahim", "Isla", "James",
+    "Kenji", "Lara", "Lucas", "Maya", "Mohammed", "Nina", "Oliver", "Priya", "Rafael", "Sara", "Tomas", "Yara",
+]
+_LAST_NAMES = [
+    "Ahmed", "Brown", "Costa", "Dubois", "Evans", "Fischer", "Garcia", "Haddad", "Ito", "Johnson", "Kim", "Kowalski",
+    "Lopez", "Martin", "Nguyen", "Okafor", "Patel", "Rossi", "Singh", "Smith", "Tanaka", "Wang", "Williams", "Zhang",
+]
+_STREETS = ["Oak", "Maple", "Cedar", "High", "Station", "Mill", "Park", "Church", "River", "Market", "Hill", "Lake"]
+_STREET_SUFFIXES = ["Street", "Road", "Avenue", "Lane", "Way", "Drive"]
+_CITIES = ["Springfield", "Riverton", "Fairview", "Kingsport", "Lakeside", "Ashford", "Brookfield", "Greenville"]
+_PRODUCT_ADJECTIVES = ["Premium", "Basic", "Eco", "Heavy-Duty", "Compact", "Deluxe", "Classic", "Pro", "Mini", "Ultra"]
+_PRODUCT_NOUNS = [
+    "Stapler", "Notebook", "Desk Lamp", "Printer Paper", "Ballpoint Pens", "Whiteboard", "Office Chair", "Binder",
+    "Sticky Notes", "Monitor Stand", "Paper Clips", "File Cabinet", "Highlighters", "Desk Organizer", "Envelopes",
+    "Label Maker", "Scissors", "Calculator", "Tape Dispenser", "Mouse Pad",
+]
+_STATUSES = ["Confirmed", "Waiting for Confirmation", "Hold", "Processing"]
+_STATUS_WEIGHTS = [0.8, 0.1, 0.05, 0.05]
+# Email scenarios (services/test_case_generator_service.ORDER_EMAIL_SCENARIOS) and their share of a corpus
+_EMAIL_SCENARIO_WEIGHTS = {"valid": 0.7, "bulk": 0.1, "hold": 0.1, "unknown_products": 0.05, "unknown_customer": 0.05}
+
+
+def _cdf(weights) -> np.ndarray:
+    """Normalized cumulative weights; searchsorted(cdf, uniform draws) samples indexes by weight."""
+    cumulative = np.cumsum(np.asarray(weights, dtype=np.float64))
+    return cumulative / cumulative[-1]
+
+
+def _popularity(n: int, exponent: float) -> np.ndarray:
+    """Sampling CDF of a Zipf law over ranks 1..n."""
+    return _cdf(1.0 / np.arange(1, n + 1, dtype=np.float64) ** exponent)
+
+
+class SyntheticDataGenerator:
+    """Deterministic, seeded customers, products and orders for scale and load testing.
+
+    Product demand follows a Zipf law (`product_skew`, about 1.1 gives a long tail where the top 1% of
+    products take a large share of items) and customers order with a milder skew (`customer_skew`).
+    Order times span `days` days up to `end_date` with volume growing toward the end; each order has
+    1-10 distinct products. Popularity ranks are shuffled so popular products are not the lowest ids.
+    Identical arguments always produce identical data.
+    """
+
+    def __init__(self, seed: int = 0, n_customers: int = 1_000, n_products: int = 500, days: int = 730,
+                 end_date: Optional[datetime] = None, product_skew: float = 1.1, customer_skew: float = 0.6,
+                 id_prefix: str = "syn"):
+        self.seed = seed
+        self.n_customers = n_customers
+        self.n_products = n_products
+        self.days = days
+        if end_date is None:
+            end_date = datetime.now(timezone.utc).replace(hour=0, minute=0, second=0, microsecond=0)
+        self.end_date = end_date
+        self.start_date = end_date - timedelta(days=days)
+        self.id_prefix = id_prefix
+
+        rng = np.random.default_rng([seed, 0])
+        self._product_by_rank = rng.permutation(n_products)
+        self._customer_by_rank = rng.permutation(n_customers)
+        self._product_cdf = _popularity(n_products, product_skew)
+        self._customer_cdf = _popularity(n_customers, customer_skew)
+        self.product_prices = np.round(np.exp(rng.normal(2.5, 0.9, n_products)), 2).clip(0.5, 2000)
+        # Mostly healthy stock, with some low-stock and out-of-stock products
+        self.product_stock = np.where(rng.random(n_products) < 0.1, rng.integers(0, 6, n_products), rng.integers(20, 2000, n_products))
+        self._product_ids = [self.product_id(index) for index in range(n_products)]
+        self._product_names = [self.product_name(index) for index in range(n_products)]
+
+    # --- Customers and products ---
+
+    def customer_id(self, index: int) -> str:
+        return f"{self.id_prefix}-c{index + 1:07d}"
+
+    def product_id(self, index: int) -> str:
+        return f"{self.id_prefix}-p{index + 1:06d}"
+
+    def customer(self, index: int) -> dict:
+        first = _FIRST_NAMES[index % len(_FIRST_NAMES)]
+        last = _LAST_NAMES[(index // len(_FIRST_NAMES)) % len(_LAST_NAMES)]
+        street = _STREETS[(index * 7) % len(_STREETS)]
+        return {
+            "c_id": self.customer_id(index),
+            "c_name": f"{first} {last}",
+            "c_email": f"{first.lower()}.{last.lower()}{index + 1}@example.com",
+            "c_address": f"{index % 997 + 1} {street} {_STREET_SUFFIXES[index % len(_STREET_SUFFIXES)]}, {_CITIES[(index // 3) % len(_CITIES)]}",
+        }
+
+    def product_name(self, index: int) -> str:
+        adjective = _PRODUCT_ADJECTIVES[index % len(_PRODUCT_ADJECTIVES)]
+        noun = _PRODUCT_NOUNS[(index // len(_PRODUCT_ADJECTIVES)) % len(_PRODUCT_NOUNS)]
+        return f"{adjective} {noun} {index + 1}"
+
+    def customers(self) -> Iterator[tuple]:
+        """(c_id, c_name, c_email, c_address, c_created_time) rows; customers sign up before the order window."""
+        created = self.start_date - timedelta(days=30)
+        for index in range(self.n_customers):
+            customer = self.customer(index)
+            yield customer["c_id"], customer["c_name"], customer["c_email"], customer["c_address"], created
+
+    def products(self) -> Iterator[tuple]:
+        """(p_id, p_name, p_price, p_stock) rows."""
+        for index in range(self.n_products):
+            yield self._product_ids[index], self._product_names[index], f"{self.product_prices[index]:.2f}", int(self.product_stock[index])
+
+    # --- Orders ---
+
+    def order_block(self, block: int, n_orders: int) -> dict:
+        """Column arrays for orders block*ORDER_BLOCK_SIZE onward of an n_orders dataset.
+
+        Orders: index, customer, placed (epoch seconds, ascending), delivery_days, status.
+        Items: item_order (position within the block), item_product, item_qty.
+        """
+        first = block * ORDER_BLOCK_SIZE
+        size = min(ORDER_BLOCK_SIZE, n_orders - first)
+        rng = np.random.default_rng([self.seed, 1, block])
+
+        # Order i sits at a random point of its 1/n_orders slice of the window's quantiles; mapping
+        # quantile q to time q ** 0.7 makes order volume grow over time, and keeps placed ascending
+        quantiles = (np.arange(first, first + size) + rng.random(size)) / n_orders
+        span = (self.end_date - self.start_date).total_seconds()
+        placed = self.start_date.timestamp() + span * quantiles ** 0.7
+        customer = self._customer_by_rank[np.searchsorted(self._customer_cdf, rng.random(size))]
+        status = np.searchsorted(_cdf(_STATUS_WEIGHTS), rng.random(size))
+        delivery_days = rng.integers(2, 15, size)
+
+        item_counts = np.minimum(1 + rng.poisson(1.8, size), 10)
+        item_order = np.repeat(np.arange(size), item_counts)
+        item_product = self._product_by_rank[np.searchsorted(self._product_cdf, rng.random(len(item_order)))]
+        # One line per product within an order: drop repeated draws of the same product
+        _, keep = np.unique(item_order.astype(np.int64) * self.n_products + item_product, return_index=True)
+        item_order, item_product = item_order[keep], item_product[keep]
+        item_qty = np.minimum(rng.geometric(0.45, len(item_order)), 25)
+        return {
+            "index": np.arange(first, first + size), "customer": customer, "placed": placed,
+            "delivery_days": delivery_days, "status": status,
+            "item_order": item_order, "item_product": item_product, "item_qty": item_qty,
+        }
+
+    def order_id(self, index: int) -> str:
+        return f"{self.id_prefix.upper()}-ORD-{index + 1:08d}"
+
+    def order_rows(self, block: int, n_orders: int):
+        """(orders rows, order_items rows) of a block, in the column order of ORDER_COLUMNS and ITEM_COLUMNS."""
+        data = self.order_block(block, n_orders)
+        customers = {}
+        order_ids = [self.order_id(int(index)) for index in data["index"]]
+        # Timestamps are formatted as ISO 8601 UTC strings in one vectorized call each
+        placed_us = (data["placed"] * 1_000_000).astype("datetime64[us]")
+        placed_times = np.datetime_as_string(placed_us, timezone="UTC").tolist()
+        delivery_times = np.datetime_as_string(placed_us + data["delivery_days"].astype("timedelta64[D]"), timezone="UTC").tolist()
+        status_names = [_STATUSES[status] for status in data["status"].tolist()]
+        orders = []
+        for position, customer_index in enumerate(data["customer"].tolist()):
+            customer = customers.get(customer_index)
+            if customer is None:
+                customer = customers[customer_index] = self.customer(customer_index)
+            orders.append((
+                order_ids[position], customer["c_id"], customer["c_name"], customer["c_address"],
+                delivery_times[position], status_names[position], placed_times[position], None,
+            ))
+        prices = self.product_prices[data["item_product"]]
+        totals = np.round(prices * data["item_qty"], 2)
+        product_ids, product_names = self._product_ids, self._product_names
+        items = [
+            (order_ids[position], product_ids[product], product_names[product], qty, f"{price:.2f}", f"{total:.2f}", True)
+            for position, product, qty, price, total in zip(
+                data["item_order"].tolist(), data["item_product"].tolist(), data["item_qty"].tolist(), prices.tolist(), totals.tolist()
+            )
+        ]
+        return orders, items
+
+    # --- In-memory caches (the shapes db.py returns), for benchmarks without a database ---
+
+    def customers_dict(self) -> dict:
+        """{c_id: {"name", "email", "address", "created_time"}} like _get_all_customers_dict_async."""
+        return {
+            c_id: {"name": name, "email": email, "address": address, "created_time": created}
+            for c_id, name, email, address, created in self.customers()
+        }
+
+    def products_dict(self) -> dict:
+        """{p_id: {"name", "price", "stock"}} like _get_products_async."""
+        return {p_id: {"name": name, "price": float(price), "stock": stock} for p_id, name, price, stock in self.products()}
+
+    def order_records(self, n_orders: int) -> list:
+        """All n_orders orders as OrderRecords, newest first, like _get_orders_async."""
+        from records import OrderItemRecord, OrderRecord, intern_str
+
+        orders = []
+        for block in range(-(-n_orders // ORDER_BLOCK_SIZE)):
+            order_rows, item_rows = self.order_rows(block, n_orders)
+            items_by_order = {}
+            for o_id, p_id, p_name, qty, price, total, _ in item_rows:
+                items_by_order.setdefault(o_id, []).append(
+                    OrderItemRecord(intern_str(p_id), intern_str(p_name), qty, float(price), float(total))
+                )
+            for o_id, c_id, c_name, c_address, delivery, status, placed, _ in order_rows:
+                items = tuple(items_by_order.get(o_id, ()))
+                orders.append(OrderRecord(
+                    o_id, intern_str(c_id), intern_str(c_name), intern_str(c_address),
+                    datetime.fromisoformat(delivery.replace("Z", "+00:00")), datetime.fromisoformat(placed.replace("Z", "+00:00")),
+                    sum(item.oi_total for item in items), intern_str(status), items,
+                ))
+        orders.reverse()
+        return orders
+
+    # --- Order emails ---
+
+    def emails(self, count: int) -> Iterator[dict]:
+        """Order emails in the TestCaseGeneratorService formats, with the customer and items they ask for.
+
+        Scenarios follow _EMAIL_SCENARIO_WEIGHTS; "hold" emails ask for more than a low-stock
+        product's stock and the "unknown_*" scenarios reference ids that are not in the dataset.
+        """
+        from services.test_case_generator_service import render_order_email
+
+        rng = np.random.default_rng([self.seed, 2])
+        scenarios = list(_EMAIL_SCENARIO_WEIGHTS)
+        picks = np.searchsorted(_cdf(list(_EMAIL_SCENARIO_WEIGHTS.values())), rng.random(count))
+        low_stock = np.flatnonzero(self.product_stock <= 1)
+        for number, pick in enumerate(picks.tolist()):
+            scenario = scenarios[pick]
+            if scenario == "unknown_customer":
+                customer = {"id": f"{self.id_prefix}-c9{number:07d}", "name": "Unknown User", "email": f"new.customer{number}@example.com"}
+            else:
+                c = self.customer(int(self._customer_by_rank[np.searchsorted(self._customer_cdf, rng.random())]))
+                customer = {"id": c["c_id"], "name": c["c_name"], "email": c["c_email"]}
+            n_items = int(rng.integers(2, 4) if scenario in ("bulk", "unknown_products") else rng.integers(1, 3))
+            ranks = np.searchsorted(self._product_cdf, rng.random(n_items))
+            product_indexes = list(dict.fromkeys(self._product_by_rank[ranks].tolist()))
+            products = [
+                {"p_id": self.product_id(index), "p_name": self.product_name(index), "quantity": int(rng.integers(1, 6))}
+                for index in product_indexes
+            ]
+            if scenario == "hold" and len(low_stock):
+                index = int(low_stock[rng.integers(len(low_stock))])
+                products.insert(0, {"p_id": self.product_id(index), "p_name": self.product_name(index), "quantity": int(self.product_stock[index]) + 1})
+            elif scenario == "unknown_products":
+                products[-1] = {"p_id": f"{self.id_prefix}-p9{number:06d}", "p_name": f"Unknown Product {number}", "quantity": products[-1]["quantity"]}
+            email = render_order_email(scenario, customer, products)
+            email["scenario"] = scenario
+            email["expected"] = {"customer_id": customer["id"], "items": products}
+            yield email
+
+
+CUSTOMER_COLUMNS = ["c_id", "c_name", "c_email", "c_address", "c_created_time"]
+PRODUCT_COLUMNS = ["p_id", "p_name", "p_price", "p_stock"]
+ORDER_COLUMNS = ["o_id", "c_id", "c_name", "c_address", "o_delivery_date", "o_status", "o_placed_time", "o_remarks"]
+ITEM_COLUMNS = ["o_id", "p_id", "p_name", "oi_qty", "oi_price", "oi_total", "oi_is_available"]
+
+
+def _csv_chunks(rows, chunk_rows: int = 20_000) -> Iterator[bytes]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= chunk_rows:
+            writer.writerows(batch)
+            batch = []
+            yield buffer.getvalue().encode("utf-8")
+            buffer.seek(0)
+            buffer.truncate()
+    writer.writerows(batch)
+    yield buffer.getvalue().encode("utf-8")
+
+
+async def _async_chunks(chunks) -> AsyncIterator[bytes]:
+    for chunk in chunks:
+        yield chunk
+
+
+async def copy_dataset(connection, generator: SyntheticDataGenerator, n_orders: int, progress=None) -> dict:
+    """Load customers, products and n_orders orders into Postgres with COPY; returns row counts.
+
+    Each table is streamed as CSV, one order block at a time, so memory stays flat for any n_orders.
+    progress, if given, is called with (orders loaded, n_orders) after every block.
+    """
+    await connection.copy_to_table("customers", source=_async_chunks(_csv_chunks(generator.customers())), columns=CUSTOMER_COLUMNS, format="csv")
+    await connection.copy_to_table("products", source=_async_chunks(_csv_chunks(generator.products())), columns=PRODUCT_COLUMNS, format="csv")
+    n_items = 0
+    n_blocks = -(-n_orders // ORDER_BLOCK_SIZE)
+    for block in range(n_blocks):
+        orders, items = generator.order_rows(block, n_orders)
+        await connection.copy_to_table("orders", source=_async_chunks(_csv_chunks(orders)), columns=ORDER_COLUMNS, format="csv")
+        await connection.copy_to_table("order_items", source=_async_chunks(_csv_chunks(items)), columns=ITEM_COLUMNS, format="csv")
+        n_items += len(items)
+        if progress:
+            progress(min((block + 1) * ORDER_BLOCK_SIZE, n_orders), n_orders)
+    return {"customers": generator.n_customers, "products": generator.n_products, "orders": n_orders, "order_items": n_items}
@@ -1,25 +1,135 @@
 import json
+import logging
 import random
-import google.generativeai as genai
 from typing import Callable
 from config import Config
 from models import ExtractedOrderInfo, OrderProduct
 from db import get_customers, get_products
 
+logger = logging.getLogger(__name__)
+
+# Order email scenarios: (type, description, subject prefix, body template). Bodies are filled by
+# render_order_email; the synthetic data generator reuses them for large email corpora.
+ORDER_EMAIL_SCENARIOS = {
+    "valid": ("Valid", "Standard order with existing items and customer.", "Order Request", """Dear team,
+
+I hope this email finds you well. I would like to place an order for the following items:
+
+{items}
+
+Customer Details:
+- Customer ID: {customer_id}
+- Email: {email}
+
+Please process this order at your earliest convenience. I look forward to hearing from you.
+
+Best regards,
+{name}"""),
+    "bulk": ("Valid", "Multiple item order with existing products and customer.", "Bulk Order Request", """Hi there,
+
+I'm looking to place a larger order for our office supplies. Here are the items we need:
+
+{items}
+
+Customer Information:
+- Customer ID: {customer_id}
+- Email: {email}
+
+Could you please confirm availability and provide an estimated delivery time?
+
+Thanks,
+{name}"""),
+    "hold": ("Hold", "Order with one item out of stock or below min quantity.", "Order Query", """Hello,
+
+I'm interested in placing an order, but I have some concerns about availability:
+
+{items}
+
+Customer Details:
+- Customer ID: {customer_id}
+- Email: {email}
+
+I'm particularly concerned about the availability of {first_product}. Could you please check if you have sufficient stock for this order?
+
+Best regards,
+{name}"""),
+    "unknown_products": ("Failed", "Order with non-existent product IDs.", "Order Request", """Dear Sales Team,
+
+I'm trying to order some items but I'm not sure about the exact product codes. Here's what I'm looking for:
+
+{items}
+
+Customer Information:
+- Customer ID: {customer_id}
+- Email: {email}
+
+I found these product codes online, but I'm not sure if they're correct. Could you please help me find the right products?
+
+Thanks,
+{name}"""),
+    "unknown_customer": ("Failed", "Order with non-existent customer ID and email.", "New Customer Order", """Hi,
+
+I'm a new customer and would like to place my first order. Here are the items I need:
+
+{items}
+
+My Details:
+- Customer ID: {customer_id}
+- Email: {email}
+
+I'm not sure if I have a customer account yet. Could you please help me set one up and process this order?
+
+Best regards,
+{name}"""),
+}
+
+
+def render_order_email(scenario: str, customer: dict, products: list) -> dict:
+    """Test case dict (type, description, subject, body) for one of ORDER_EMAIL_SCENARIOS.
+
+    customer has id, name and email; products are dicts with p_id, p_name and quantity.
+    """
+    case_type, description, subject_prefix, template = ORDER_EMAIL_SCENARIOS[scenario]
+    items = chr(10).join([f"• {product['p_name']} (ID: {product['p_id']}) - Quantity: {product['quantity']}" for product in products])
+    return {
+        "type": case_type,
+        "description": description,
+        "subject": f"{subject_prefix} - {customer['name']}",
+        "body": template.format(
+            items=items,
+            customer_id=customer["id"],
+            email=customer["email"],
+            name=customer["name"],
+            first_product=products[0]["p_name"] if products else "",
+        ),
+    }
+
+
 class TestCaseGeneratorService:
     def __init__(self, get_customers_func: Callable, get_products_func: Callable):
         self.get_customers_func = get_customers_func
         self.get_products_func = get_products_func
-        
-        # Initialize Google Generative AI
-        genai.configure(api_key=Config.GOOGLE_API_KEY)
-        self.model = genai.GenerativeModel(Config.GEMINI_MODEL)
-        
-        # Cache customers and products locally
-        print("[TestCaseGeneratorService] Initializing and caching data...")
+        self._model = None
+
+        # Customers and products are cached by load_cached_data (run by the startup warm-up)
+        self.customers = None
+        self.products = None
+
+    @property
+    def model(self):
+        """Gemini model, created on first use (google.generativeai is slow to import)."""
+        if self._model is None:
+            import google.generativeai as genai
+            genai.configure(api_key=Config.GOOGLE_API_KEY)
+            self._model = genai.GenerativeModel(Config.GEMINI_MODEL)
+        return self._model
+
+    def load_cached_data(self):
+        """Cache customers and products locally."""
+        logger.info("Caching customers and products...")
         self.customers = self.get_customers_func()
         self.products = self.get_products_func()
-        print(f"[TestCaseGeneratorService] Cached {len(self.customers)} customers and {len(self.products)} products.")
+        logger.info("Cached %s customers and %s products.", len(self.customers), len(self.products))
 
     def _pick_random_product(self, num_products: int, must_exist: bool = True) -> list:
         """Pick num_products random products from cached self.products."""
@@ -74,57 +184,19 @@ class TestCaseGeneratorService:
     async def generate_test_cases(self) -> list[dict]:
         """Generate 5 test cases with different scenarios."""
         try:
-            print("[TestCaseGeneratorService] Generating test cases...")
+            logger.debug("Generating test cases...")
             
             test_cases = []
             
             # Case 1: Valid order with 1-2 random existing products
             customer1 = self._pick_random_customer(must_exist=True)
             products1 = self._pick_random_product(random.randint(1, 2), must_exist=True)
-            
-            test_cases.append({
-                "type": "Valid",
-                "description": "Standard order with existing items and customer.",
-                "subject": f"Order Request - {customer1['name']}",
-                "body": f"""Dear team,
-
-I hope this email finds you well. I would like to place an order for the following items:
-
-{chr(10).join([f"• {product['p_name']} (ID: {product['p_id']}) - Quantity: {product['quantity']}" for product in products1])}
-
-Customer Details:
-- Customer ID: {customer1['id']}
-- Email: {customer1['email']}
-
-Please process this order at your earliest convenience. I look forward to hearing from you.
-
-Best regards,
-{customer1['name']}"""
-            })
+            test_cases.append(render_order_email("valid", customer1, products1))
             
             # Case 2: Valid order with 2-3 random existing products
             customer2 = self._pick_random_customer(must_exist=True)
             products2 = self._pick_random_product(random.randint(2, 3), must_exist=True)
-            
-            test_cases.append({
-                "type": "Valid",
-                "description": "Multiple item order with existing products and customer.",
-                "subject": f"Bulk Order Request - {customer2['name']}",
-                "body": f"""Hi there,
-
-I'm looking to place a larger order for our office supplies. Here are the items we need:
-
-{chr(10).join([f"• {product['p_name']} (ID: {product['p_id']}) - Quantity: {product['quantity']}" for product in products2])}
-
-Customer Information:
-- Customer ID: {customer2['id']}
-- Email: {customer2['email']}
-
-Could you please confirm availability and provide an estimated delivery time?
-
-Thanks,
-{customer2['name']}"""
-            })
+            test_cases.append(render_order_email("bulk", customer2, products2))
             
             # Case 3: Hold - Low Stock/Min Qty
             customer3 = self._pick_random_customer(must_exist=True)
@@ -143,78 +215,21 @@ Thanks,
                 # Fallback to regular products but with high quantity
                 products3 = self._pick_random_product(2, must_exist=True)
                 products3[0]["quantity"] = 10  # High quantity that might exceed stock
-            
-            test_cases.append({
-                "type": "Hold",
-                "description": "Order with one item out of stock or below min quantity.",
-                "subject": f"Order Query - {customer3['name']}",
-                "body": f"""Hello,
-
-I'm interested in placing an order, but I have some concerns about availability:
-
-{chr(10).join([f"• {product['p_name']} (ID: {product['p_id']}) - Quantity: {product['quantity']}" for product in products3])}
-
-Customer Details:
-- Customer ID: {customer3['id']}
-- Email: {customer3['email']}
-
-I'm particularly concerned about the availability of {products3[0]['p_name']}. Could you please check if you have sufficient stock for this order?
-
-Best regards,
-{customer3['name']}"""
-            })
+            test_cases.append(render_order_email("hold", customer3, products3))
             
             # Case 4: Failed - All Wrong Items
             customer4 = self._pick_random_customer(must_exist=True)
             products4 = self._pick_random_product(random.randint(2, 3), must_exist=False)
-            
-            test_cases.append({
-                "type": "Failed",
-                "description": "Order with non-existent product IDs.",
-                "subject": f"Order Request - {customer4['name']}",
-                "body": f"""Dear Sales Team,
-
-I'm trying to order some items but I'm not sure about the exact product codes. Here's what I'm looking for:
-
-{chr(10).join([f"• {product['p_name']} (ID: {product['p_id']}) - Quantity: {product['quantity']}" for product in products4])}
-
-Customer Information:
-- Customer ID: {customer4['id']}
-- Email: {customer4['email']}
-
-I found these product codes online, but I'm not sure if they're correct. Could you please help me find the right products?
-
-Thanks,
-{customer4['name']}"""
-            })
+            test_cases.append(render_order_email("unknown_products", customer4, products4))
             
             # Case 5: Failed - Invalid Customer
             customer5 = self._pick_random_customer(must_exist=False)
             products5 = self._pick_random_product(random.randint(1, 2), must_exist=True)
+            test_cases.append(render_order_email("unknown_customer", customer5, products5))
             
-            test_cases.append({
-                "type": "Failed",
-                "description": "Order with non-existent customer ID and email.",
-                "subject": f"New Customer Order - {customer5['name']}",
-                "body": f"""Hi,
-
-I'm a new customer and would like to place my first order. Here are the items I need:
-
-{chr(10).join([f"• {product['p_name']} (ID: {product['p_id']}) - Quantity: {product['quantity']}" for product in products5])}
-
-My Details:
-- Customer ID: {customer5['id']}
-- Email: {customer5['email']}
-
-I'm not sure if I have a customer account yet. Could you please help me set one up and process this order?
-
-Best regards,
-{customer5['name']}"""
-            })
-            
-            print(f"[TestCaseGeneratorService] Generated {len(test_cases)} test cases successfully.")
+            logger.debug("Generated %s test cases successfully.", len(test_cases))
             return test_cases
             
         except Exception as e:
-            print(f"[TestCaseGeneratorService] Error generating test cases: {e}")
+            logger.error("Error generating test cases: %s", e)
             return [] 
\ No newline at end of file
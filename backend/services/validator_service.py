@@ -1,10 +1,14 @@
 from typing import List, Optional
 from models import ExtractedOrderInfo, ValidationResult, ValidationErrorItem, OrderProduct
 from db import get_customers, get_products
+from services.order_error_log import OrderErrorLog, ERROR_KIND_NOT_FOUND, ERROR_KIND_INSUFFICIENT_STOCK
 
 class ValidatorService:
-    @staticmethod
-    def validate_order(info: ExtractedOrderInfo) -> ValidationResult:
+    def __init__(self, error_log: Optional[OrderErrorLog] = None):
+        # Products not found and stock shortfalls are recorded here for catalog suggestions
+        self.error_log = error_log
+
+    def validate_order(self, info: ExtractedOrderInfo) -> ValidationResult:
         customers = get_customers()
         products_db = get_products()
         error_items: List[ValidationErrorItem] = []
@@ -69,6 +73,9 @@ class ValidatorService:
                     product_id=order_product.product_id,
                     error=f"Product '{order_product.product_id}'/'{order_product.product_name}' not found in database."
                 ))
+                if self.error_log:
+                    self.error_log.record(ERROR_KIND_NOT_FOUND, order_product.product_id, order_product.product_name,
+                                          customer_info.get("id"), order_product.quantity)
                 # Suggest similar products (by name)
                 similar = [p for p in products_db.values() if order_product.product_name.lower() in p["name"].lower()]
                 if similar:
@@ -89,6 +96,9 @@ class ValidatorService:
                     product_id=used_product_id,
                     error=f"Ordered quantity for product {prod['name']} exceeds available stock ({stock} units left)."
                 ))
+                if self.error_log:
+                    self.error_log.record(ERROR_KIND_INSUFFICIENT_STOCK, used_product_id, prod["name"],
+                                          customer_info.get("id"), order_product.quantity)
                 # Suggest alternatives if out of stock
                 alternatives = [p for p in products_db.values() if p["stock"] > 0 and p["name"] != prod["name"]]
                 if alternatives:
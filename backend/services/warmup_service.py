@@ -0,0 +1,93 @@
+import logging
+import threading
+import time
+from typing import Callable
+from config import Config
+from query_stats import query_stats
+
+logger = logging.getLogger(__name__)
+
+
+class WarmUpService:
+    """Runs startup cache loads on a background thread and tracks readiness.
+
+    Flask can serve /api/health (liveness) immediately, while /api/ready (readiness) reports 503
+    until every registered task has finished. A required task that fails (e.g. the database is
+    down) keeps the worker not ready and is retried every retry_seconds until it succeeds.
+    """
+
+    def __init__(self, retry_seconds: float = None):
+        self.retry_seconds = retry_seconds if retry_seconds is not None else Config.WARMUP_RETRY_SECONDS
+        self.tasks = []
+        self.task_status = {}
+        self._thread = None
+        self._lock = threading.Lock()
+        self._done = threading.Event()
+        self.started_at = None
+        self.finished_at = None
+
+    def add_task(self, name: str, func: Callable, required: bool = True):
+        """Register a task; an optional (required=False) task may fail without affecting readiness."""
+        self.tasks.append((name, func, required))
+        self.task_status[name] = {"status": "pending", "seconds": None, "error": None, "attempts": 0, "required": required}
+
+    def start(self):
+        """Start the warm-up thread; later calls are no-ops."""
+        with self._lock:
+            if self._thread is not None:
+                return
+            self.started_at = time.time()
+            self._thread = threading.Thread(target=self._run, name="warm-up", daemon=True)
+            self._thread.start()
+
+    def _run_task(self, name: str, func: Callable):
+        status = self.task_status[name]
+        status["status"] = "running"
+        status["attempts"] += 1
+        task_started = time.perf_counter()
+        try:
+            with query_stats.scope(f"warmup:{name}"):
+                func()
+            status["status"] = "done"
+            status["error"] = None
+        except Exception as e:
+            logger.error("Warm-up task %s failed (attempt %d): %s", name, status["attempts"], e)
+            status["status"] = "failed"
+            status["error"] = str(e)
+        status["seconds"] = round(time.perf_counter() - task_started, 3)
+
+    def _failed_required(self) -> list:
+        return [(name, func) for name, func, required in self.tasks
+                if required and self.task_status[name]["status"] == "failed"]
+
+    def _run(self):
+        logger.info("Starting %s warm-up tasks.", len(self.tasks))
+        for name, func, _ in self.tasks:
+            self._run_task(name, func)
+        self.finished_at = time.time()
+        self._done.set()
+        logger.info("Warm-up finished in %.2fs.", self.finished_at - self.started_at)
+        failed = self._failed_required()
+        while failed:
+            logger.warning("Not ready: retrying %s in %.0fs.", ", ".join(name for name, _ in failed), self.retry_seconds)
+            time.sleep(self.retry_seconds)
+            for name, func in failed:
+                self._run_task(name, func)
+            failed = self._failed_required()
+            if not failed:
+                logger.info("Warm-up retries succeeded; ready.")
+
+    def is_ready(self) -> bool:
+        """Ready once every task has run and no required task is failed (it is being retried)."""
+        return self._done.is_set() and not self._failed_required()
+
+    def wait(self, timeout: float = None) -> bool:
+        return self._done.wait(timeout)
+
+    def report(self) -> dict:
+        return {
+            "ready": self.is_ready(),
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "tasks": {name: dict(status) for name, status in self.task_status.items()},
+        }
@@ -0,0 +1,212 @@
+"""AnalyticsService micro-benchmarks across data sizes.
+
+Builds in-memory caches of synthetic orders (services/synthetic_data.py, so every run sees the same
+data for a seed) and times each analytics query with the result cache disabled, then measures its
+peak traced memory in a separate run. Prints a JSON report; with --baseline it also compares the
+best-of-repeat times and peak memory against a previous report and lists regressions.
+
+Usage (from the backend directory):
+    python tools/bench_analytics.py [--sizes 10k,100k,1m] [--repeat 7] [--save report.json]
+    python tools/bench_analytics.py --sizes 10k,100k --baseline report.json [--threshold 0.2] [--fail-on-regression]
+"""
+import argparse
+import asyncio
+import gc
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+import tracemalloc
+from bisect import bisect_left, bisect_right
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np  # noqa: E402
+
+from config import Config  # noqa: E402
+from records import records_nbytes  # noqa: E402
+from services.analytics_service import AnalyticsService  # noqa: E402
+from services.result_cache import ResultCache  # noqa: E402
+from services.synthetic_data import PRESETS, SyntheticDataGenerator  # noqa: E402
+
+SIZES = {"10k": 10_000, "100k": 100_000, "1m": 1_000_000}
+# Customers and products per size follow the generator presets (100k sits between 10k and 1m)
+CATALOG_SIZES = {"10k": PRESETS["10k"][1:], "100k": (10_000, 2_000), "1m": PRESETS["1m"][1:]}
+
+# name -> (method, kwargs)
+BENCHMARKS = {
+    "get_kpis": ("get_kpis", {"time_filter": "all_time", "approximate": False}),
+    "get_sales_trends[month]": ("get_sales_trends", {"time_filter": "all_time", "granularity": "month"}),
+    "get_sales_trends[week]": ("get_sales_trends", {"time_filter": "all_time", "granularity": "week"}),
+    "get_sales_trends[year]": ("get_sales_trends", {"time_filter": "all_time", "granularity": "year"}),
+    "get_order_status_distribution": ("get_order_status_distribution", {"time_filter": "all_time"}),
+    "get_product_performance": ("get_product_performance", {"time_filter": "all_time", "top_n": 10, "approximate": False}),
+    "get_catalog_suggestions": ("get_catalog_suggestions", {"time_filter": "all_time", "top_n": 5}),
+    "get_inventory_health": ("get_inventory_health", {}),
+    "get_sales_forecast": ("get_sales_forecast", {"time_filter": "last_365_days", "periods_to_forecast": 3, "granularity": "month"}),
+    "get_inventory_needs_forecast": ("get_inventory_needs_forecast", {"time_filter": "last_365_days", "top_n_products": 5, "periods_to_forecast": 3, "granularity": "month"}),
+    "get_reorder_recommendations": ("get_reorder_recommendations", {"limit": 100}),
+}
+
+
+def catalog_error_counts_func(generator: SyntheticDataGenerator, n_events: int):
+    """In-memory stand-in for _get_catalog_error_counts_async over synthetic not-found product names."""
+    rng = np.random.default_rng([generator.seed, 3])
+    span = (generator.end_date - generator.start_date).total_seconds()
+    times = sorted(generator.start_date + timedelta(seconds=float(s)) for s in rng.uniform(0, span, n_events))
+    names = [f"unknown product {k}" for k in rng.zipf(1.3, n_events) % 500]
+
+    async def counts(start_date, end_date, top_n):
+        lo, hi = bisect_left(times, start_date), bisect_right(times, end_date)
+        counter = Counter(names[lo:hi])
+        last = {}
+        for t, name in zip(times[lo:hi], names[lo:hi]):
+            last[name] = t
+        return [{"p_name_norm": name, "request_count": n, "last_requested": last[name]} for name, n in counter.most_common(top_n)]
+
+    return counts
+
+
+def build_service(size: str, seed: int, end_date: datetime):
+    n_customers, n_products = CATALOG_SIZES[size]
+    generator = SyntheticDataGenerator(seed=seed, n_customers=n_customers, n_products=n_products, end_date=end_date)
+    started = time.perf_counter()
+    orders = generator.order_records(SIZES[size])
+    customers, products = generator.customers_dict(), generator.products_dict()
+    build_seconds = time.perf_counter() - started
+
+    async def get_orders():
+        return orders
+
+    async def get_customers():
+        return customers
+
+    async def get_products():
+        return products
+
+    # Result cache disabled: every call does the full computation
+    service = AnalyticsService(get_orders, get_customers, get_products, result_cache=ResultCache(max_entries=0),
+                               get_catalog_error_counts_func=catalog_error_counts_func(generator, max(SIZES[size] // 20, 100)))
+    asyncio.run(service.load_cached_data())
+    cache = {"orders": len(orders), "customers": len(customers), "products": len(products),
+             "build_seconds": round(build_seconds, 3), "cache_bytes": records_nbytes(orders)}
+    return service, cache
+
+
+def run_benchmark(service: AnalyticsService, method: str, kwargs: dict, repeat: int, engine: str) -> dict:
+    if method.endswith("_forecast"):
+        kwargs = {**kwargs, "engine": engine}
+    call = getattr(service, method)
+    asyncio.run(call(**kwargs))  # warm-up: lazy imports and first-use setup stay out of the timings
+    timings = []
+    # Like timeit: collect first and keep the cyclic GC out of the timed runs, whose pauses depend
+    # on everything else allocated in the process rather than on the query
+    gc.collect()
+    gc.disable()
+    try:
+        for _ in range(repeat):
+            started = time.perf_counter()
+            asyncio.run(call(**kwargs))
+            timings.append(time.perf_counter() - started)
+    finally:
+        gc.enable()
+    tracemalloc.start()
+    asyncio.run(call(**kwargs))
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {
+        "median_seconds": round(statistics.median(timings), 6),
+        "min_seconds": round(min(timings), 6),
+        "peak_kb": round(peak / 1024, 1),
+    }
+
+
+def compare(report: dict, baseline: dict, threshold: float, min_seconds: float) -> dict:
+    """Relative change of best-of-repeat time and peak memory per (size, benchmark) present in both reports.
+
+    The minimum of the repeats is compared because it is the least affected by other load on the
+    machine. A time regression is a slowdown above threshold that is also more than min_seconds in
+    absolute terms; memory regressions use the threshold alone.
+    """
+    entries, regressions, improvements = {}, [], []
+    for size, results in report["results"].items():
+        for name, current in results["benchmarks"].items():
+            previous = baseline.get("results", {}).get(size, {}).get("benchmarks", {}).get(name)
+            if not previous:
+                continue
+            time_change = current["min_seconds"] / previous["min_seconds"] - 1 if previous["min_seconds"] else 0.0
+            memory_change = current["peak_kb"] / previous["peak_kb"] - 1 if previous["peak_kb"] else 0.0
+            key = f"{size}/{name}"
+            entries[key] = {"time_change": round(time_change, 3), "memory_change": round(memory_change, 3)}
+            slower = time_change > threshold and current["min_seconds"] - previous["min_seconds"] > min_seconds
+            if slower or memory_change > threshold:
+                regressions.append(key)
+            elif time_change < -threshold:
+                improvements.append(key)
+    return {"threshold": threshold, "entries": entries, "regressions": regressions, "improvements": improvements}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default="10k,100k,1m", help=f"comma-separated, from {', '.join(SIZES)}")
+    parser.add_argument("--benchmarks", help="comma-separated subset of: " + ", ".join(BENCHMARKS))
+    parser.add_argument("--repeat", type=int, default=7)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--end-date", help="last day of the synthetic order history (default today UTC; the time filters are relative to now)")
+    parser.add_argument("--engine", default=Config.FORECAST_ENGINE, help="forecast engine for the forecast benchmarks")
+    parser.add_argument("--save", help="also write the report to this path (usable as a later --baseline)")
+    parser.add_argument("--baseline", help="report from an earlier run to compare against")
+    parser.add_argument("--threshold", type=float, default=0.2, help="relative change that counts as a regression")
+    parser.add_argument("--min-seconds", type=float, default=0.001, help="ignore slowdowns smaller than this")
+    parser.add_argument("--fail-on-regression", action="store_true", help="exit with status 1 when regressions are found")
+    args = parser.parse_args()
+
+    names = args.benchmarks.split(",") if args.benchmarks else list(BENCHMARKS)
+    if args.end_date:
+        end_date = datetime.strptime(args.end_date, "%Y-%m-%d").replace(tzinfo=timezone.utc)
+    else:
+        # The same rows shifted in time, so reports from different days stay comparable
+        end_date = datetime.now(timezone.utc).replace(hour=0, minute=0, second=0, microsecond=0)
+    report = {
+        "meta": {
+            "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "machine": platform.machine(),
+            "seed": args.seed,
+            "end_date": end_date.date().isoformat(),
+            "repeat": args.repeat,
+            "forecast_engine": args.engine,
+        },
+        "results": {},
+    }
+    for size in [s.strip() for s in args.sizes.split(",") if s.strip()]:
+        print(f"[bench_analytics] {size}: building caches...", file=sys.stderr)
+        service, cache = build_service(size, args.seed, end_date)
+        results = {}
+        for name in names:
+            method, kwargs = BENCHMARKS[name]
+            results[name] = run_benchmark(service, method, kwargs, args.repeat, args.engine)
+            print(f"[bench_analytics] {size} {name}: {results[name]['median_seconds'] * 1000:.2f} ms, {results[name]['peak_kb']:.0f} KB", file=sys.stderr)
+        report["results"][size] = {"cache": cache, "benchmarks": results}
+        del service
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        report["comparison"] = compare(report, baseline, args.threshold, args.min_seconds)
+        report["comparison"]["baseline"] = args.baseline
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump(report, f, indent=2)
+    print(json.dumps(report, indent=2))
+    if args.fail_on_regression and report.get("comparison", {}).get("regressions"):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
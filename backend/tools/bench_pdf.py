@@ -0,0 +1,79 @@
+"""Sales order PDF throughput benchmark.
+
+Renders synthetic orders with PdfService and reports PDFs per second and average size for each
+order size (10 items fill one page; larger orders span several pages).
+
+Usage (from the backend directory):
+    python tools/bench_pdf.py [--count 200] [--items 3,10,25] [--json]
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.pdf_service import PdfService  # noqa: E402
+
+
+def make_order(n_items: int, seed: int = 0) -> dict:
+    items = []
+    for i in range(n_items):
+        quantity = (seed + i) % 7 + 1
+        price = 2.5 + (seed * 31 + i * 17) % 200
+        items.append({
+            "p_id": f"P{(seed * 13 + i) % 900 + 100}",
+            "p_name": f"Benchmark product {i}",
+            "oi_qty": quantity,
+            "oi_price": price,
+            "oi_total": price * quantity,
+        })
+    placed = datetime(2025, 1, 1, tzinfo=timezone.utc) + timedelta(hours=seed)
+    return {
+        "o_id": f"ORD-BENCH-{seed:05d}",
+        "c_name": f"Customer {seed % 50}",
+        "c_address": f"{seed} Benchmark Street",
+        "o_delivery_date": placed + timedelta(days=3),
+        "o_placed_time": placed,
+        "items": items,
+    }
+
+
+def bench(service: PdfService, n_items: int, count: int) -> dict:
+    orders = [make_order(n_items, seed) for seed in range(count)]
+    service.generate_sales_order_pdf(orders[0])  # import reportlab and build the layout outside the timing
+    started = time.perf_counter()
+    total_bytes = 0
+    for order in orders:
+        total_bytes += len(service.generate_sales_order_pdf(order))
+    seconds = time.perf_counter() - started
+    return {
+        "items": n_items,
+        "count": count,
+        "seconds": round(seconds, 4),
+        "pdfs_per_second": round(count / seconds, 1),
+        "avg_bytes": total_bytes // count,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--count", type=int, default=200)
+    parser.add_argument("--items", default="3,10,25", help="comma-separated item counts per order")
+    parser.add_argument("--json", action="store_true", help="print a machine-readable report")
+    args = parser.parse_args()
+
+    service = PdfService()
+    results = [bench(service, int(n), args.count) for n in args.items.split(",") if n.strip()]
+    if args.json:
+        print(json.dumps({"results": results}, indent=2))
+        return
+    print(f"{'items':>6} {'pdfs/s':>10} {'avg bytes':>10} {'seconds':>9}")
+    for result in results:
+        print(f"{result['items']:>6} {result['pdfs_per_second']:>10} {result['avg_bytes']:>10} {result['seconds']:>9}")
+
+
+if __name__ == "__main__":
+    main()
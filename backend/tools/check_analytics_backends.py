@@ -0,0 +1,81 @@
+"""Check that the in-memory, snapshot and SQL analytics backends agree on the configured database.
+
+Loads the same orders three ways (a list of records, a memory-mapped snapshot written to a
+temporary directory, and the SQL aggregation backend) and compares the reorder recommendations
+for every catalog product: daily velocity, daily standard deviation and reorder point. Prints a
+JSON report of the products that differ and exits with status 1 if any do.
+
+Usage (from the backend directory):
+    python tools/check_analytics_backends.py [--lookback-days 90] [--tolerance 1e-3]
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import Config  # noqa: E402
+from db import (  # noqa: E402
+    _get_all_customers_dict_async, _get_orders_async, _get_orders_snapshot_key_async, _get_products_async
+)
+from services.analytics_service import AnalyticsService  # noqa: E402
+from services.analytics_snapshot import AnalyticsSnapshotStore, SnapshotOrders  # noqa: E402
+from services.analytics_sql_backend import SqlAnalyticsBackend  # noqa: E402
+from services.result_cache import ResultCache  # noqa: E402
+
+FIELDS = ("daily_velocity", "daily_std", "reorder_point")
+
+
+async def recommendations(service: AnalyticsService, lookback_days: int) -> dict:
+    await service.load_cached_data()
+    result = await service.get_reorder_recommendations(lookback_days=lookback_days, limit=0)
+    return {product["p_id"]: product for product in result["products"]}
+
+
+async def run(lookback_days: int, tolerance: float) -> dict:
+    def service(**kwargs):
+        return AnalyticsService(_get_orders_async, _get_all_customers_dict_async, _get_products_async,
+                                result_cache=ResultCache(max_entries=0), **kwargs)
+
+    with tempfile.TemporaryDirectory() as snapshot_dir:
+        snapshot_service = service(snapshot_store=AnalyticsSnapshotStore(snapshot_dir, _get_orders_snapshot_key_async))
+        results = {
+            "memory": await recommendations(service(), lookback_days),
+            "snapshot": await recommendations(snapshot_service, lookback_days),
+            "sql": await recommendations(service(sql_backend=SqlAnalyticsBackend()), lookback_days),
+        }
+        if not isinstance(snapshot_service.all_cached_orders, SnapshotOrders):
+            raise SystemExit("No snapshot was written (no snapshot key: database unreachable); cannot compare.")
+
+    mismatches = []
+    reference = results["memory"]
+    for backend in ("snapshot", "sql"):
+        other = results[backend]
+        for p_id in sorted(reference.keys() | other.keys()):
+            expected, actual = reference.get(p_id), other.get(p_id)
+            if expected is None or actual is None:
+                mismatches.append({"backend": backend, "p_id": p_id, "missing_from": backend if actual is None else "memory"})
+                continue
+            for field in FIELDS:
+                if abs(expected[field] - actual[field]) > tolerance:
+                    mismatches.append({"backend": backend, "p_id": p_id, "field": field,
+                                       "memory": expected[field], backend: actual[field]})
+    return {"lookback_days": lookback_days, "products": len(reference), "mismatches": mismatches}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--lookback-days", type=int, default=Config.REORDER_LOOKBACK_DAYS)
+    parser.add_argument("--tolerance", type=float, default=1e-3, help="largest absolute difference that still agrees")
+    args = parser.parse_args()
+    report = asyncio.run(run(args.lookback_days, args.tolerance))
+    print(json.dumps(report, indent=2))
+    if report["mismatches"]:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""Seeded synthetic dataset generator for scale and load testing.
+
+Loads customers, products (Zipf popularity) and orders with items into the configured Postgres
+database with COPY, and/or writes a JSONL corpus of order emails in the TestCaseGeneratorService
+formats. The same seed, sizes and end date always produce the same data.
+
+Usage (from the backend directory):
+    python tools/generate_synthetic_data.py --preset 10k|1m|10m [--seed 0] [--replace]
+    python tools/generate_synthetic_data.py --orders 50000 --customers 2000 --products 800
+    python tools/generate_synthetic_data.py --preset 10k --no-load --emails emails.jsonl --email-count 1000
+
+Rows use ids prefixed with --id-prefix (default "syn"), so they load next to existing data unless
+--replace is given, which deletes all customers, products, orders and order items first.
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+from datetime import datetime, timezone
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.synthetic_data import PRESETS, SyntheticDataGenerator, copy_dataset  # noqa: E402
+
+
+async def load(generator: SyntheticDataGenerator, n_orders: int, replace: bool) -> dict:
+    from db import get_connection
+
+    connection = await get_connection()
+    if not connection:
+        raise SystemExit("Database connection failed.")
+    try:
+        async with connection.transaction():
+            if replace:
+                await connection.execute("TRUNCATE order_items, orders, products, customers;")
+            started = time.perf_counter()
+
+            def progress(done, total):
+                print(f"  {done:,}/{total:,} orders ({done / max(time.perf_counter() - started, 1e-9):,.0f}/s)", file=sys.stderr)
+
+            counts = await copy_dataset(connection, generator, n_orders, progress=progress)
+        await connection.execute("ANALYZE customers, products, orders, order_items;")
+        return counts
+    finally:
+        await connection.close()
+
+
+def write_emails(generator: SyntheticDataGenerator, path: str, count: int):
+    with open(path, "w", encoding="utf-8") as f:
+        for email in generator.emails(count):
+            f.write(json.dumps(email, ensure_ascii=False) + "\n")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--preset", choices=sorted(PRESETS), help="dataset size: orders, customers and products")
+    parser.add_argument("--orders", type=int)
+    parser.add_argument("--customers", type=int)
+    parser.add_argument("--products", type=int)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--days", type=int, default=730, help="length of the order history")
+    parser.add_argument("--end-date", help="last day of the order history (YYYY-MM-DD, default today UTC)")
+    parser.add_argument("--product-skew", type=float, default=1.1, help="Zipf exponent of product popularity")
+    parser.add_argument("--id-prefix", default="syn")
+    parser.add_argument("--replace", action="store_true", help="delete existing customers, products and orders first")
+    parser.add_argument("--no-load", action="store_true", help="do not touch the database")
+    parser.add_argument("--emails", help="write an order email corpus (JSONL) to this path")
+    parser.add_argument("--email-count", type=int, default=1000)
+    args = parser.parse_args()
+
+    n_orders, n_customers, n_products = PRESETS.get(args.preset, PRESETS["10k"])
+    n_orders = args.orders or n_orders
+    n_customers = args.customers or n_customers
+    n_products = args.products or n_products
+    end_date = datetime.strptime(args.end_date, "%Y-%m-%d").replace(tzinfo=timezone.utc) if args.end_date else None
+    generator = SyntheticDataGenerator(
+        seed=args.seed, n_customers=n_customers, n_products=n_products, days=args.days,
+        end_date=end_date, product_skew=args.product_skew, id_prefix=args.id_prefix,
+    )
+    report = {"seed": args.seed, "end_date": generator.end_date.date().isoformat()}
+
+    if not args.no_load:
+        started = time.perf_counter()
+        report["loaded"] = asyncio.run(load(generator, n_orders, args.replace))
+        report["load_seconds"] = round(time.perf_counter() - started, 2)
+    if args.emails:
+        write_emails(generator, args.emails, args.email_count)
+        report["emails"] = {"path": args.emails, "count": args.email_count}
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
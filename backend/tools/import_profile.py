@@ -0,0 +1,73 @@
+"""Import-time profile of the backend.
+
+Runs `python -X importtime -c "import app"` in a fresh interpreter and reports the slowest
+modules by cumulative and self import time.
+
+Usage (from the backend directory):
+    python tools/import_profile.py [--module app] [--top 25] [--json]
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def profile_imports(module: str) -> list:
+    """Return [{"module", "self_us", "cumulative_us", "depth"}] for every module imported by module."""
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=BACKEND_DIR,
+        capture_output=True,
+        text=True,
+    )
+    entries = []
+    for line in completed.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|", 2)
+        entries.append({
+            "module": name.strip(),
+            "self_us": int(self_us),
+            "cumulative_us": int(cumulative_us),
+            "depth": (len(name) - len(name.lstrip())) // 2,
+        })
+    if completed.returncode != 0:
+        print(completed.stderr[-2000:], file=sys.stderr)
+    return entries
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--module", default="app")
+    parser.add_argument("--top", type=int, default=25)
+    parser.add_argument("--json", action="store_true", help="print a machine-readable report")
+    args = parser.parse_args()
+
+    entries = profile_imports(args.module)
+    root = next((e for e in entries if e["module"] == args.module), None)
+    by_cumulative = sorted(entries, key=lambda e: e["cumulative_us"], reverse=True)[:args.top]
+    by_self = sorted(entries, key=lambda e: e["self_us"], reverse=True)[:args.top]
+    report = {
+        "module": args.module,
+        "total_seconds": round(root["cumulative_us"] / 1e6, 3) if root else None,
+        "modules_imported": len(entries),
+        "top_cumulative": by_cumulative,
+        "top_self": by_self,
+    }
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return
+    print(f"import {args.module}: {report['total_seconds']}s across {report['modules_imported']} modules")
+    print(f"\nTop {args.top} by cumulative time:")
+    for e in by_cumulative:
+        print(f"  {e['cumulative_us'] / 1000:9.1f} ms  {'  ' * e['depth']}{e['module']}")
+    print(f"\nTop {args.top} by self time:")
+    for e in by_self:
+        print(f"  {e['self_us'] / 1000:9.1f} ms  {e['module']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,154 @@
+"""Concurrent load test of the order pipeline: validation, stock reservation and order insert.
+
+Drives ValidatorService and DBUpdateService from a thread pool with synthetic order requests drawn
+from the repository's own customers and products (popular products are hit most, so orders contend
+for the same stock), and reports throughput, per-stage latency percentiles, outcomes and whether
+every product's stock went down by exactly the quantities of the confirmed orders. Requests enter
+as ExtractedOrderInfo: the LLM extraction and customer messages are not part of the test.
+
+Usage (from the backend directory):
+    python tools/load_test_orders.py [--engines memory] [--orders 2000] [--concurrency 1,8,32]
+    python tools/load_test_orders.py --engines memory,postgres --orders 500 --concurrency 16
+
+The memory engine starts each run from a fresh synthetic dataset (--preset, --seed). The postgres
+engine uses the configured database and places real orders in it.
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import statistics
+import sys
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from models import ExtractedOrderInfo, OrderProduct  # noqa: E402
+from repository import InMemoryRepository, get_repository, set_repository  # noqa: E402
+from services.db_update_service import DBUpdateService  # noqa: E402
+from services.synthetic_data import PRESETS, SyntheticDataGenerator  # noqa: E402
+from services.validator_service import ValidatorService  # noqa: E402
+
+# scenario -> share of requests
+SCENARIOS = {"valid": 0.8, "over_stock": 0.1, "unknown_product": 0.05, "unknown_customer": 0.05}
+
+
+def make_requests(customers: dict, products: dict, count: int, seed: int) -> list:
+    """ExtractedOrderInfo requests; product picks follow a Zipf-like popularity over the catalog."""
+    rng = random.Random(seed)
+    customer_ids = sorted(customers)
+    product_ids = sorted(products)
+    rng.shuffle(product_ids)
+    weights = [1 / (rank + 1) ** 1.1 for rank in range(len(product_ids))]
+    requests = []
+    for number, scenario in enumerate(rng.choices(list(SCENARIOS), weights=list(SCENARIOS.values()), k=count)):
+        picked = list(dict.fromkeys(rng.choices(product_ids, weights=weights, k=rng.randint(1, 3))))
+        lines = [OrderProduct(product_id=p_id, product_name=products[p_id]["name"], quantity=rng.randint(1, 5)) for p_id in picked]
+        if scenario == "over_stock":
+            lines[0].quantity = products[lines[0].product_id]["stock"] + 1
+        elif scenario == "unknown_product":
+            lines[-1] = OrderProduct(product_id=f"load-p{number}", product_name=f"Unknown Product {number}", quantity=1)
+        if scenario == "unknown_customer":
+            requests.append(ExtractedOrderInfo(customer_id=f"load-c{number}", customer_email=f"load{number}@example.com", products=lines))
+        else:
+            requests.append(ExtractedOrderInfo(customer_id=rng.choice(customer_ids), products=lines))
+    return requests
+
+
+def place(validator: ValidatorService, info: ExtractedOrderInfo) -> tuple:
+    started = time.perf_counter()
+    validation = validator.validate_order(info)
+    validated = time.perf_counter()
+    result = DBUpdateService.update_order(validation)
+    return validation, result, validated - started, time.perf_counter() - validated
+
+
+def percentiles(seconds: list) -> dict:
+    if len(seconds) < 2:
+        return {"p50_ms": round(seconds[0] * 1000, 3) if seconds else None}
+    cuts = statistics.quantiles(seconds, n=100, method="inclusive")
+    return {"p50_ms": round(cuts[49] * 1000, 3), "p95_ms": round(cuts[94] * 1000, 3), "p99_ms": round(cuts[98] * 1000, 3)}
+
+
+def run(n_orders: int, concurrency: int, seed: int) -> dict:
+    """Place n_orders through the pipeline with `concurrency` threads against the current repository."""
+    repository = get_repository()
+    customers = asyncio.run(repository.get_customers())
+    stock_before = {p_id: p["stock"] for p_id, p in asyncio.run(repository.get_products()).items()}
+    if not customers or not stock_before:
+        raise SystemExit("The repository has no customers or products.")
+    requests = make_requests(customers, asyncio.run(repository.get_products()), n_orders, seed)
+    validator = ValidatorService()
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        outcomes = list(pool.map(lambda info: place(validator, info), requests))
+    elapsed = time.perf_counter() - started
+
+    counts = Counter()
+    reserved = Counter()
+    for validation, result, _, _ in outcomes:
+        if result.success:
+            counts["confirmed"] += 1
+            for item in validation.successful_items:
+                reserved[item.product_id] += item.quantity
+        elif result.order_id:
+            counts["hold_or_failed"] += 1
+        elif "Insufficient stock" in (result.details or ""):
+            # Validated against a stock level another order consumed before this one committed
+            counts["stock_conflict"] += 1
+        else:
+            # No order row: unknown customer, or a store error
+            counts["rejected"] += 1
+    stock_after = {p_id: p["stock"] for p_id, p in asyncio.run(repository.get_products()).items()}
+    consistent = all(
+        stock_before[p_id] - stock_after.get(p_id, 0) == reserved[p_id] and stock_after.get(p_id, 0) >= 0
+        for p_id in stock_before
+    )
+    return {
+        "orders": n_orders,
+        "concurrency": concurrency,
+        "seconds": round(elapsed, 3),
+        "orders_per_second": round(n_orders / elapsed, 1),
+        "validate": percentiles([outcome[2] for outcome in outcomes]),
+        "place_order": percentiles([outcome[3] for outcome in outcomes]),
+        "outcomes": dict(counts),
+        "stock_consistent": consistent,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--engines", default="memory", help="comma-separated: memory, postgres")
+    parser.add_argument("--orders", type=int, default=2000)
+    parser.add_argument("--concurrency", default="1,8,32", help="comma-separated thread counts")
+    parser.add_argument("--preset", choices=sorted(PRESETS), default="10k", help="memory engine dataset")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    report = {"seed": args.seed, "preset": args.preset, "results": {}}
+    for engine in [e.strip() for e in args.engines.split(",") if e.strip()]:
+        results = []
+        for concurrency in [int(c) for c in args.concurrency.split(",")]:
+            if engine == "memory":
+                n_orders, n_customers, n_products = PRESETS[args.preset]
+                generator = SyntheticDataGenerator(seed=args.seed, n_customers=n_customers, n_products=n_products)
+                set_repository(InMemoryRepository.from_synthetic(generator, n_orders))
+            elif engine == "postgres":
+                from db import AsyncpgRepository
+                set_repository(AsyncpgRepository())
+            else:
+                raise SystemExit(f"Unknown engine {engine!r}")
+            result = run(args.orders, concurrency, args.seed)
+            print(f"[load_test_orders] {engine} x{concurrency}: {result['orders_per_second']:,.0f} orders/s, "
+                  f"place_order p95 {result['place_order'].get('p95_ms')} ms", file=sys.stderr)
+            results.append(result)
+        report["results"][engine] = results
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()